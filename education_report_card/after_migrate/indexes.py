@@ -0,0 +1,149 @@
+import frappe
+
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	KEY_FIELDS as CLASS_TEST_STATISTIC_KEY,
+)
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	delete_duplicate_statistics,
+)
+
+# doctype -> [(index name, columns)], covering the hot lookup paths of the app
+INDEXES = {
+	"Student Report": [
+		# update_student_reports, get_course_summary, validate_duplicated_entry
+		("student_course_program_year_index", ["student", "course", "program", "academic_year"]),
+		# report card / overall averages of a whole program
+		("program_year_student_index", ["program", "academic_year", "student"]),
+	],
+	"Test Result": [
+		# weighted averages per test type and term
+		("course_program_year_type_term_index", ["course", "program", "academic_year", "test_type", "term"]),
+		# keyset pages of the Class Test Overview detail rows
+		("year_course_date_index", ["academic_year", "course", "test_date"]),
+	],
+	"Test Result Detail": [
+		("parent_student_index", ["parent", "student"]),
+	],
+	"Course Term Rollup": [
+		# analytics dashboard charts and number cards
+		("year_program_term_course_index", ["academic_year", "program", "term", "course"]),
+	],
+	"Term Comment": [
+		# comments of a whole batch of report cards
+		("program_year_student_index", ["program", "academic_year", "student"]),
+	],
+	"Director Message": [
+		("program_year_index", ["program", "academic_year"]),
+	],
+	"Program Enrollment": [
+		# enrollment checks of the students on a test sheet
+		("program_year_student_index", ["program", "academic_year", "student"]),
+	],
+}
+
+# doctype -> [(constraint name, columns)]
+UNIQUE_INDEXES = {
+	# one statistic row per class and test type: the statistics are upserted on this key
+	"Class Test Statistic": [("class_test_statistic_key", list(CLASS_TEST_STATISTIC_KEY))],
+}
+
+# (label, query, expected indexes) — parameters are filled from an existing Student Report
+HOT_QUERIES = [
+	(
+		"Student Report lookup",
+		"""
+        SELECT name FROM `tabStudent Report`
+        WHERE student = %(student)s AND course = %(course)s
+          AND program = %(program)s AND academic_year = %(academic_year)s
+        """,
+		["student_course_program_year_index"],
+	),
+	(
+		"Program report cards",
+		"""
+        SELECT name, student, course FROM `tabStudent Report`
+        WHERE program = %(program)s AND academic_year = %(academic_year)s
+        """,
+		["program_year_student_index"],
+	),
+	(
+		"Report card comments",
+		"""
+        SELECT student, term1_comment, term2_comment, term3_comment, teacher_name FROM `tabTerm Comment`
+        WHERE program = %(program)s AND academic_year = %(academic_year)s
+        """,
+		["program_year_student_index"],
+	),
+	(
+		"Class Test Overview page",
+		"""
+        SELECT tr.name, tr.course, tr.test_date, trd.name
+        FROM `tabTest Result` tr
+        JOIN `tabTest Result Detail` trd ON trd.parent = tr.name
+        WHERE tr.docstatus = 1 AND tr.academic_year = %(academic_year)s AND tr.course >= %(course)s
+        ORDER BY tr.course, tr.test_date, trd.name
+        LIMIT 500
+        """,
+		["year_course_date_index"],
+	),
+	(
+		"Weighted averages",
+		"""
+        SELECT td.student, tr.test_type, tr.term, SUM(td.mark_earned), SUM(tr.possible_mark)
+        FROM `tabTest Result` tr
+        INNER JOIN `tabTest Result Detail` td ON td.parent = tr.name
+        WHERE tr.docstatus = 1 AND tr.course = %(course)s AND tr.program = %(program)s
+          AND tr.academic_year = %(academic_year)s AND td.student = %(student)s
+        GROUP BY td.student, tr.test_type, tr.term
+        """,
+		["course_program_year_type_term_index", "parent_student_index"],
+	),
+]
+
+
+def execute():
+	"""Create the composite and unique indexes of the app. Existing indexes are left untouched."""
+	for doctype, indexes in INDEXES.items():
+		for index_name, columns in indexes:
+			frappe.db.add_index(doctype, columns, index_name)
+
+	delete_duplicate_statistics()
+	for doctype, constraints in UNIQUE_INDEXES.items():
+		for constraint_name, columns in constraints:
+			frappe.db.add_unique(doctype, columns, constraint_name)
+
+
+def check_index_usage():
+	"""
+	EXPLAIN the hot queries and report which indexes the optimizer picks.
+
+	    bench --site <site> execute education_report_card.after_migrate.indexes.check_index_usage
+
+	On nearly empty tables the optimizer may still prefer a scan; run it on real data.
+	"""
+	if frappe.db.db_type != "mariadb":
+		print("Index check is only implemented for MariaDB.")
+		return []
+
+	values = frappe.db.get_value(
+		"Student Report", {}, ["student", "course", "program", "academic_year"], as_dict=True
+	) or {"student": "", "course": "", "program": "", "academic_year": ""}
+
+	results = []
+	for label, query, expected in HOT_QUERIES:
+		plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+		used = {row.key for row in plan if row.key}
+		results.append(
+			{
+				"query": label,
+				"expected": expected,
+				"used": sorted(used),
+				"ok": all(index in used for index in expected),
+			}
+		)
+
+	for result in results:
+		status = "✅" if result["ok"] else "❌"
+		print(f"{status} {result['query']}: uses {', '.join(result['used']) or 'no index'}")
+
+	return results
@@ -0,0 +1,294 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Synthetic school for benchmarks.
+
+Builds an academic year with programs, courses, topics, competencies, enrolled
+students, submitted Test Results and the derived Student Reports, statistics and
+ranks. Every record name starts with the given prefix and hangs off the
+`<prefix> 2030-31` academic year, so `delete_school` can remove exactly the
+generated records again. Rows are written with bulk inserts, so a school
+of a few thousand students is generated in seconds.
+
+    bench --site test_site execute education_report_card.benchmark.dataset.make_school \
+        --kwargs "{'students_per_program': 500}"
+"""
+
+import random
+import re
+
+import frappe
+from frappe.utils import add_days, getdate
+
+from education_report_card.education_report.bulk import bulk_insert_rows
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	rebuild_class_test_statistics,
+)
+from education_report_card.education_report.generate import generate_student_reports
+from education_report_card.education_report.grading import TERMS, TEST_TYPES
+
+DEFAULT_PREFIX = "BENCH"
+GRADES = (("A", 85), ("B", 70), ("C", 55), ("D", 40), ("F", 0))
+
+# synthetic records are only deleted under a prefix like this, never a partial or empty one
+PREFIX_PATTERN = re.compile(r"^[A-Z][A-Z0-9]{3,}$")
+
+# doctype -> its child doctypes, deleted with their parents
+CHILD_TABLES = {
+	"Test Result": ("Test Result Detail",),
+	"Student Report": ("Student Report Detail",),
+	"Competency": ("Competency Detail",),
+	"Program": ("Program Course",),
+	"Course": ("Course Topic",),
+	"Grading Scale": ("Grading Scale Interval",),
+}
+
+# records computed from the school, keyed by academic year only
+DERIVED = ("Student Class Rank", "Course Term Rollup", "Class Test Statistic")
+
+
+def make_school(
+	prefix=DEFAULT_PREFIX,
+	programs=2,
+	courses_per_program=6,
+	students_per_program=100,
+	tests_per_term=2,
+	topics_per_course=3,
+	competencies_per_topic=3,
+	seed=42,
+):
+	"""Create the synthetic school and return its size, for `run_benchmarks`."""
+	check_site()
+	check_prefix(prefix)
+	delete_school(prefix)
+	rng = random.Random(seed)
+
+	start = getdate("2030-09-01")
+	academic_year = f"{prefix} 2030-31"
+	grading_scale = f"{prefix} Scale"
+	teacher = f"{prefix}-INS-1"
+
+	bulk_insert_rows(
+		"Academic Year",
+		[
+			{
+				"name": academic_year,
+				"academic_year_name": academic_year,
+				"year_start_date": start,
+				"year_end_date": add_days(start, 300),
+			}
+		],
+	)
+	bulk_insert_rows(
+		"Grading Scale", [{"name": grading_scale, "grading_scale_name": grading_scale, "docstatus": 1}]
+	)
+	bulk_insert_rows(
+		"Grading Scale Interval",
+		[
+			child(grading_scale, "Grading Scale", "intervals", idx, grade_code=code, threshold=threshold)
+			for idx, (code, threshold) in enumerate(GRADES, start=1)
+		],
+	)
+	bulk_insert_rows(
+		"Instructor", [{"name": teacher, "instructor_name": f"{prefix} Teacher", "status": "Active"}]
+	)
+
+	descriptions = [f"{prefix} Competency {i}" for i in range(1, competencies_per_topic + 1)]
+	bulk_insert_rows(
+		"Competency Description", [{"name": d, "competency_description": d} for d in descriptions]
+	)
+
+	program_names = []
+	courses, topics, program_courses, course_topics = [], [], [], []
+	competencies, competency_details, students, enrollments = [], [], [], []
+	tests, test_details = [], []
+
+	for p in range(1, programs + 1):
+		program = f"{prefix}-PRG-{p}"
+		program_names.append({"name": program, "program_name": program})
+		roster = {
+			f"{prefix}-STU-{p}-{s:04d}": f"Student {p}-{s:04d}" for s in range(1, students_per_program + 1)
+		}
+
+		for s, (student, student_name) in enumerate(roster.items(), start=1):
+			students.append(
+				{"name": student, "first_name": student_name, "student_name": student_name, "enabled": 1}
+			)
+			enrollments.append(
+				{
+					"name": f"{prefix}-ENR-{p}-{s:04d}",
+					"student": student,
+					"student_name": student_name,
+					"program": program,
+					"academic_year": academic_year,
+					"enrollment_date": start,
+					"docstatus": 1,
+				}
+			)
+
+		for c in range(1, courses_per_program + 1):
+			course = f"{prefix}-CRS-{p}-{c}"
+			courses.append({"name": course, "course_name": course})
+			program_courses.append(child(program, "Program", "courses", c, course=course, course_name=course))
+
+			for t in range(1, topics_per_course + 1):
+				topic = f"{course}-TOP-{t}"
+				topics.append({"name": topic, "topic_name": topic})
+				course_topics.append(child(course, "Course", "topics", t, topic=topic, topic_name=topic))
+
+				competency = f"{prefix}-CMP-{p}-{c}-{t}"
+				competencies.append(
+					{
+						"name": competency,
+						"program": program,
+						"course": course,
+						"academic_year": academic_year,
+						"topic": topic,
+					}
+				)
+				competency_details.extend(
+					child(
+						competency,
+						"Competency",
+						"detail",
+						i,
+						competency_description=d,
+						grading_scale=grading_scale,
+					)
+					for i, d in enumerate(descriptions, start=1)
+				)
+
+			for term_index, term in enumerate(TERMS):
+				for test_type in TEST_TYPES:
+					for n in range(1, tests_per_term + 1):
+						name = f"{prefix}-TR-{p}-{c}-{term_index + 1}-{test_type[0]}-{n}"
+						tests.append(
+							{
+								"name": name,
+								"test_date": add_days(start, term_index * 100 + n * 7),
+								"test_type": test_type,
+								"program": program,
+								"course": course,
+								"teacher": teacher,
+								"instructor_name": f"{prefix} Teacher",
+								"academic_year": academic_year,
+								"term": term,
+								"possible_mark": 100,
+								"docstatus": 1,
+							}
+						)
+						test_details.extend(
+							child(
+								name,
+								"Test Result",
+								"test_detail",
+								i,
+								student=student,
+								student_name=student_name,
+								mark_earned=round(min(max(rng.gauss(68, 15), 0), 100), 1),
+							)
+							for i, (student, student_name) in enumerate(roster.items(), start=1)
+						)
+
+	bulk_insert_rows("Student", students)
+	bulk_insert_rows("Program Enrollment", enrollments)
+	bulk_insert_rows("Course", courses)
+	bulk_insert_rows("Topic", topics)
+	bulk_insert_rows("Course Topic", course_topics)
+	bulk_insert_rows("Program", program_names)
+	bulk_insert_rows("Program Course", program_courses)
+	bulk_insert_rows("Competency", competencies)
+	bulk_insert_rows("Competency Detail", competency_details)
+	bulk_insert_rows("Test Result", tests)
+	bulk_insert_rows("Test Result Detail", test_details)
+	frappe.db.commit()
+
+	# reports are created with their averages and ranks already computed
+	for program in program_names:
+		generate_student_reports(program["name"], academic_year, teacher, grading_scale)
+	rebuild_class_test_statistics(academic_year)
+	frappe.db.commit()
+
+	return {
+		"academic_year": academic_year,
+		"programs": [p["name"] for p in program_names],
+		"students": len(students),
+		"courses": len(courses),
+		"test_results": len(tests),
+		"marks": len(test_details),
+	}
+
+
+def delete_school(prefix=DEFAULT_PREFIX):
+	"""
+	Remove the records created by `make_school` with this prefix.
+	The records are found through the synthetic academic year and deleted by their exact
+	names; names that do not start with the prefix (compared case-sensitively) are kept.
+	"""
+	check_site()
+	check_prefix(prefix)
+
+	academic_year = f"{prefix} 2030-31"
+	year_filter = {"academic_year": academic_year}
+
+	def names(doctype, field="name", filters=None):
+		values = frappe.get_all(doctype, filters=filters or year_filter, pluck=field, distinct=True)
+		return [v for v in values if v and v.startswith(prefix)]
+
+	competencies = names("Competency")
+	records = {
+		"Test Result": names("Test Result"),
+		"Student Report": frappe.get_all("Student Report", filters=year_filter, pluck="name"),
+		"Competency": competencies,
+		"Competency Description": names(
+			"Competency Detail",
+			"competency_description",
+			{"parent": ["in", competencies or [""]], "parenttype": "Competency"},
+		),
+		"Program Enrollment": names("Program Enrollment"),
+		"Student": names("Program Enrollment", "student"),
+		"Program": names("Program Enrollment", "program"),
+		"Course": sorted(set(names("Test Result", "course")) | set(names("Competency", "course"))),
+		"Topic": names("Competency", "topic"),
+		"Instructor": [f"{prefix}-INS-1"],
+		"Grading Scale": [f"{prefix} Scale"],
+	}
+
+	for doctype in DERIVED:
+		frappe.db.delete(doctype, year_filter)
+
+	for doctype, record_names in records.items():
+		if not record_names:
+			continue
+		for child_doctype in CHILD_TABLES.get(doctype, ()):
+			frappe.db.delete(child_doctype, {"parent": ["in", record_names], "parenttype": doctype})
+		frappe.db.delete(doctype, {"name": ["in", record_names]})
+
+	frappe.db.delete("Academic Year", {"name": academic_year})
+	frappe.db.commit()
+	frappe.clear_cache()
+
+
+def check_prefix(prefix):
+	if not PREFIX_PATTERN.match(prefix or ""):
+		frappe.throw(
+			f"Invalid benchmark prefix {prefix!r}: use at least four upper-case letters or digits, like BENCH."
+		)
+
+
+def check_site():
+	if not (frappe.conf.allow_tests or frappe.conf.developer_mode):
+		frappe.throw(
+			"Benchmarks write synthetic records: enable allow_tests or developer_mode on this site first."
+		)
+
+
+def child(parent, parenttype, parentfield, idx, **fields):
+	return {
+		"parent": parent,
+		"parenttype": parenttype,
+		"parentfield": parentfield,
+		"idx": idx,
+		**fields,
+	}
@@ -0,0 +1,227 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Benchmarks of the report card hot paths against the synthetic school.
+
+Each scenario runs `iterations` times; the p50 / p95 wall time and the query
+count are reported and compared with the baseline saved by an earlier run, and
+any scenario that got slower than the tolerance, or issues more queries, is
+flagged as a regression. Writes are rolled back after every iteration so the
+dataset stays the same between runs.
+
+    bench --site test_site execute education_report_card.benchmark.dataset.make_school
+    bench --site test_site execute education_report_card.benchmark.run.run_benchmarks \
+        --kwargs "{'save_baseline': 1}"
+"""
+
+import json
+import math
+import os
+import random
+import statistics
+
+import frappe
+from frappe.utils import cint, flt
+
+from education_report_card.benchmark.dataset import DEFAULT_PREFIX, check_site
+from education_report_card.education_report.card_cache import clear_report_card_cache
+from education_report_card.education_report.instrumentation import QueryCollector
+from education_report_card.education_report.page.student_report_card.student_report_card import (
+	get_report_cards,
+	get_student_report_summary,
+	get_student_reports,
+)
+from education_report_card.education_report.recompute import recompute_student_reports
+from education_report_card.education_report.report.class_test_overview.class_test_overview import execute
+
+BASELINE_FILE = "report_card_benchmark_baseline.json"
+
+
+def run_benchmarks(prefix=DEFAULT_PREFIX, iterations=20, save_baseline=0, tolerance=0.25, seed=42):
+	"""Run every scenario and compare with the stored baseline. Returns the results."""
+	check_site()
+	context = get_context(prefix)
+	rng = random.Random(seed)
+
+	results = {}
+	for name, scenario in SCENARIOS.items():
+		samples = []
+		for _i in range(cint(iterations)):
+			run = scenario(context, rng)
+			with QueryCollector() as collector:
+				run()
+			samples.append(collector)
+			frappe.db.rollback()
+
+		results[name] = summarize(samples)
+
+	baseline = load_baseline()
+	regressions = compare(results, baseline, flt(tolerance))
+
+	if cint(save_baseline):
+		with open(get_baseline_path(), "w") as file:
+			json.dump(results, file, indent=1, sort_keys=True)
+
+	print_results(results, baseline, regressions)
+	return {"results": results, "regressions": regressions}
+
+
+def get_context(prefix):
+	academic_year = f"{prefix} 2030-31"
+	reports = frappe.get_all(
+		"Student Report",
+		filters={"academic_year": academic_year},
+		fields=["name", "student", "program", "course"],
+	)
+	if not reports:
+		frappe.throw(f"No synthetic school found for {prefix}: run benchmark.dataset.make_school first.")
+
+	return frappe._dict(
+		academic_year=academic_year,
+		reports=reports,
+		teacher=f"{prefix}-INS-1",
+		rosters=get_rosters(reports),
+	)
+
+
+def get_rosters(reports):
+	rosters = {}
+	for report in reports:
+		rosters.setdefault((report.program, report.course), []).append(report.student)
+
+	return rosters
+
+
+# each scenario does its setup and returns the call to time
+
+
+def test_result_submit(context, rng):
+	(program, course), students = rng.choice(list(context.rosters.items()))
+	doc = frappe.get_doc(
+		{
+			"doctype": "Test Result",
+			"test_date": frappe.db.get_value("Academic Year", context.academic_year, "year_start_date"),
+			"test_type": "Exam",
+			"term": "Term 1",
+			"program": program,
+			"course": course,
+			"teacher": context.teacher,
+			"academic_year": context.academic_year,
+			"possible_mark": 100,
+			"test_detail": [{"student": s, "mark_earned": rng.randint(0, 100)} for s in students],
+		}
+	).insert()
+
+	return doc.submit
+
+
+def recompute_class(context, rng):
+	program, course = rng.choice(list(context.rosters))
+	return lambda: recompute_student_reports(program, course, context.academic_year)
+
+
+def student_report_save(context, rng):
+	doc = frappe.get_doc("Student Report", rng.choice(context.reports).name)
+	return doc.save
+
+
+def class_test_overview(context, rng):
+	program = rng.choice(context.reports).program
+	return lambda: execute(frappe._dict(academic_year=context.academic_year, program=program))
+
+
+def student_reports(context, rng):
+	program = rng.choice(context.reports).program
+	return lambda: get_student_reports(
+		json.dumps({"academic_year": context.academic_year, "program": program})
+	)
+
+
+def student_report_summary(context, rng):
+	report = rng.choice(context.reports)
+	return lambda: get_student_report_summary(
+		context.academic_year, report.program, report.student, full=True
+	)
+
+
+def report_cards_cold(context, rng):
+	program = rng.choice(context.reports).program
+	clear_report_card_cache(program, context.academic_year)
+	return lambda: get_report_cards(context.academic_year, program)
+
+
+def report_card_warm(context, rng):
+	report = rng.choice(context.reports)
+	get_report_cards(context.academic_year, report.program, report.student)
+	return lambda: get_report_cards(context.academic_year, report.program, report.student)
+
+
+SCENARIOS = {
+	"test_result_submit": test_result_submit,
+	"recompute_class": recompute_class,
+	"student_report_save": student_report_save,
+	"class_test_overview": class_test_overview,
+	"get_student_reports": student_reports,
+	"get_student_report_summary": student_report_summary,
+	"get_report_cards_cold": report_cards_cold,
+	"get_report_card_warm": report_card_warm,
+}
+
+
+def summarize(samples):
+	wall = sorted(s.wall_time * 1000 for s in samples)
+	return {
+		"runs": len(samples),
+		"p50_ms": round(percentile(wall, 50), 2),
+		"p95_ms": round(percentile(wall, 95), 2),
+		"queries": max(s.queries for s in samples),
+		"rows": round(statistics.mean(s.rows for s in samples)),
+		"db_time_ms": round(statistics.mean(s.db_time * 1000 for s in samples), 2),
+	}
+
+
+def percentile(ordered, pct):
+	"""Nearest-rank percentile of an ascending list."""
+	if not ordered:
+		return 0
+
+	return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def compare(results, baseline, tolerance):
+	regressions = []
+	for name, result in results.items():
+		base = baseline.get(name)
+		if not base:
+			continue
+
+		if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+			regressions.append(f"{name}: p95 {base['p95_ms']} ms -> {result['p95_ms']} ms")
+		if result["queries"] > base["queries"]:
+			regressions.append(f"{name}: queries {base['queries']} -> {result['queries']}")
+
+	return regressions
+
+
+def load_baseline():
+	path = get_baseline_path()
+	if not os.path.exists(path):
+		return {}
+
+	with open(path) as file:
+		return json.load(file)
+
+
+def get_baseline_path():
+	return frappe.get_site_path(BASELINE_FILE)
+
+
+def print_results(results, baseline, regressions):
+	print(f"{'scenario':<30}{'p50 ms':>10}{'p95 ms':>10}{'base p95':>10}{'queries':>9}{'rows':>9}")
+	for name, r in results.items():
+		base = baseline.get(name, {}).get("p95_ms", "-")
+		print(f"{name:<30}{r['p50_ms']:>10}{r['p95_ms']:>10}{base:>10}{r['queries']:>9}{r['rows']:>9}")
+
+	for regression in regressions:
+		print(f"REGRESSION {regression}")
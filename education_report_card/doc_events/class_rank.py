@@ -0,0 +1,15 @@
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import (
+	queue_class_ranks,
+)
+
+
+def queue_student_report_ranks(doc, method=None):
+	"""Student Report: re-rank the program of the report (before and after the change)."""
+	keys = {(doc.program, doc.academic_year)}
+
+	doc_before_save = doc.get_doc_before_save()
+	if doc_before_save:
+		keys.add((doc_before_save.program, doc_before_save.academic_year))
+
+	for program, academic_year in keys:
+		queue_class_ranks(program, academic_year)
@@ -0,0 +1,8 @@
+import frappe
+
+from education_report_card.education_report.company_header import clear_company_header_cache
+
+
+def clear_cache(doc, method=None):
+	"""Company / Global Defaults: the report card header may show another name, logo or company."""
+	frappe.db.after_commit.add(clear_company_header_cache)
@@ -0,0 +1,15 @@
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	queue_course_rollups,
+)
+
+
+def queue_student_report_rollups(doc, method=None):
+	"""Student Report: re-aggregate the rollups of its class (before and after the change)."""
+	keys = {(doc.program, doc.academic_year, doc.course)}
+
+	doc_before_save = doc.get_doc_before_save()
+	if doc_before_save:
+		keys.add((doc_before_save.program, doc_before_save.academic_year, doc_before_save.course))
+
+	for program, academic_year, course in keys:
+		queue_course_rollups(program, academic_year, course)
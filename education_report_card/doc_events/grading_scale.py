@@ -0,0 +1,8 @@
+import frappe
+
+from education_report_card.education_report.grading_scale import clear_grading_scale_cache
+
+
+def clear_cache(doc, method=None):
+	"""Drop the cached intervals once the change is committed, so no reader can re-cache the old ones."""
+	frappe.db.after_commit.add(lambda: clear_grading_scale_cache(doc.name))
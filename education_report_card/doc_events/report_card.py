@@ -0,0 +1,29 @@
+import frappe
+
+from education_report_card.education_report.card_cache import clear_report_card_cache
+
+
+def clear_student_card(doc, method=None):
+	"""Student Report / Term Comment: drop the cached card of the student (before and after the change)."""
+	keys = {(doc.program, doc.academic_year, doc.student)}
+
+	doc_before_save = doc.get_doc_before_save()
+	if doc_before_save:
+		keys.add((doc_before_save.program, doc_before_save.academic_year, doc_before_save.student))
+
+	def clear():
+		for program, academic_year, student in keys:
+			clear_report_card_cache(program, academic_year, [student])
+
+	frappe.db.after_commit.add(clear)
+
+
+def clear_program_cards(doc, method=None):
+	"""Director Message: its text is part of every card of the program."""
+	keys = {(doc.program, doc.academic_year)}
+
+	doc_before_save = doc.get_doc_before_save()
+	if doc_before_save:
+		keys.add((doc_before_save.program, doc_before_save.academic_year))
+
+	frappe.db.after_commit.add(lambda: [clear_report_card_cache(*key) for key in keys])
@@ -0,0 +1,40 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Multi-row inserts that bypass the document layer.
+
+Rows get the standard columns a document insert would set (name, owner,
+modified_by, creation, modified, docstatus) unless they carry their own, and
+are written with `frappe.db.bulk_insert`. No controller hooks run, so callers
+take care of derived data such as caches themselves.
+"""
+
+import frappe
+from frappe.utils import now
+
+
+def get_standard_fields():
+	"""Standard columns of a new row, stamped now by the session user."""
+	timestamp = now()
+	user = frappe.session.user
+
+	return {
+		"name": frappe.generate_hash(length=10),
+		"owner": user,
+		"modified_by": user,
+		"creation": timestamp,
+		"modified": timestamp,
+		"docstatus": 0,
+	}
+
+
+def bulk_insert_rows(doctype, rows):
+	"""Insert `rows` (dicts with the same keys) into `doctype`, filling in the standard columns."""
+	if not rows:
+		return
+
+	standard = get_standard_fields()
+	rows = [{**standard, "name": frappe.generate_hash(length=10), **row} for row in rows]
+	fields = list(rows[0])
+	frappe.db.bulk_insert(doctype, fields, [tuple(row.get(field) for field in fields) for row in rows])
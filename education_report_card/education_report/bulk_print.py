@@ -0,0 +1,301 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Server-side report card printing for a whole program.
+
+The students of a program / academic year are split into chunks, each chunk is
+rendered to PDF by its own background job (so the work spreads over the
+available workers) and a final job merges the chunk files into one PDF, or
+into one zip holding a PDF per student.
+"""
+
+import copy
+import io
+import zipfile
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+from frappe.utils.pdf import get_pdf
+
+from education_report_card.education_report.card_cache import get_cached_report_cards
+from education_report_card.education_report.company_header import get_company_header
+from education_report_card.education_report.grading import TERMS
+
+BATCH_KEY = "report_card_pdf_batch"
+TEMPLATE = "education_report_card/templates/report_card.html"
+BATCH_TTL = 60 * 60 * 24
+
+
+@frappe.whitelist()
+def enqueue_report_card_pdfs(academic_year, program, output="pdf", chunk_size=25):
+	"""Start rendering the report cards of every student of a program. Returns the batch state."""
+	frappe.has_permission("Student Report", "print", throw=True)
+
+	if output not in ("pdf", "zip"):
+		frappe.throw(_("Output must be either pdf or zip."))
+
+	students = frappe.get_all(
+		"Student Report",
+		filters={"academic_year": academic_year, "program": program, "docstatus": ["<", 2]},
+		pluck="student",
+		distinct=True,
+		order_by="student asc",
+	)
+	if not students:
+		frappe.throw(_("No Student Reports found for {0} in {1}.").format(program, academic_year))
+
+	chunk_size = max(cint(chunk_size), 1)
+	chunks = [students[i : i + chunk_size] for i in range(0, len(students), chunk_size)]
+
+	batch = frappe._dict(
+		batch_id=frappe.generate_hash(length=12),
+		academic_year=academic_year,
+		program=program,
+		output=output,
+		user=frappe.session.user,
+		total_students=len(students),
+		total_chunks=len(chunks),
+		status="Queued",
+		file_url=None,
+		error=None,
+	)
+	save_batch(batch)
+
+	for index, chunk in enumerate(chunks):
+		frappe.enqueue(
+			"education_report_card.education_report.bulk_print.render_chunk",
+			queue="long",
+			timeout=1500,
+			batch_id=batch.batch_id,
+			index=index,
+			students=chunk,
+		)
+
+	return batch
+
+
+@frappe.whitelist()
+def get_report_card_pdf_status(batch_id):
+	batch = get_batch(batch_id)
+	if batch.user != frappe.session.user:
+		frappe.has_permission("Student Report", "print", throw=True)
+
+	return {**batch, "completed_chunks": get_completed_chunks(batch_id)}
+
+
+def get_batch(batch_id):
+	batch = frappe.cache.get_value(batch_key(batch_id))
+	if not batch:
+		frappe.throw(_("Report card batch {0} not found or expired.").format(batch_id))
+
+	return frappe._dict(batch)
+
+
+def save_batch(batch):
+	frappe.cache.set_value(batch_key(batch.batch_id), batch, expires_in_sec=BATCH_TTL)
+
+
+def fail_batch(batch):
+	"""Record the error of a chunk or of the merge on the batch and tell the user."""
+	frappe.db.rollback()
+	error_log = frappe.log_error(title=_("Report card PDF batch failed"))
+	frappe.db.commit()
+
+	batch.update({"status": "Failed", "error": _("See Error Log {0}").format(error_log.name)})
+	save_batch(batch)
+	frappe.publish_realtime("report_card_pdf_failed", batch, user=batch.user)
+
+
+def render_chunk(batch_id, index, students):
+	"""Render one chunk of students and store it as a private file."""
+	batch = get_batch(batch_id)
+	if batch.status == "Failed":
+		return
+
+	if batch.status == "Queued":
+		batch.status = "Rendering"
+		save_batch(batch)
+
+	try:
+		cards, context = get_print_context(batch.academic_year, batch.program, students)
+
+		if batch.output == "zip":
+			content = make_zip(
+				{f"{card['student']}.pdf": render_pdf({**context, "cards": [card]}) for card in cards}
+			)
+		else:
+			content = render_pdf({**context, "cards": cards})
+
+		file_doc = save_file(f"report-cards-{batch_id}-{index:04d}.{batch.output}", content)
+		frappe.cache.hset(chunk_key(batch_id), str(index), file_doc.name)
+		frappe.cache.expire(frappe.cache.make_key(chunk_key(batch_id)), BATCH_TTL)
+		frappe.db.commit()
+	except Exception:
+		fail_batch(batch)
+		return
+
+	completed = get_completed_chunks(batch_id)
+	frappe.publish_realtime(
+		"report_card_pdf_progress",
+		{"batch_id": batch_id, "completed": completed, "total": batch.total_chunks},
+		user=batch.user,
+	)
+
+	# only the job finishing the last chunk sees the full count
+	if completed == batch.total_chunks and frappe.cache.set(
+		frappe.cache.make_key(f"report_card_pdf_merge::{batch_id}"), 1, nx=True, ex=BATCH_TTL
+	):
+		frappe.enqueue(
+			"education_report_card.education_report.bulk_print.merge_chunks",
+			queue="long",
+			timeout=1500,
+			batch_id=batch_id,
+		)
+
+
+def merge_chunks(batch_id):
+	"""Merge the chunk files of a batch into the final PDF / zip."""
+	batch = get_batch(batch_id)
+	try:
+		merge_chunk_files(batch)
+	except Exception:
+		fail_batch(batch)
+
+
+def merge_chunk_files(batch):
+	from pypdf import PdfReader, PdfWriter
+
+	batch_id = batch.batch_id
+	batch.status = "Merging"
+	save_batch(batch)
+	chunk_files = frappe.cache.hgetall(chunk_key(batch_id))
+	ordered = [
+		frappe.get_doc("File", chunk_files[key])
+		for key in sorted(chunk_files, key=lambda k: cint(frappe.safe_decode(k)))
+	]
+
+	if batch.output == "zip":
+		files = {}
+		for file_doc in ordered:
+			with zipfile.ZipFile(io.BytesIO(file_doc.get_content())) as chunk_zip:
+				files.update({name: chunk_zip.read(name) for name in chunk_zip.namelist()})
+		content = make_zip(files)
+	else:
+		writer = PdfWriter()
+		for file_doc in ordered:
+			writer.append(PdfReader(io.BytesIO(file_doc.get_content())))
+		output = io.BytesIO()
+		writer.write(output)
+		content = output.getvalue()
+
+	final_file = save_file(f"report-cards-{batch.program}-{batch.academic_year}.{batch.output}", content)
+
+	for file_doc in ordered:
+		file_doc.delete(ignore_permissions=True)
+
+	frappe.db.commit()
+	batch.update({"status": "Completed", "file_url": final_file.file_url})
+	save_batch(batch)
+	frappe.cache.delete_value(chunk_key(batch_id))
+
+	frappe.publish_realtime("report_card_pdf_ready", batch, user=batch.user)
+
+
+def get_print_context(academic_year, program, students=None, term=None):
+	"""
+	Report cards of `students` prepared for the print template, plus the shared context.
+	With a `term` the cards are term-end cards, showing nothing of the terms after it.
+	"""
+	payload = get_cached_report_cards(academic_year, program, students)
+	cards = [prepare_card(scope_card_to_term(card, term) if term else card) for card in payload["students"]]
+
+	return cards, {
+		"company": get_company_header(),
+		"director_message": frappe._dict(payload["director_message"]),
+	}
+
+
+def prepare_card(card):
+	"""Precompute the display flags the browser print flow derives on the fly."""
+	for course in card["courses"]:
+		summary = course["summary"]
+		for topic in course["topics"]:
+			topic["valid_competencies"] = [
+				c for c in topic["competencies"] if c["competency"] and c["competency"].strip()
+			]
+		course["has_competency"] = any(topic["valid_competencies"] for topic in course["topics"])
+		course["has_marks"] = any(
+			flt(v)
+			for v in (
+				*summary["coursework"],
+				*summary["unit_test"],
+				*summary["exam"],
+				*summary["trimester_total"],
+			)
+		)
+
+	averages = card["term_averages"]
+	positive = [flt(averages[f"term{i}_avg"]) for i in (1, 2, 3) if flt(averages[f"term{i}_avg"]) > 0]
+	card["yearly_average"] = sum(positive) / len(positive) if positive else 0
+
+	return card
+
+
+def scope_card_to_term(card, term):
+	"""
+	A copy of `card` with the marks, competencies, averages, positions and comments of the
+	terms after `term` blanked. Yearly figures are kept as stored: they cover the year so far.
+	"""
+	card = copy.deepcopy(card)
+	later = range(TERMS.index(term) + 1, len(TERMS))
+
+	for course in card["courses"]:
+		for topic in course["topics"]:
+			for competency in topic["competencies"]:
+				for index in later:
+					competency[f"term{index + 1}"] = ""
+		for values in ("coursework", "unit_test", "exam", "trimester_total"):
+			for index in later:
+				course["summary"][values][index] = 0
+
+	for index in later:
+		period = f"term{index + 1}"
+		card["term_averages"][f"{period}_avg"] = 0
+		card["ranking"][period] = dict.fromkeys(card["ranking"][period])
+		card["comments"]["teacher"][period] = ""
+		card["comments"]["director"][period] = ""
+
+	return card
+
+
+def render_pdf(context):
+	return get_pdf(frappe.render_template(TEMPLATE, context))
+
+
+def make_zip(files):
+	output = io.BytesIO()
+	with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+		for name, content in files.items():
+			archive.writestr(name, content)
+
+	return output.getvalue()
+
+
+def save_file(file_name, content):
+	return frappe.get_doc(
+		{"doctype": "File", "file_name": file_name, "is_private": 1, "content": content}
+	).insert(ignore_permissions=True)
+
+
+def get_completed_chunks(batch_id):
+	return len(frappe.cache.hkeys(chunk_key(batch_id)))
+
+
+def batch_key(batch_id):
+	return f"{BATCH_KEY}::{batch_id}"
+
+
+def chunk_key(batch_id):
+	return f"report_card_pdf_chunks::{batch_id}"
@@ -0,0 +1,111 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Redis cache of report card payloads.
+
+One hash per program / academic year holds the card of each student (as built
+by `build_report_cards`), the shared director message and the list of students
+with a card. Repeated views are served from the hash without touching the
+database; the hooks in `doc_events.report_card` drop exactly the entries a
+saved document can change, once its transaction has committed.
+"""
+
+import frappe
+from frappe.utils import cint
+
+STATS_KEY = "report_card_cache_stats"
+STUDENTS_FIELD = "::students"
+DIRECTOR_MESSAGE_FIELD = "::director_message"
+
+
+def get_cached_report_cards(academic_year, program, students=None, course=None):
+	"""Same payload as `build_report_cards`, served from the cache where possible."""
+	from education_report_card.education_report.page.student_report_card.student_report_card import (
+		build_report_cards,
+		load_director_message,
+	)
+
+	key = get_cache_key(program, academic_year)
+	cached = {frappe.safe_decode(field): value for field, value in frappe.cache.hgetall(key).items()}
+
+	if students is None:
+		students = cached.get(STUDENTS_FIELD)
+
+	if students is None:
+		# first view of the program: build and cache every card at once
+		payload = build_report_cards(academic_year, program)
+		built = {card["student"]: card for card in payload["students"]}
+		students = list(built)
+		missing = students
+		frappe.cache.hset(key, STUDENTS_FIELD, students)
+	else:
+		missing = [s for s in students if s not in cached]
+		payload = build_report_cards(academic_year, program, missing) if missing else None
+		built = {card["student"]: card for card in payload["students"]} if payload else {}
+
+	# students without a card are cached as empty so they are not looked up again
+	for student in missing:
+		cached[student] = built.get(student, {})
+		frappe.cache.hset(key, student, cached[student])
+
+	if DIRECTOR_MESSAGE_FIELD not in cached:
+		cached[DIRECTOR_MESSAGE_FIELD] = (
+			payload["director_message"] if payload else load_director_message(academic_year, program)
+		)
+		frappe.cache.hset(key, DIRECTOR_MESSAGE_FIELD, cached[DIRECTOR_MESSAGE_FIELD])
+
+	count_lookup(hits=len(students) - len(missing), misses=len(missing))
+
+	cards = [filter_card(cached[s], course) for s in students if cached.get(s)]
+	return {"director_message": cached[DIRECTOR_MESSAGE_FIELD], "students": [c for c in cards if c]}
+
+
+def filter_card(card, course=None):
+	if not course:
+		return card
+
+	courses = [c for c in card["courses"] if c["course"] == course]
+	return {**card, "courses": courses} if courses else None
+
+
+def clear_report_card_cache(program, academic_year, students=None):
+	"""Drop the cards of `students`, or the whole program / academic year when not given."""
+	key = get_cache_key(program, academic_year)
+	if students is None:
+		frappe.cache.delete_value(key)
+		return
+
+	# a new report may add a student to the program listing
+	for field in {STUDENTS_FIELD, *students}:
+		frappe.cache.hdel(key, field)
+
+
+def count_lookup(hits=0, misses=0):
+	stats_key = frappe.cache.make_key(STATS_KEY)
+	if hits:
+		frappe.cache.hincrby(stats_key, "hits", hits)
+	if misses:
+		frappe.cache.hincrby(stats_key, "misses", misses)
+
+
+@frappe.whitelist()
+def get_report_card_cache_stats(reset=False):
+	"""Hit / miss counters of the report card cache since the last reset."""
+	frappe.only_for(["System Manager", "Education Manager"])
+
+	stats_key = frappe.cache.make_key(STATS_KEY)
+	hits, misses = (cint(v) for v in frappe.cache.hmget(stats_key, ["hits", "misses"]))
+
+	if frappe.parse_json(reset):
+		frappe.cache.delete(stats_key)
+
+	return {
+		"hits": hits,
+		"misses": misses,
+		"hit_rate": round(hits / (hits + misses) * 100, 2) if hits + misses else 0,
+	}
+
+
+def get_cache_key(program, academic_year):
+	return f"report_card_payloads::{program}::{academic_year}"
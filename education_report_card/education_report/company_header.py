@@ -0,0 +1,100 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Cached company header of the report cards.
+
+The default company, its name and logo URL, and the logo inlined as a data URI
+(scaled down to the size it is printed at) are kept in Redis. Printing a batch
+of cards embeds the logo without any request for the image, which the PDF
+renderer would otherwise make once per card. The hooks in
+`doc_events.company_header` drop the entry when a Company or Global Defaults
+is saved.
+"""
+
+import base64
+import io
+import mimetypes
+
+import frappe
+
+CACHE_KEY = "report_card_company_header"
+DEFAULT_COMPANY_NAME = "Unknown Company"
+
+# twice the 120px the cards print the logo at, sharp enough for PDF output
+LOGO_SIZE = (240, 240)
+
+
+def get_company_header():
+	"""{"company", "company_name", "company_logo" (URL), "company_logo_data" (data URI or "")}."""
+	return frappe.cache.get_value(CACHE_KEY, generator=load_company_header)
+
+
+def load_company_header():
+	company = frappe.db.get_single_value("Global Defaults", "default_company")
+	values = (
+		frappe.db.get_value("Company", company, ["company_name", "company_logo"], as_dict=True)
+		if company
+		else None
+	)
+	if not values:
+		return {
+			"company": None,
+			"company_name": DEFAULT_COMPANY_NAME,
+			"company_logo": "",
+			"company_logo_data": "",
+		}
+
+	return {
+		"company": company,
+		"company_name": values.company_name,
+		"company_logo": values.company_logo or "",
+		"company_logo_data": get_logo_data_uri(values.company_logo),
+	}
+
+
+def get_logo_data_uri(file_url):
+	"""The logo as a data URI, scaled down to LOGO_SIZE; "" for external or unreadable files."""
+	if not file_url or not file_url.startswith("/"):
+		return ""
+
+	try:
+		file_doc = frappe.get_doc("File", {"file_url": file_url})
+		content = file_doc.get_content()
+		if isinstance(content, str):
+			content = content.encode()
+		mime_type = mimetypes.guess_type(file_doc.file_name or file_url)[0] or "image/png"
+		content, mime_type = shrink_image(content, mime_type)
+	except Exception:
+		frappe.log_error(title="Report card logo could not be inlined")
+		return ""
+
+	return f"data:{mime_type};base64,{base64.b64encode(content).decode()}"
+
+
+def shrink_image(content, mime_type):
+	"""Scale a raster image down to LOGO_SIZE; the original is kept when it is smaller already."""
+	if mime_type == "image/svg+xml":
+		return content, mime_type
+
+	from PIL import Image
+
+	with Image.open(io.BytesIO(content)) as image:
+		if image.width <= LOGO_SIZE[0] and image.height <= LOGO_SIZE[1]:
+			return content, mime_type
+
+		image.thumbnail(LOGO_SIZE)
+		output = io.BytesIO()
+		if image.mode in ("RGBA", "LA", "P"):
+			# keeps the transparency of the logo
+			image.save(output, format="PNG", optimize=True)
+			shrunk = (output.getvalue(), "image/png")
+		else:
+			image.convert("RGB").save(output, format="JPEG", quality=85, optimize=True)
+			shrunk = (output.getvalue(), "image/jpeg")
+
+	return shrunk if len(shrunk[0]) < len(content) else (content, mime_type)
+
+
+def clear_company_header_cache():
+	frappe.cache.delete_value(CACHE_KEY)
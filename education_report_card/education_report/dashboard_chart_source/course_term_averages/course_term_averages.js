@@ -0,0 +1,22 @@
+// Copyright (c) 2025, Yeshiwas D. and contributors
+// For license information, please see license.txt
+
+frappe.provide("frappe.dashboards.chart_sources");
+
+frappe.dashboards.chart_sources["Course Term Averages"] = {
+	method: "education_report_card.education_report.dashboard_chart_source.course_term_averages.course_term_averages.get",
+	filters: [
+		{
+			fieldname: "academic_year",
+			label: __("Academic Year"),
+			fieldtype: "Link",
+			options: "Academic Year",
+		},
+		{
+			fieldname: "program",
+			label: __("Program/Grade"),
+			fieldtype: "Link",
+			options: "Program",
+		},
+	],
+};
@@ -0,0 +1,39 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	PERIOD_FIELDS,
+	get_rollups,
+)
+
+
+@frappe.whitelist()
+def get(chart_name=None, chart=None, no_cache=None, filters=None, **kwargs):
+	"""Average mark per course of an academic year, one dataset per term."""
+	filters = frappe.parse_json(filters or {})
+	filters.pop("term", None)
+	rows = get_rollups(filters, ["course", "term", "total_mark", "graded_count"])
+
+	# several programs may share a course: weight by graded reports
+	totals = {}
+	for row in rows:
+		total = totals.setdefault((row.course, row.term), [0.0, 0])
+		total[0] += row.total_mark
+		total[1] += row.graded_count
+
+	courses = sorted({row.course for row in rows})
+	return {
+		"labels": courses,
+		"datasets": [
+			{
+				"name": term,
+				"values": [
+					round(total / graded, 2) if graded else 0
+					for total, graded in (totals.get((course, term), (0, 0)) for course in courses)
+				],
+			}
+			for term in PERIOD_FIELDS
+		],
+	}
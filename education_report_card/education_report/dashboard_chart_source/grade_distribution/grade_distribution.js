@@ -0,0 +1,35 @@
+// Copyright (c) 2025, Yeshiwas D. and contributors
+// For license information, please see license.txt
+
+frappe.provide("frappe.dashboards.chart_sources");
+
+frappe.dashboards.chart_sources["Grade Distribution"] = {
+	method: "education_report_card.education_report.dashboard_chart_source.grade_distribution.grade_distribution.get",
+	filters: [
+		{
+			fieldname: "academic_year",
+			label: __("Academic Year"),
+			fieldtype: "Link",
+			options: "Academic Year",
+		},
+		{
+			fieldname: "program",
+			label: __("Program/Grade"),
+			fieldtype: "Link",
+			options: "Program",
+		},
+		{
+			fieldname: "course",
+			label: __("Course/Subject"),
+			fieldtype: "Link",
+			options: "Course",
+		},
+		{
+			fieldname: "term",
+			label: __("Term"),
+			fieldtype: "Select",
+			options: ["Term 1", "Term 2", "Term 3", "Yearly"],
+			default: "Yearly",
+		},
+	],
+};
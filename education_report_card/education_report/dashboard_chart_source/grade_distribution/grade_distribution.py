@@ -0,0 +1,27 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe import _
+
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import get_rollups
+
+
+@frappe.whitelist()
+def get(chart_name=None, chart=None, no_cache=None, filters=None, **kwargs):
+	"""Number of reports per grade for a term (default: the yearly grade)."""
+	filters = frappe.parse_json(filters or {})
+	filters.setdefault("term", "Yearly")
+	rows = get_rollups(filters, ["grade_distribution"])
+
+	counts = {}
+	for row in rows:
+		for grade, count in json.loads(row.grade_distribution or "{}").items():
+			counts[grade] = counts.get(grade, 0) + count
+
+	return {
+		"labels": list(counts),
+		"datasets": [{"name": _("Student Reports"), "values": list(counts.values())}],
+	}
@@ -0,0 +1,22 @@
+// Copyright (c) 2025, Yeshiwas D. and contributors
+// For license information, please see license.txt
+
+frappe.provide("frappe.dashboards.chart_sources");
+
+frappe.dashboards.chart_sources["Yearly Average Trend"] = {
+	method: "education_report_card.education_report.dashboard_chart_source.yearly_average_trend.yearly_average_trend.get",
+	filters: [
+		{
+			fieldname: "program",
+			label: __("Program/Grade"),
+			fieldtype: "Link",
+			options: "Program",
+		},
+		{
+			fieldname: "course",
+			label: __("Course/Subject"),
+			fieldtype: "Link",
+			options: "Course",
+		},
+	],
+};
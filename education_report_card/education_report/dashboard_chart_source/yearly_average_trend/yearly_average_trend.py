@@ -0,0 +1,51 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.query_builder.functions import Sum
+from frappe.utils import flt
+
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import PERIOD_FIELDS
+
+
+@frappe.whitelist()
+def get(chart_name=None, chart=None, no_cache=None, filters=None, **kwargs):
+	"""Average mark per academic year, one dataset per term, for year over year comparison."""
+	filters = frappe.parse_json(filters or {})
+	frappe.has_permission("Course Term Rollup", throw=True)
+
+	rollup = frappe.qb.DocType("Course Term Rollup")
+	year = frappe.qb.DocType("Academic Year")
+	query = (
+		frappe.qb.from_(rollup)
+		.inner_join(year)
+		.on(year.name == rollup.academic_year)
+		.select(
+			rollup.academic_year,
+			rollup.term,
+			Sum(rollup.total_mark).as_("total_mark"),
+			Sum(rollup.graded_count).as_("graded_count"),
+		)
+		.groupby(rollup.academic_year, rollup.term, year.year_start_date)
+		.orderby(year.year_start_date)
+	)
+	for field in ("program", "course"):
+		if filters.get(field):
+			query = query.where(rollup[field] == filters[field])
+
+	averages = {}
+	years = []
+	for row in query.run(as_dict=True):
+		if row.academic_year not in years:
+			years.append(row.academic_year)
+		averages[(row.academic_year, row.term)] = (
+			round(flt(row.total_mark) / flt(row.graded_count), 2) if row.graded_count else 0
+		)
+
+	return {
+		"labels": years,
+		"datasets": [
+			{"name": term, "values": [averages.get((year_name, term), 0) for year_name in years]}
+			for term in PERIOD_FIELDS
+		],
+	}
@@ -0,0 +1,155 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt
+
+from education_report_card.education_report.bulk import get_standard_fields
+
+KEY_FIELDS = ("academic_year", "program", "course", "term", "test_type")
+SUM_FIELDS = ("sum_marks", "sum_possible", "sum_percentage")
+
+
+class ClassTestStatistic(Document):
+	pass
+
+
+def update_class_test_statistics(test_result):
+	"""
+	Fold a newly submitted Test Result into the statistics of its class.
+	Counts and sums are incremented in place and min / max widened, by one upsert on the
+	unique key of the group, so concurrent first submissions share a single row.
+	"""
+	possible = flt(test_result.possible_mark)
+	marks = [flt(td.mark_earned) for td in test_result.test_detail]
+	if not marks:
+		return
+
+	values = {
+		"entry_count": len(marks),
+		"sum_marks": sum(marks),
+		"sum_possible": possible * len(marks),
+		"sum_percentage": sum(m / possible * 100 for m in marks) if possible else 0,
+		"min_mark": min(marks),
+		"max_mark": max(marks),
+	}
+	upsert_statistic(get_key(test_result), values, increment=True)
+
+
+def refresh_class_test_statistic(academic_year, program, course, term, test_type):
+	"""
+	Recompute one group from the submitted Test Results.
+	Used for cancellations and edits, where min / max cannot be derived from a delta.
+	"""
+	key = {
+		"academic_year": academic_year,
+		"program": program,
+		"course": course,
+		"term": term,
+		"test_type": test_type,
+	}
+
+	row = frappe.db.sql(
+		"""
+		SELECT
+			COUNT(*) AS entry_count,
+			SUM(td.mark_earned) AS sum_marks,
+			SUM(tr.possible_mark) AS sum_possible,
+			SUM(td.mark_earned / NULLIF(tr.possible_mark, 0) * 100) AS sum_percentage,
+			MIN(td.mark_earned) AS min_mark,
+			MAX(td.mark_earned) AS max_mark
+		FROM `tabTest Result` tr
+		INNER JOIN `tabTest Result Detail` td ON td.parent = tr.name
+		WHERE tr.docstatus = 1
+			AND tr.academic_year = %(academic_year)s
+			AND tr.program = %(program)s
+			AND tr.course = %(course)s
+			AND tr.term = %(term)s
+			AND tr.test_type = %(test_type)s
+		""",
+		key,
+		as_dict=True,
+	)[0]
+
+	if not row.entry_count:
+		frappe.db.delete("Class Test Statistic", key)
+		return
+
+	values = {field: flt(row[field]) for field in (*SUM_FIELDS, "min_mark", "max_mark")}
+	values["entry_count"] = row.entry_count
+	upsert_statistic(key, values)
+
+
+def upsert_statistic(key, values, increment=False):
+	"""
+	Insert the row of a group, or update it when the unique key of the group exists already:
+	adding `values` to the count and sums and widening min / max when `increment` is set,
+	replacing them otherwise.
+	"""
+	row = {**get_standard_fields(), **key, **values}
+
+	if increment:
+		updates = [f"`{field}` = `{field}` + VALUES(`{field}`)" for field in ("entry_count", *SUM_FIELDS)]
+		updates += [
+			"min_mark = LEAST(min_mark, VALUES(min_mark))",
+			"max_mark = GREATEST(max_mark, VALUES(max_mark))",
+		]
+	else:
+		updates = [f"`{field}` = VALUES(`{field}`)" for field in values]
+	updates += ["modified = VALUES(modified)", "modified_by = VALUES(modified_by)"]
+
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabClass Test Statistic` ({columns})
+		VALUES ({values})
+		ON DUPLICATE KEY UPDATE {updates}
+		""".format(
+			columns=", ".join(f"`{field}`" for field in row),
+			values=", ".join(f"%({field})s" for field in row),
+			updates=", ".join(updates),
+		),
+		row,
+	)
+
+
+def delete_duplicate_statistics():
+	"""Recompute the groups stored more than once, so the unique index of the key can be added."""
+	duplicates = frappe.db.sql(
+		"""
+		SELECT academic_year, program, course, term, test_type
+		FROM `tabClass Test Statistic`
+		GROUP BY academic_year, program, course, term, test_type
+		HAVING COUNT(*) > 1
+		""",
+		as_dict=True,
+	)
+	for group in duplicates:
+		frappe.db.delete("Class Test Statistic", group)
+		refresh_class_test_statistic(**group)
+
+
+def rebuild_class_test_statistics(academic_year=None, program=None):
+	"""Recompute every group (optionally of one academic year and / or program) from scratch."""
+	scope = {}
+	if academic_year:
+		scope["academic_year"] = academic_year
+	if program:
+		scope["program"] = program
+
+	groups = frappe.get_all(
+		"Test Result", filters={"docstatus": 1, **scope}, fields=list(KEY_FIELDS), distinct=True
+	)
+
+	stale = frappe.get_all("Class Test Statistic", filters=scope, fields=["name", *KEY_FIELDS])
+	live = {tuple(g[f] for f in KEY_FIELDS) for g in groups}
+	for statistic in stale:
+		if tuple(statistic[f] for f in KEY_FIELDS) not in live:
+			frappe.delete_doc("Class Test Statistic", statistic.name, ignore_permissions=True, force=True)
+
+	for group in groups:
+		refresh_class_test_statistic(**group)
+
+
+def get_key(test_result):
+	return {field: test_result.get(field) for field in KEY_FIELDS}
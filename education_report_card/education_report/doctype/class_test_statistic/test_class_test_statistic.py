@@ -0,0 +1,115 @@
+# Copyright (c) 2025, Yeshiwas D. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from education_report_card.benchmark.dataset import delete_school
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	rebuild_class_test_statistics,
+)
+from education_report_card.education_report.doctype.test_result.test_test_result import (
+	make_test_result,
+	make_test_school,
+)
+
+PREFIX = "TESTSTATS"
+STATISTIC_FIELDS = ["entry_count", "sum_marks", "sum_possible", "sum_percentage", "min_mark", "max_mark"]
+
+
+class TestClassTestStatistic(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.school = make_test_school(PREFIX)
+
+	@classmethod
+	def tearDownClass(cls):
+		frappe.db.rollback()
+		delete_school(PREFIX)
+		super().tearDownClass()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_statistic(self, term="Term 1", test_type="Exam"):
+		rows = frappe.get_all(
+			"Class Test Statistic",
+			filters={
+				"academic_year": self.school.academic_year,
+				"program": self.school.program,
+				"course": self.school.course,
+				"term": term,
+				"test_type": test_type,
+			},
+			fields=STATISTIC_FIELDS,
+		)
+		self.assertEqual(len(rows), 1)
+		return rows[0]
+
+	def assertStatistic(self, statistic, expected):
+		for field in STATISTIC_FIELDS:
+			self.assertAlmostEqual(statistic[field], expected[field], places=4, msg=field)
+
+	def added(self, before, marks, possible_mark):
+		return {
+			"entry_count": before.entry_count + len(marks),
+			"sum_marks": before.sum_marks + sum(marks),
+			"sum_possible": before.sum_possible + possible_mark * len(marks),
+			"sum_percentage": before.sum_percentage + sum(m / possible_mark * 100 for m in marks),
+			"min_mark": min(before.min_mark, *marks),
+			"max_mark": max(before.max_mark, *marks),
+		}
+
+	def test_submit_adds_the_marks(self):
+		before = self.get_statistic()
+		make_test_result(self.school, [0, 25, 50])
+
+		self.assertStatistic(self.get_statistic(), self.added(before, [0, 25, 50], 50))
+
+	def test_cancel_removes_the_marks(self):
+		before = self.get_statistic()
+		make_test_result(self.school, [10, 20, 30]).cancel()
+
+		self.assertStatistic(self.get_statistic(), before)
+
+	def test_edit_moves_the_marks_to_another_group(self):
+		term1, term2 = self.get_statistic("Term 1"), self.get_statistic("Term 2")
+		test_result = make_test_result(self.school, [10, 20, 30])
+
+		test_result.term = "Term 2"
+		test_result.save()
+
+		self.assertStatistic(self.get_statistic("Term 1"), term1)
+		self.assertStatistic(self.get_statistic("Term 2"), self.added(term2, [10, 20, 30], 50))
+
+	def test_edit_of_a_mark(self):
+		before = self.get_statistic()
+		test_result = make_test_result(self.school, [10, 20, 30])
+
+		test_result.test_detail[0].mark_earned = 40
+		test_result.save()
+
+		self.assertStatistic(self.get_statistic(), self.added(before, [40, 20, 30], 50))
+
+	def test_rebuild_gives_the_same_figures(self):
+		make_test_result(self.school, [10, 20, 30])
+		make_test_result(self.school, [5, 15, 45], term="Term 3", test_type="Unit Test").cancel()
+		test_result = make_test_result(self.school, [50, 40, 30], test_type="Coursework")
+		test_result.term = "Term 2"
+		test_result.save()
+
+		fields = ["term", "test_type", *STATISTIC_FIELDS]
+		filters = {"academic_year": self.school.academic_year}
+		order_by = "term asc, test_type asc"
+		incremental = frappe.get_all(
+			"Class Test Statistic", filters=filters, fields=fields, order_by=order_by
+		)
+
+		rebuild_class_test_statistics(self.school.academic_year)
+		rebuilt = frappe.get_all("Class Test Statistic", filters=filters, fields=fields, order_by=order_by)
+
+		self.assertEqual(len(rebuilt), len(incremental))
+		for expected, row in zip(incremental, rebuilt, strict=True):
+			self.assertEqual((row.term, row.test_type), (expected.term, expected.test_type))
+			self.assertStatistic(row, expected)
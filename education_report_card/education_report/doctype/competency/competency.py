@@ -4,64 +4,122 @@
 import frappe
 from frappe.model.document import Document
 
+from education_report_card.education_report.link_search import search_link_values
+
+TEMPLATE_CACHE_KEY = "competency_templates"
+
 
 class Competency(Document):
-    def validate(self):
-        self.validate_course()
-        self.validate_topic()
-        self.validate_duplicated_detail()
-
-    def validate_course(self):
-        if self.program:
-            program = frappe.get_doc("Program", self.program)
-            associated_courses = [row.course for row in program.courses]  # list of course names
-            if self.course and self.course not in associated_courses:
-                frappe.throw(f"The course <b>'{self.course}'</b> is not associated with program <b>'{program.name}'</b> ")
-
-    def validate_topic(self):
-         if self.course:
-            course = frappe.get_doc("Course", self.course)
-            associated_topics = [row.topic for row in course.topics]  # list of topic names
-            if self.topic  and self.topic not in associated_topics:
-                frappe.throw(f"The topic <b>'{self.topic}'</b> is not associated with course <b>'{course.name}'</b>")
-	
-    def validate_duplicated_detail(self):
-        if self.detail:
-            seen = set()
-            for row in self.detail:
-                if row.competency_description in seen:
-                    frappe.throw(f"Duplicated competency decription <b> '{row.competency_description}' </b>")
-                seen.add(row.competency_description)
+	def validate(self):
+		self.validate_course()
+		self.validate_topic()
+		self.validate_duplicated_detail()
+
+	def validate_course(self):
+		if self.program:
+			program = frappe.get_doc("Program", self.program)
+			associated_courses = [row.course for row in program.courses]  # list of course names
+			if self.course and self.course not in associated_courses:
+				frappe.throw(
+					f"The course <b>'{self.course}'</b> is not associated with program <b>'{program.name}'</b> "
+				)
+
+	def validate_topic(self):
+		if self.course:
+			course = frappe.get_doc("Course", self.course)
+			associated_topics = [row.topic for row in course.topics]  # list of topic names
+			if self.topic and self.topic not in associated_topics:
+				frappe.throw(
+					f"The topic <b>'{self.topic}'</b> is not associated with course <b>'{course.name}'</b>"
+				)
+
+	def validate_duplicated_detail(self):
+		if self.detail:
+			seen = set()
+			for row in self.detail:
+				if row.competency_description in seen:
+					frappe.throw(f"Duplicated competency decription <b> '{row.competency_description}' </b>")
+				seen.add(row.competency_description)
+
+	def on_update(self):
+		self.clear_template_cache()
+
+	def on_trash(self):
+		self.clear_template_cache()
+
+	def clear_template_cache(self):
+		keys = {get_template_key(self.program, self.course, self.academic_year)}
 
+		doc_before_save = self.get_doc_before_save()
+		if doc_before_save:
+			keys.add(
+				get_template_key(
+					doc_before_save.program, doc_before_save.course, doc_before_save.academic_year
+				)
+			)
+
+		# after commit, so a concurrent reader cannot cache the old rows again
+		frappe.db.after_commit.add(lambda: [frappe.cache.hdel(TEMPLATE_CACHE_KEY, key) for key in keys])
+
+
+def get_competency_template(program, course, academic_year):
+	"""
+	Topics and competencies configured for a program / course / academic year,
+	as [{"topic_name", "competency", "grading_scale"}], loaded with one query and cached.
+	"""
+	return frappe.cache.hget(
+		TEMPLATE_CACHE_KEY,
+		get_template_key(program, course, academic_year),
+		generator=lambda: load_competency_template(program, course, academic_year),
+	)
+
+
+def load_competency_template(program, course, academic_year):
+	return frappe.db.sql(
+		"""
+        SELECT
+            t.topic_name,
+            cd.competency_description AS competency,
+            cd.grading_scale
+        FROM `tabCompetency` c
+        LEFT JOIN `tabTopic` t ON t.name = c.topic
+        LEFT JOIN `tabCompetency Detail` cd
+            ON cd.parent = c.name AND cd.parenttype = 'Competency'
+        WHERE c.program = %(program)s
+          AND c.course = %(course)s
+          AND c.academic_year = %(academic_year)s
+        ORDER BY c.modified DESC, c.name, cd.idx ASC
+        """,
+		{"program": program, "course": course, "academic_year": academic_year},
+		as_dict=True,
+	)
+
+
+def get_template_key(program, course, academic_year):
+	return f"{program}::{course}::{academic_year}"
 
 
 @frappe.whitelist()
+@frappe.validate_and_sanitize_search_inputs
 def get_program_courses(doctype, txt, searchfield, start, page_len, filters):
-    program = filters.get("program")
-    if not program:
-        return []
+	program = frappe.parse_json(filters or {}).get("program")
+	if not program:
+		return []
 
-    # Fetch linked courses from child table in Program
-    courses = frappe.get_all(
-        "Program Course",  # child table of Program
-        filters={"parent": program},
-        fields=["course"],
-    )
+	# Courses from the Program Course child table of Program
+	return search_link_values(
+		"Program Course", "course", {"parent": program, "parenttype": "Program"}, txt, start, page_len
+	)
 
-    # Return as expected by Link query (list of tuples)
-    return [(c["course"],) for c in courses if txt in c["course"]]
 
 @frappe.whitelist()
+@frappe.validate_and_sanitize_search_inputs
 def get_course_topics(doctype, txt, searchfield, start, page_len, filters):
-    """Return topics linked to a given course via Course Topic child table"""
-    course = filters.get("course")
-    if not course:
-        return []
-
-    topics = frappe.get_all(
-        "Course Topic",
-        filters={"parent": course},
-        fields=["topic"]  # assuming child table field is 'topic'
-    )
-     # Return as expected by Link query (list of tuples)
-    return [(t["topic"],) for t in topics if txt in t["topic"]]
\ No newline at end of file
+	"""Return topics linked to a given course via Course Topic child table"""
+	course = frappe.parse_json(filters or {}).get("course")
+	if not course:
+		return []
+
+	return search_link_values(
+		"Course Topic", "topic", {"parent": course, "parenttype": "Course"}, txt, start, page_len
+	)
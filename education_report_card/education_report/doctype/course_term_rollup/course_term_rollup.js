@@ -0,0 +1,8 @@
+// Copyright (c) 2025, Yeshiwas D. and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Course Term Rollup", {
+// 	refresh(frm) {
+
+// 	},
+// });
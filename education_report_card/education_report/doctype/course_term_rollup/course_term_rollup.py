@@ -0,0 +1,203 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt
+
+from education_report_card.education_report.bulk import bulk_insert_rows
+from education_report_card.education_report.grading_scale import get_grade, get_grade_codes
+from education_report_card.education_report.pending_queue import PendingQueue
+
+# rollup term -> Student Report field holding the mark of the period
+PERIOD_FIELDS = {
+	"Term 1": "term1_total",
+	"Term 2": "term2_total",
+	"Term 3": "term3_total",
+	"Yearly": "yearly_average_mark",
+}
+
+PENDING_ROLLUPS = PendingQueue(
+	"course_term_rollup_pending",
+	"course_term_rollup_refresh",
+	"education_report_card.education_report.doctype.course_term_rollup.course_term_rollup.refresh_pending_rollups",
+)
+
+
+class CourseTermRollup(Document):
+	pass
+
+
+def refresh_course_rollups(program, academic_year, course=None):
+	"""
+	Replace the Course Term Rollup rows of a program / academic year (optionally one course)
+	with fresh aggregates of its Student Reports. Only the reports of that slice are read,
+	so a change to one class re-aggregates that class alone.
+	"""
+	filters = {"program": program, "academic_year": academic_year, "docstatus": ["<", 2]}
+	if course:
+		filters["course"] = course
+
+	reports = frappe.get_all(
+		"Student Report",
+		filters=filters,
+		fields=["course", "grading_scale", *PERIOD_FIELDS.values()],
+	)
+
+	courses = {}
+	for report in reports:
+		courses.setdefault(report.course, []).append(report)
+
+	rows = []
+	for course_name, course_reports in courses.items():
+		grade_codes = []
+		for scale in {r.grading_scale for r in course_reports if r.grading_scale}:
+			grade_codes.extend(code for code in get_grade_codes(scale) if code not in grade_codes)
+
+		for term, field in PERIOD_FIELDS.items():
+			marks = [(flt(r[field]), get_grade(r[field], r.grading_scale)) for r in course_reports]
+			rows.append({"course": course_name, "term": term, **summarize_marks(marks, grade_codes)})
+
+	delete_filters = {"program": program, "academic_year": academic_year}
+	if course:
+		delete_filters["course"] = course
+	frappe.db.delete("Course Term Rollup", delete_filters)
+	if not rows:
+		return
+
+	bulk_insert_rows(
+		"Course Term Rollup", [{"program": program, "academic_year": academic_year, **row} for row in rows]
+	)
+
+
+def summarize_marks(marks, grade_codes=()):
+	"""
+	Aggregate the (mark, grade) pairs of one course and period. Reports without a mark
+	for the period count as reports but not as graded.
+	The grade distribution lists `grade_codes` first, in that order.
+	"""
+	graded = [(mark, grade) for mark, grade in marks if mark > 0]
+	values = [mark for mark, _grade in graded]
+
+	distribution = dict.fromkeys(grade_codes, 0)
+	for _mark, grade in graded:
+		if grade:
+			distribution[grade] = distribution.get(grade, 0) + 1
+
+	total = sum(values)
+	return {
+		"report_count": len(marks),
+		"graded_count": len(graded),
+		"total_mark": round(total, 2),
+		"average_mark": round(total / len(values), 2) if values else 0,
+		"highest_mark": max(values, default=0),
+		"lowest_mark": min(values, default=0),
+		"grade_distribution": json.dumps(distribution),
+	}
+
+
+def queue_course_rollups(program, academic_year, course=None):
+	"""Refresh the rollups of a class in the background once the current transaction commits."""
+	if not (program and academic_year):
+		return
+
+	if frappe.flags.in_test:
+		refresh_course_rollups(program, academic_year, course)
+		return
+
+	PENDING_ROLLUPS.push_after_commit([json.dumps([program, academic_year, course])])
+
+
+def enqueue_pending_rollups():
+	"""Scheduler sweep: restart the drain job for classes left pending."""
+	PENDING_ROLLUPS.enqueue()
+
+
+def refresh_pending_rollups(keys):
+	"""One pass of the drain job: refresh each pending class once. A whole program covers its courses."""
+	classes = {}
+	for key in keys:
+		program, academic_year, course = json.loads(key)
+		group = (program, academic_year)
+		if not course:
+			classes[group] = None
+		elif classes.get(group, set()) is not None:
+			classes.setdefault(group, set()).add(course)
+
+	for (program, academic_year), courses in classes.items():
+		try:
+			for course in courses or [None]:
+				refresh_course_rollups(program, academic_year, course)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(title=_("Course term rollup failed"))
+
+
+def rebuild_course_rollups(academic_year=None):
+	"""Refresh the rollups of every program / academic year with Student Reports."""
+	filters = {"academic_year": academic_year} if academic_year else {}
+	for group in frappe.get_all(
+		"Student Report", filters=filters, fields=["program", "academic_year"], distinct=True
+	):
+		refresh_course_rollups(group.program, group.academic_year)
+
+
+def get_rollups(filters, fields):
+	"""Rollup rows for the dashboard, defaulting to the latest academic year with rollups."""
+	filters = frappe.parse_json(filters or {})
+	frappe.has_permission("Course Term Rollup", throw=True)
+
+	conditions = {
+		key: filters[key] for key in ("academic_year", "program", "course", "term") if filters.get(key)
+	}
+	if "academic_year" not in conditions:
+		academic_year = get_latest_academic_year(filters.get("program"))
+		if not academic_year:
+			return []
+		conditions["academic_year"] = academic_year
+
+	return frappe.get_all("Course Term Rollup", filters=conditions, fields=fields, order_by="course asc")
+
+
+def get_latest_academic_year(program=None):
+	rollup = frappe.qb.DocType("Course Term Rollup")
+	year = frappe.qb.DocType("Academic Year")
+	query = (
+		frappe.qb.from_(rollup)
+		.inner_join(year)
+		.on(year.name == rollup.academic_year)
+		.select(rollup.academic_year)
+		.orderby(year.year_start_date, order=frappe.qb.desc)
+		.limit(1)
+	)
+	if program:
+		query = query.where(rollup.program == program)
+
+	result = query.run()
+	return result[0][0] if result else None
+
+
+@frappe.whitelist()
+def get_yearly_average_card(filters=None):
+	"""Number card: yearly average mark over every course, weighted by graded reports."""
+	filters = {**frappe.parse_json(filters or {}), "term": "Yearly"}
+	rows = get_rollups(filters, ["total_mark", "graded_count"])
+	graded = sum(r.graded_count for r in rows)
+
+	return {
+		"value": round(sum(flt(r.total_mark) for r in rows) / graded, 2) if graded else 0,
+		"fieldtype": "Float",
+	}
+
+
+@frappe.whitelist()
+def get_student_report_count_card(filters=None):
+	"""Number card: Student Reports of the academic year."""
+	filters = {**frappe.parse_json(filters or {}), "term": "Yearly"}
+	rows = get_rollups(filters, ["report_count"])
+
+	return {"value": sum(r.report_count for r in rows), "fieldtype": "Int"}
@@ -0,0 +1,32 @@
+# Copyright (c) 2025, Yeshiwas D. and Contributors
+# See license.txt
+
+import json
+
+# import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	summarize_marks,
+)
+
+
+class TestCourseTermRollup(FrappeTestCase):
+	def test_ungraded_reports_are_counted_not_averaged(self):
+		summary = summarize_marks([(80, "A"), (60, "B"), (0, "")], ["A", "B", "C"])
+
+		self.assertEqual(summary["report_count"], 3)
+		self.assertEqual(summary["graded_count"], 2)
+		self.assertEqual(summary["average_mark"], 70)
+		self.assertEqual(summary["highest_mark"], 80)
+		self.assertEqual(summary["lowest_mark"], 60)
+		self.assertEqual(
+			list(json.loads(summary["grade_distribution"]).items()), [("A", 1), ("B", 1), ("C", 0)]
+		)
+
+	def test_empty_course(self):
+		summary = summarize_marks([])
+
+		self.assertEqual(summary["average_mark"], 0)
+		self.assertEqual(summary["highest_mark"], 0)
+		self.assertEqual(json.loads(summary["grade_distribution"]), {})
@@ -0,0 +1,46 @@
+// Copyright (c) 2025, Yeshiwas D. and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Report Card Publication", {
+	setup(frm) {
+		frappe.realtime.on("report_card_publication_progress", (data) => {
+			if (data.name === frm.doc.name && !frm.is_dirty()) {
+				frm.reload_doc();
+			}
+		});
+	},
+
+	refresh(frm) {
+		if (frm.is_new()) {
+			return;
+		}
+
+		const running = ["Queued", "Running"].includes(frm.doc.status);
+		if (!running) {
+			const label = frm.doc.status === "Draft" ? __("Start") : __("Run Again");
+			frm.add_custom_button(label, () => frm.call("start").then(() => frm.reload_doc()));
+		}
+
+		if (["Running", "Failed"].includes(frm.doc.status)) {
+			frm.add_custom_button(__("Resume"), () => frm.call("resume").then(() => frm.reload_doc()));
+		}
+
+		if (frm.doc.status !== "Draft") {
+			show_progress(frm);
+		}
+	},
+});
+
+function show_progress(frm) {
+	const counts = frm.doc.send_email
+		? __("{0} of {1} cards rendered, {2} published, {3} emails queued", [
+				frm.doc.rendered_students,
+				frm.doc.total_students,
+				frm.doc.published_students,
+				frm.doc.emails_queued,
+		  ])
+		: __("{0} of {1} cards rendered", [frm.doc.rendered_students, frm.doc.total_students]);
+
+	const stage = frm.doc.status === "Completed" ? __("Completed") : __(frm.doc.stage);
+	frm.dashboard.add_progress(__("Publication"), frm.doc.progress, `${stage}: ${counts}`);
+}
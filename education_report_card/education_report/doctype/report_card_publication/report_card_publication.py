@@ -0,0 +1,431 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import add_to_date, cint, now, now_datetime
+
+from education_report_card.education_report.bulk_print import get_print_context, render_pdf
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	rebuild_class_test_statistics,
+)
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	refresh_course_rollups,
+)
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import (
+	refresh_class_ranks,
+)
+from education_report_card.education_report.recompute import recompute_student_reports
+
+DOCTYPE = "Report Card Publication"
+CHUNK_DOCTYPE = "Report Card Publication Chunk"
+METHOD = "education_report_card.education_report.doctype.report_card_publication.report_card_publication"
+DEFAULT_CHUNK_SIZE = 50
+STALLED_AFTER_MINUTES = 30
+
+# stage -> share of the progress bar
+STAGE_WEIGHTS = {"Recompute Reports": 10, "Class Statistics": 5, "Render Cards": 60, "Publish": 25}
+
+# chunked stage -> chunk field set once the chunk is done, publication counter of its students
+CHUNK_DONE_FIELDS = {"Render Cards": "rendered", "Publish": "published"}
+CHUNK_COUNTERS = {"Render Cards": "rendered_students", "Publish": "published_students"}
+
+LOCKED_FIELDS = ("academic_year", "program", "term", "send_email", "chunk_size")
+
+
+class ReportCardPublication(Document):
+	def validate(self):
+		self.chunk_size = cint(self.chunk_size) if cint(self.chunk_size) > 0 else DEFAULT_CHUNK_SIZE
+
+		if self.status in ("Queued", "Running") and any(self.has_value_changed(f) for f in LOCKED_FIELDS):
+			frappe.throw(_("The settings of a publication cannot be changed while it is running."))
+
+	def on_trash(self):
+		if self.status in ("Queued", "Running"):
+			frappe.throw(_("A running publication cannot be deleted."))
+
+	@frappe.whitelist()
+	def start(self):
+		"""Run the whole pipeline from the first stage."""
+		self.check_permission("write")
+
+		if self.status in ("Queued", "Running"):
+			frappe.throw(_("This publication is already running."))
+
+		if frappe.db.exists(
+			DOCTYPE,
+			{
+				"academic_year": self.academic_year,
+				"program": self.program,
+				"status": ["in", ["Queued", "Running"]],
+				"name": ["!=", self.name],
+			},
+		):
+			frappe.throw(
+				_("Another publication of {0} for {1} is running.").format(self.program, self.academic_year)
+			)
+
+		self.update(
+			{
+				"status": "Queued",
+				"stage": get_stages(self.send_email)[0],
+				"progress": 0,
+				"error_log": None,
+				"total_students": 0,
+				"rendered_students": 0,
+				"published_students": 0,
+				"emails_queued": 0,
+				"started_by": frappe.session.user,
+				"started_on": now(),
+				"completed_on": None,
+			}
+		)
+		self.set("chunks", [])
+		self.save()
+
+		enqueue_stage(self.name, self.stage)
+
+	@frappe.whitelist()
+	def resume(self):
+		"""Continue a failed or stalled publication from its last checkpoint."""
+		self.check_permission("write")
+
+		if self.status not in ("Running", "Failed"):
+			frappe.throw(_("Only a failed or stalled publication can be resumed."))
+
+		self.db_set({"status": "Running", "error_log": None})
+		enqueue_stage(self.name, self.stage)
+
+
+def get_stages(send_email):
+	"""Stages of a publication, in order; cards are only published when they are emailed."""
+	return [stage for stage in STAGE_WEIGHTS if cint(send_email) or stage != "Publish"]
+
+
+def get_progress(stages, stage, done=0, total=0):
+	"""Percentage of the pipeline completed, the current stage counted pro rata of its students."""
+	finished = sum(STAGE_WEIGHTS[s] for s in stages[: stages.index(stage)])
+	current = STAGE_WEIGHTS[stage] * done / total if total else 0
+
+	return round((finished + current) / sum(STAGE_WEIGHTS[s] for s in stages) * 100, 1)
+
+
+def enqueue_stage(name, stage):
+	frappe.enqueue(
+		f"{METHOD}.run_stage",
+		queue="long",
+		timeout=3600,
+		job_id=f"report_card_publication::{name}::{frappe.scrub(stage)}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		name=name,
+		stage=stage,
+	)
+
+
+def run_stage(name, stage):
+	"""
+	Run one stage of a publication. The chunked stages fan out to one job per
+	chunk not done yet and the last chunk to finish moves the pipeline on, so a
+	resumed stage only redoes the chunks a crashed worker left behind.
+	"""
+	doc = frappe.get_doc(DOCTYPE, name)
+	# superseded by a restart, or stopped by a failure
+	if doc.stage != stage or doc.status not in ("Queued", "Running"):
+		return
+
+	doc.db_set("status", "Running")
+	frappe.db.commit()
+	publish_progress(name)
+
+	try:
+		if stage in CHUNK_DONE_FIELDS:
+			if not doc.chunks:
+				plan_chunks(doc)
+
+			pending = [row for row in doc.chunks if not row.get(CHUNK_DONE_FIELDS[stage])]
+			if pending:
+				for row in pending:
+					enqueue_chunk(name, stage, row)
+				frappe.db.commit()
+				return
+		else:
+			STAGE_HANDLERS[stage](doc)
+	except Exception:
+		frappe.db.rollback()
+		fail(name)
+		return
+
+	advance(name, stage)
+
+
+def recompute_reports(doc):
+	# the recalculation is idempotent: a resumed stage simply runs again
+	for course in frappe.get_all(
+		"Student Report", filters=get_report_filters(doc), pluck="course", distinct=True
+	):
+		recompute_student_reports(doc.program, course, doc.academic_year)
+		frappe.db.commit()
+
+	refresh_class_ranks(doc.program, doc.academic_year)
+	refresh_course_rollups(doc.program, doc.academic_year)
+	frappe.db.commit()
+
+
+def compute_statistics(doc):
+	rebuild_class_test_statistics(doc.academic_year, doc.program)
+	frappe.db.commit()
+
+
+STAGE_HANDLERS = {
+	"Recompute Reports": recompute_reports,
+	"Class Statistics": compute_statistics,
+}
+
+
+def plan_chunks(doc):
+	"""Split the students of the program into the chunks shared by the rendering and publishing stages."""
+	students = frappe.get_all(
+		"Student Report",
+		filters=get_report_filters(doc),
+		pluck="student",
+		distinct=True,
+		order_by="student asc",
+	)
+
+	size = cint(doc.chunk_size) or DEFAULT_CHUNK_SIZE
+	for start in range(0, len(students), size):
+		chunk = students[start : start + size]
+		doc.append("chunks", {"students": json.dumps(chunk), "student_count": len(chunk)})
+
+	doc.total_students = len(students)
+	doc.save(ignore_permissions=True)
+	frappe.db.commit()
+
+
+def enqueue_chunk(name, stage, row):
+	frappe.enqueue(
+		f"{METHOD}.run_chunk",
+		queue="long",
+		timeout=1500,
+		job_id=f"report_card_publication::{name}::{frappe.scrub(stage)}::{row.idx}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		name=name,
+		stage=stage,
+		chunk=row.name,
+	)
+
+
+def run_chunk(name, stage, chunk):
+	"""Render or publish the cards of one chunk, then check the chunk off in the same transaction."""
+	doc = frappe.db.get_value(
+		DOCTYPE, name, ["academic_year", "program", "term", "status", "stage"], as_dict=True
+	)
+	row = frappe.db.get_value(
+		CHUNK_DOCTYPE, chunk, ["students", "files", *CHUNK_DONE_FIELDS.values()], as_dict=True
+	)
+	if not doc or not row or doc.stage != stage or doc.status != "Running" or row[CHUNK_DONE_FIELDS[stage]]:
+		return
+
+	try:
+		if stage == "Render Cards":
+			values = {"files": json.dumps(render_cards(doc, json.loads(row.students)))}
+		else:
+			values = {"emails_queued": email_cards(doc, json.loads(row.files or "{}"))}
+	except Exception:
+		frappe.db.rollback()
+		error_log = frappe.log_error(title=_("Report card publication failed"))
+		frappe.db.set_value(CHUNK_DOCTYPE, chunk, "error_log", error_log.name, update_modified=False)
+		fail(name, error_log)
+		return
+
+	complete_chunk(name, stage, chunk, {CHUNK_DONE_FIELDS[stage]: 1, "error_log": None, **values})
+
+
+def complete_chunk(name, stage, chunk, values):
+	# the publication row is locked, so exactly one finishing chunk sees none pending
+	doc = frappe.db.get_value(
+		DOCTYPE, name, ["status", "send_email", "total_students"], as_dict=True, for_update=True
+	)
+	frappe.db.set_value(CHUNK_DOCTYPE, chunk, values, update_modified=False)
+
+	done_field = CHUNK_DONE_FIELDS[stage]
+	counts = frappe.db.sql(
+		f"""
+		SELECT
+			SUM(CASE WHEN `{done_field}` = 1 THEN student_count ELSE 0 END) AS done,
+			SUM(CASE WHEN `{done_field}` = 1 THEN 0 ELSE 1 END) AS pending,
+			SUM(emails_queued) AS emails_queued
+		FROM `tab{CHUNK_DOCTYPE}`
+		WHERE parent = %s AND parenttype = %s
+		""",
+		(name, DOCTYPE),
+		as_dict=True,
+	)[0]
+
+	frappe.db.set_value(
+		DOCTYPE,
+		name,
+		{
+			CHUNK_COUNTERS[stage]: cint(counts.done),
+			"emails_queued": cint(counts.emails_queued),
+			"progress": get_progress(
+				get_stages(doc.send_email), stage, cint(counts.done), doc.total_students
+			),
+		},
+	)
+
+	if cint(counts.pending) or doc.status != "Running":
+		frappe.db.commit()
+		publish_progress(name)
+		return
+
+	advance(name, stage)
+
+
+def advance(name, stage):
+	"""Start the stage after `stage`, or complete the publication."""
+	stages = get_stages(frappe.db.get_value(DOCTYPE, name, "send_email"))
+	position = stages.index(stage) + 1
+
+	if position < len(stages):
+		frappe.db.set_value(
+			DOCTYPE, name, {"stage": stages[position], "progress": get_progress(stages, stages[position])}
+		)
+		enqueue_stage(name, stages[position])
+	else:
+		frappe.db.set_value(DOCTYPE, name, {"status": "Completed", "progress": 100, "completed_on": now()})
+
+	frappe.db.commit()
+	publish_progress(name)
+
+
+def fail(name, error_log=None):
+	error_log = error_log or frappe.log_error(title=_("Report card publication failed"))
+	frappe.db.set_value(DOCTYPE, name, {"status": "Failed", "error_log": error_log.name})
+	frappe.db.commit()
+	publish_progress(name)
+
+
+def render_cards(doc, students):
+	"""Render one term-end PDF per student, attached to the Student. Returns {student: File name}."""
+	cards, context = get_print_context(doc.academic_year, doc.program, students, doc.term)
+	if not cards:
+		return {}
+
+	file_names = {card["student"]: get_file_name(doc, card["student"]) for card in cards}
+
+	# a resumed chunk or a new run replaces the cards rendered earlier for the same term
+	for file_name in frappe.get_all(
+		"File",
+		filters={
+			"attached_to_doctype": "Student",
+			"attached_to_name": ["in", list(file_names)],
+			"file_name": ["in", list(file_names.values())],
+		},
+		pluck="name",
+	):
+		frappe.delete_doc("File", file_name, ignore_permissions=True)
+
+	return {
+		card["student"]: frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": file_names[card["student"]],
+				"is_private": 1,
+				"attached_to_doctype": "Student",
+				"attached_to_name": card["student"],
+				"content": render_pdf({**context, "cards": [card]}),
+			}
+		)
+		.insert(ignore_permissions=True)
+		.name
+		for card in cards
+	}
+
+
+def email_cards(doc, files):
+	"""Queue one email per student with their card attached. Returns the number of emails queued."""
+	if not files:
+		return 0
+
+	recipients = get_recipients(list(files))
+	queued = 0
+	for student, file_name in files.items():
+		if not recipients.get(student):
+			continue
+
+		student_name, emails = recipients[student]
+		frappe.sendmail(
+			recipients=emails,
+			subject=_("{0} Report Card: {1}").format(doc.term, student_name),
+			message=_("Please find attached the {0} report card of {1} for {2}.").format(
+				doc.term, student_name, doc.academic_year
+			),
+			attachments=[{"fid": file_name}],
+			reference_doctype="Student",
+			reference_name=student,
+		)
+		queued += 1
+
+	return queued
+
+
+def get_recipients(students):
+	"""{student: (student name, [emails of the student and their guardians])}, read with one query."""
+	rows = frappe.db.sql(
+		"""
+		SELECT s.name AS student, s.student_name, s.student_email_id AS email
+		FROM `tabStudent` s
+		WHERE s.name IN %(students)s
+		UNION ALL
+		SELECT sg.parent, s.student_name, g.email_address
+		FROM `tabStudent Guardian` sg
+		INNER JOIN `tabGuardian` g ON g.name = sg.guardian
+		INNER JOIN `tabStudent` s ON s.name = sg.parent
+		WHERE sg.parenttype = 'Student' AND sg.parent IN %(students)s
+		""",
+		{"students": tuple(students)},
+		as_dict=True,
+	)
+
+	recipients = {}
+	for row in rows:
+		_student_name, emails = recipients.setdefault(row.student, (row.student_name, []))
+		if row.email and row.email not in emails:
+			emails.append(row.email)
+
+	return {student: value for student, value in recipients.items() if value[1]}
+
+
+def get_file_name(doc, student):
+	return f"report-card-{frappe.scrub(doc.academic_year)}-{frappe.scrub(doc.term)}-{student}.pdf"
+
+
+def get_report_filters(doc):
+	return {"academic_year": doc.academic_year, "program": doc.program, "docstatus": ["<", 2]}
+
+
+def publish_progress(name):
+	frappe.publish_realtime("report_card_publication_progress", {"name": name}, doctype=DOCTYPE, docname=name)
+
+
+def resume_stalled_publications():
+	"""
+	Re-enqueue the current stage of publications without progress for a while, e.g. after
+	a worker was killed. Jobs still queued or running are not duplicated. Run hourly by the scheduler.
+	"""
+	stalled = frappe.get_all(
+		DOCTYPE,
+		filters={
+			"status": ["in", ["Queued", "Running"]],
+			"modified": ["<", add_to_date(now_datetime(), minutes=-STALLED_AFTER_MINUTES)],
+		},
+		fields=["name", "stage"],
+	)
+	for publication in stalled:
+		enqueue_stage(publication.name, publication.stage)
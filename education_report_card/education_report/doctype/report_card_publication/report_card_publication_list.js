@@ -0,0 +1,9 @@
+frappe.listview_settings["Report Card Publication"] = {
+	add_fields: ["status", "progress"],
+
+	get_indicator(doc) {
+		const colors = { Draft: "gray", Queued: "blue", Running: "orange", Completed: "green", Failed: "red" };
+		const label = doc.status === "Running" ? `${__(doc.status)} (${doc.progress || 0}%)` : __(doc.status);
+		return [label, colors[doc.status], `status,=,${doc.status}`];
+	},
+};
@@ -0,0 +1,74 @@
+# Copyright (c) 2025, Yeshiwas D. and Contributors
+# See license.txt
+
+# import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from education_report_card.education_report.bulk_print import scope_card_to_term
+from education_report_card.education_report.doctype.report_card_publication.report_card_publication import (
+	get_progress,
+	get_stages,
+)
+
+
+class TestReportCardPublication(FrappeTestCase):
+	def test_publish_stage_only_when_emailing(self):
+		self.assertEqual(get_stages(0), ["Recompute Reports", "Class Statistics", "Render Cards"])
+		self.assertEqual(get_stages(1)[-1], "Publish")
+
+	def test_progress_counts_current_stage_pro_rata(self):
+		stages = get_stages(1)
+
+		self.assertEqual(get_progress(stages, "Recompute Reports"), 0)
+		self.assertEqual(get_progress(stages, "Render Cards", 500, 2000), 30.0)
+		self.assertEqual(get_progress(get_stages(0), "Render Cards", 2000, 2000), 100.0)
+
+	def test_term_end_card_hides_later_terms(self):
+		period = {"rank": 2, "class_size": 30, "class_mean": 70.0}
+		card = {
+			"courses": [
+				{
+					"topics": [
+						{"competencies": [{"competency": "C1", "term1": "A", "term2": "B", "term3": "C"}]}
+					],
+					"summary": {
+						"coursework": [16, 17, 18],
+						"unit_test": [24, 25, 26],
+						"exam": [40, 41, 42],
+						"trimester_total": [80, 83, 86],
+						"yearly_average_mark": 83,
+						"yearly_total_grade": "B",
+					},
+				}
+			],
+			"term_averages": {"term1_avg": 80, "term2_avg": 83, "term3_avg": 86},
+			"ranking": {
+				"term1": dict(period),
+				"term2": dict(period),
+				"term3": dict(period),
+				"yearly": dict(period),
+			},
+			"comments": {
+				"teacher": {"term1": "Good", "term2": "Better", "term3": "Best", "teacher_name": "T"},
+				"director": {"term1": "Ok", "term2": "Fine", "term3": "Great", "director_name": "D"},
+			},
+		}
+
+		scoped = scope_card_to_term(card, "Term 2")
+		course = scoped["courses"][0]
+
+		self.assertEqual(
+			course["topics"][0]["competencies"][0],
+			{"competency": "C1", "term1": "A", "term2": "B", "term3": ""},
+		)
+		self.assertEqual(course["summary"]["trimester_total"], [80, 83, 0])
+		self.assertEqual(course["summary"]["yearly_total_grade"], "B")
+		self.assertEqual(scoped["term_averages"], {"term1_avg": 80, "term2_avg": 83, "term3_avg": 0})
+		self.assertEqual(scoped["ranking"]["term2"], period)
+		self.assertEqual(scoped["ranking"]["term3"], {"rank": None, "class_size": None, "class_mean": None})
+		self.assertEqual(scoped["comments"]["teacher"]["term3"], "")
+		self.assertEqual(scoped["comments"]["director"]["term2"], "Fine")
+
+		# the cached card is left untouched
+		self.assertEqual(card["courses"][0]["summary"]["trimester_total"], [80, 83, 86])
+		self.assertEqual(scope_card_to_term(card, "Term 3"), card)
@@ -0,0 +1,167 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+import json
+import math
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt
+
+from education_report_card.education_report.bulk import bulk_insert_rows
+from education_report_card.education_report.card_cache import clear_report_card_cache
+from education_report_card.education_report.pending_queue import PendingQueue
+
+PERIODS = ("term1", "term2", "term3", "yearly")
+
+PENDING_RANKS = PendingQueue(
+	"student_class_rank_pending",
+	"student_class_rank_refresh",
+	"education_report_card.education_report.doctype.student_class_rank.student_class_rank.refresh_pending_ranks",
+)
+
+
+class StudentClassRank(Document):
+	pass
+
+
+def refresh_class_ranks(program, academic_year):
+	"""
+	Rank every student of a program / academic year on each term average and on
+	the yearly average, and replace the stored Student Class Rank rows.
+	The averages come from one grouped query; the ranking is a single sort per period.
+	"""
+	averages = frappe.db.sql(
+		"""
+		SELECT
+			student,
+			MAX(student_name) AS student_name,
+			AVG(COALESCE(term1_total, 0)) AS term1,
+			AVG(COALESCE(term2_total, 0)) AS term2,
+			AVG(COALESCE(term3_total, 0)) AS term3
+		FROM `tabStudent Report`
+		WHERE program = %(program)s AND academic_year = %(academic_year)s
+		GROUP BY student
+		""",
+		{"program": program, "academic_year": academic_year},
+		as_dict=True,
+	)
+
+	rows = {}
+	for a in averages:
+		# same averages as the report card shows
+		terms = [round(flt(a[term]), 2) for term in ("term1", "term2", "term3")]
+		positive = [t for t in terms if t > 0]
+		rows[a.student] = {
+			"student": a.student,
+			"student_name": a.student_name,
+			"term1_average": terms[0],
+			"term2_average": terms[1],
+			"term3_average": terms[2],
+			"yearly_average": round(sum(positive) / len(positive), 2) if positive else 0,
+		}
+
+	for period in PERIODS:
+		# students without marks for the period are not ranked
+		values = {s: row[f"{period}_average"] for s, row in rows.items() if row[f"{period}_average"] > 0}
+		stats = rank_values(values)
+
+		for student, row in rows.items():
+			rank, percentile = stats["ranks"].get(student, (None, None))
+			row.update(
+				{
+					f"{period}_rank": rank,
+					f"{period}_percentile": percentile,
+					f"{period}_class_size": stats["count"],
+					f"{period}_class_mean": stats["mean"],
+					f"{period}_class_std": stats["std"],
+				}
+			)
+
+	frappe.db.delete("Student Class Rank", {"program": program, "academic_year": academic_year})
+	# every card of the program shows its position
+	frappe.db.after_commit.add(partial(clear_report_card_cache, program, academic_year))
+	if not rows:
+		return
+
+	bulk_insert_rows(
+		"Student Class Rank",
+		[{"program": program, "academic_year": academic_year, **row} for row in rows.values()],
+	)
+
+
+def queue_class_ranks(program, academic_year):
+	"""Refresh the ranks of a program in the background once the current transaction commits."""
+	if not (program and academic_year):
+		return
+
+	if frappe.flags.in_test:
+		refresh_class_ranks(program, academic_year)
+		return
+
+	PENDING_RANKS.push_after_commit([json.dumps([program, academic_year])])
+
+
+def enqueue_pending_ranks():
+	"""Scheduler sweep: restart the drain job for programs left pending."""
+	PENDING_RANKS.enqueue()
+
+
+def refresh_pending_ranks(keys):
+	"""One pass of the drain job: rank each pending program."""
+	for key in keys:
+		program, academic_year = json.loads(key)
+		try:
+			refresh_class_ranks(program, academic_year)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(title=_("Class ranking failed"))
+
+
+def rank_values(values):
+	"""
+	Competition ranking ("1224") of {key: value}, highest value first.
+	The percentile is the share of the other ranked students with a strictly lower value.
+	Returns {"ranks": {key: (rank, percentile)}, "count", "mean", "std"}.
+	"""
+	count = len(values)
+	if not count:
+		return {"ranks": {}, "count": 0, "mean": 0, "std": 0}
+
+	ordered = sorted(values.items(), key=lambda item: item[1], reverse=True)
+	ranks = {}
+	rank = 0
+	for position, (key, value) in enumerate(ordered, start=1):
+		if position == 1 or value != ordered[position - 2][1]:
+			rank = position
+		ranks[key] = rank
+
+	# number of values strictly lower than each distinct value
+	lower = {}
+	for position, (_key, value) in enumerate(reversed(ordered)):
+		lower.setdefault(value, position)
+
+	mean = sum(values.values()) / count
+	std = math.sqrt(sum((v - mean) ** 2 for v in values.values()) / count)
+
+	return {
+		"ranks": {
+			key: (ranks[key], round(lower[value] / (count - 1) * 100, 2) if count > 1 else 100.0)
+			for key, value in values.items()
+		},
+		"count": count,
+		"mean": round(mean, 2),
+		"std": round(std, 2),
+	}
+
+
+def rebuild_class_ranks(academic_year=None):
+	"""Refresh the ranks of every program / academic year with Student Reports."""
+	filters = {"academic_year": academic_year} if academic_year else {}
+	for group in frappe.get_all(
+		"Student Report", filters=filters, fields=["program", "academic_year"], distinct=True
+	):
+		refresh_class_ranks(group.program, group.academic_year)
@@ -0,0 +1,22 @@
+# Copyright (c) 2025, Yeshiwas D. and Contributors
+# See license.txt
+
+# import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import rank_values
+
+
+class TestStudentClassRank(FrappeTestCase):
+	def test_ties_share_a_rank(self):
+		stats = rank_values({"A": 90, "B": 80, "C": 80, "D": 70})
+
+		self.assertEqual({k: v[0] for k, v in stats["ranks"].items()}, {"A": 1, "B": 2, "C": 2, "D": 4})
+		self.assertEqual(stats["ranks"]["A"][1], 100.0)
+		self.assertEqual(stats["ranks"]["B"][1], 33.33)
+		self.assertEqual(stats["ranks"]["D"][1], 0.0)
+		self.assertEqual(stats["mean"], 80)
+		self.assertEqual(stats["std"], 7.07)
+
+	def test_empty_class(self):
+		self.assertEqual(rank_values({}), {"ranks": {}, "count": 0, "mean": 0, "std": 0})
@@ -8,5 +8,53 @@ frappe.listview_settings['Student Report'] = {
             // Navigate to your custom summary page
             frappe.set_route('student-report-summary');
         });
+
+        if (frappe.model.can_create("Student Report")) {
+            listview.page.add_inner_button(__('Generate Reports'), () => {
+                show_generate_dialog(listview);
+            });
+        }
     }
 };
+
+function show_generate_dialog(listview) {
+    const dialog = new frappe.ui.Dialog({
+        title: __('Generate Student Reports'),
+        fields: [
+            { fieldname: "program", fieldtype: "Link", options: "Program", label: __("Program/Grade"), reqd: 1 },
+            { fieldname: "academic_year", fieldtype: "Link", options: "Academic Year", label: __("Academic Year"), reqd: 1 },
+            {
+                fieldname: "teacher", fieldtype: "Link", options: "Instructor", label: __("Teacher/Instructor"), reqd: 1,
+                get_query: () => ({ filters: { status: "Active" } })
+            },
+            { fieldname: "grading_scale", fieldtype: "Link", options: "Grading Scale", label: __("Grading Scale"), reqd: 1 },
+            { fieldname: "report_date", fieldtype: "Date", label: __("Report Date"), default: frappe.datetime.get_today() },
+            {
+                fieldtype: "HTML",
+                options: `<p class="text-muted">${__("A draft report is created for every enrolled student and program course that has none yet.")}</p>`
+            }
+        ],
+        primary_action_label: __('Generate'),
+        primary_action(values) {
+            frappe.call({
+                method: "education_report_card.education_report.generate.enqueue_student_report_generation",
+                args: values,
+                callback() {
+                    dialog.hide();
+                    frappe.show_alert({ message: __("Student Report generation queued"), indicator: "blue" });
+                }
+            });
+        }
+    });
+
+    frappe.realtime.off("student_report_generation_done");
+    frappe.realtime.on("student_report_generation_done", (data) => {
+        frappe.show_alert({
+            message: __("{0} Student Reports created for {1} ({2})", [data.created, data.program, data.academic_year]),
+            indicator: "green"
+        });
+        listview.refresh();
+    });
+
+    dialog.show();
+}
@@ -1,9 +1,71 @@
 # Copyright (c) 2025, Yeshiwas D. and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from education_report_card.education_report import grading_scale
+from education_report_card.education_report.grading import compute_report_fields
+from education_report_card.education_report.grading_scale import get_grade
+
+# form order: "B" is listed before "B2", which shares its threshold
+INTERVALS = [
+	frappe._dict(grade_code="A", threshold=90, idx=1),
+	frappe._dict(grade_code="B", threshold=80, idx=2),
+	frappe._dict(grade_code="B2", threshold=80, idx=3),
+	frappe._dict(grade_code="C", threshold=60, idx=4),
+	frappe._dict(grade_code="D", threshold=40, idx=5),
+]
+
 
 class TestStudentReport(FrappeTestCase):
-	pass
+	def test_compute_report_fields(self):
+		totals = {
+			("Coursework", "Term 1"): (15, 20),
+			("Unit Test", "Term 1"): (40, 50),
+			("Exam", "Term 1"): (90, 100),
+			("Exam", "Term 2"): (30, 60),
+		}
+
+		fields = compute_report_fields(totals)
+
+		self.assertAlmostEqual(fields["coursework_term1_20_percent"], 15)
+		self.assertAlmostEqual(fields["coursework_term1_average_mark"], 15)
+		self.assertAlmostEqual(fields["unit_test_term1_30_percent"], 24)
+		self.assertAlmostEqual(fields["exam_term1_50_percent"], 45)
+		self.assertAlmostEqual(fields["term1_total"], 84)
+		self.assertAlmostEqual(fields["term2_total"], 25)
+		self.assertEqual(fields["term3_total"], 0)
+		self.assertEqual(fields["yearly_average_mark"], 54.5)
+
+	def test_compute_report_fields_without_marks(self):
+		fields = compute_report_fields({})
+
+		self.assertEqual(fields["term1_total"], 0)
+		self.assertEqual(fields["yearly_average_mark"], 0.0)
+
+	def test_get_grade(self):
+		with (
+			patch.object(grading_scale.frappe, "get_all", return_value=INTERVALS),
+			patch.object(grading_scale, "get_grading_scale", grading_scale.load_grading_scale),
+		):
+			self.assertEqual(grading_scale.get_grade_codes("Test Scale"), ["A", "B", "B2", "C", "D"])
+
+			# a mark equal to a threshold gets that grade
+			self.assertEqual(get_grade(90, "Test Scale"), "A")
+			self.assertEqual(get_grade(89.99, "Test Scale"), "B")
+			self.assertEqual(get_grade(60, "Test Scale"), "C")
+			self.assertEqual(get_grade(40, "Test Scale"), "D")
+
+			# tied thresholds: the interval listed first on the form wins
+			self.assertEqual(get_grade(80, "Test Scale"), "B")
+			self.assertEqual(get_grade(85, "Test Scale"), "B")
+
+			# below the lowest threshold there is no grade, above 100 the top grade
+			self.assertEqual(get_grade(39.99, "Test Scale"), "")
+			self.assertEqual(get_grade(None, "Test Scale"), "")
+			self.assertEqual(get_grade(105, "Test Scale"), "A")
+
+		self.assertEqual(get_grade(95, None), "")
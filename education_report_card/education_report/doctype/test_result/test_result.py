@@ -4,10 +4,25 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import today, getdate
+from frappe.utils import getdate, today
+
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	get_key as get_statistic_key,
+)
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	refresh_class_test_statistic,
+	update_class_test_statistics,
+)
+from education_report_card.education_report.instrumentation import instrument
+from education_report_card.education_report.mark_deltas import apply_test_result_change
+
 
 class TestResult(Document):
 	def validate(self):
+		# set by the mark importer, which checks the whole sheet at once
+		if self.flags.rows_validated:
+			return
+
 		self.validate_duplicated_test_detail()
 		self.validate_enrolled_only()
 		self.validate_mark_earned()
@@ -19,6 +34,7 @@ class TestResult(Document):
 		Updates related Student Reports.
 		"""
 		self.update_student_reports()
+		update_class_test_statistics(self)
 
 	def on_update_after_submit(self):
 		"""
@@ -27,35 +43,33 @@ class TestResult(Document):
 		"""
 		self.update_student_reports()
 
+		# a changed program, course, year, term or test type moves the result to another group
+		key = get_statistic_key(self)
+		doc_before_save = self.get_doc_before_save()
+		previous_key = get_statistic_key(doc_before_save) if doc_before_save else key
+		if previous_key != key:
+			refresh_class_test_statistic(**previous_key)
+		refresh_class_test_statistic(**key)
+
 	def on_cancel(self):
 		"""
 		Called when the document is cancelled.
 		Updates related Student Reports.
 		"""
 		self.update_student_reports()
+		refresh_class_test_statistic(**get_statistic_key(self))
 
+	@instrument
 	def update_student_reports(self):
 		"""
 		Helper method to update Student Reports related to this document.
+		Only the (test type, term) bucket of the affected reports is adjusted,
+		by the difference between the previous and the current version.
 		"""
-		for td in self.test_detail:
-			# Find matching Student Report
-			student_report = frappe.db.get_value(
-				"Student Report",
-				{
-					"student": td.student,
-					"program": self.program,
-					"course": self.course,
-					"academic_year": self.academic_year
-				},
-				"name"
-			)
+		if self.flags.skip_student_report_update:
+			return
 
-			if student_report:
-				sr = frappe.get_doc("Student Report", student_report)
-				sr.calculate_test_result_averages()
-				sr.save(ignore_permissions=True)
-				frappe.db.commit()
+		apply_test_result_change(self.get_doc_before_save(), self)
 
 	def validate_duplicated_test_detail(self):
 		if self.test_detail:
@@ -63,25 +77,20 @@ class TestResult(Document):
 			for row in self.test_detail:
 				if row.student in seen:
 					frappe.throw(f"Duplicated student <b> '{row.student}' </b>")
-					seen.add(row.student)
+				seen.add(row.student)
 
 	def validate_enrolled_only(self):
-		if self.program:
-			program_enrolled = frappe.get_all(
-				"Program Enrollment",
-				filters={"program": self.program, "docstatus": 1},
-				fields=["student", "student_name"]
+		if self.program and self.test_detail:
+			not_enrolled = get_non_enrolled_students(
+				self.program, self.academic_year, [row.student for row in self.test_detail]
 			)
 
-			enrolled_students = [p.student for p in program_enrolled]
-			
-
-			if self.test_detail:
-				for row in self.test_detail:  # fixed typo
-					if row.student not in enrolled_students:
-						frappe.throw(
-							f"Student <b>{row.student}</b> is not enrolled in Program <b>{self.program}</b>"
-						)
+			if not_enrolled:
+				frappe.throw(
+					_("The following students are not enrolled in Program <b>{0}</b>: {1}").format(
+						self.program, ", ".join(f"<b>{s}</b>" for s in not_enrolled)
+					)
+				)
 
 	def validate_mark_earned(self):
 		if self.test_detail:
@@ -92,24 +101,18 @@ class TestResult(Document):
 				earned = row.mark_earned or 0
 
 				if earned > possible_mark:
-					frappe.throw(
-						f"Mark earned cannot be greater than possible mark at row '<b>{index}</b>'"
-					)
-				
+					frappe.throw(f"Mark earned cannot be greater than possible mark at row '<b>{index}</b>'")
+
 				if earned < 0:
-					frappe.throw(
-						f"Mark earned cannot be negative at row '<b>{index}</b>'"
-					)
+					frappe.throw(f"Mark earned cannot be negative at row '<b>{index}</b>'")
+
 	def validate_course_program_association(self):
 		"""Ensure that the selected Course belongs to the selected Program"""
 		if not self.program or not self.course:
 			frappe.throw(_("Please select both Program and Course."))
 
 		# Check if the course is part of the selected program
-		exists = frappe.db.exists(
-			"Program Course",
-			{"parent": self.program, "course": self.course}
-		)
+		exists = frappe.db.exists("Program Course", {"parent": self.program, "course": self.course})
 
 		if not exists:
 			frappe.throw(
@@ -118,52 +121,60 @@ class TestResult(Document):
 				)
 			)
 
+
+def get_non_enrolled_students(program, academic_year, students):
+	"""Return the given students that have no submitted enrollment in the program (and academic year)."""
+	students = {s for s in students if s}
+	if not students:
+		return []
+
+	filters = {"program": program, "docstatus": 1, "student": ["in", list(students)]}
+	if academic_year:
+		filters["academic_year"] = academic_year
+
+	enrolled = set(frappe.get_all("Program Enrollment", filters=filters, pluck="student"))
+	return sorted(students - enrolled)
+
+
 @frappe.whitelist()
 def get_enrolled_students(program, academic_year):
-    if not program:
-        frappe.throw(_("Please select a Program/Grade first"))
-    if not academic_year:
-        frappe.throw(_("Please select an Academic Year"))
+	if not program:
+		frappe.throw(_("Please select a Program/Grade first"))
+	if not academic_year:
+		frappe.throw(_("Please select an Academic Year"))
 
-    # Fetch students enrolled in the program and academic year
-    students = frappe.get_all(
-        "Program Enrollment",
-        filters={
-            "program": program,
-            "academic_year": academic_year,
-            "docstatus": 1
-        },
-        fields=["student", "student_name"]
-    )
+	# Fetch students enrolled in the program and academic year
+	students = frappe.get_all(
+		"Program Enrollment",
+		filters={"program": program, "academic_year": academic_year, "docstatus": 1},
+		fields=["student", "student_name"],
+	)
 
-    return [{"student": s.student, "student_name": s.student_name} for s in students]
+	return [{"student": s.student, "student_name": s.student_name} for s in students]
 
 
 @frappe.whitelist()
 def get_academic_year(test_date):
-    """Return the Academic Year that covers the given date"""
-    date = getdate(test_date)
-    year = frappe.db.sql(
-        """
+	"""Return the Academic Year that covers the given date"""
+	date = getdate(test_date)
+	year = frappe.db.sql(
+		"""
         SELECT name
         FROM `tabAcademic Year`
         WHERE %s BETWEEN year_start_date AND year_end_date
         LIMIT 1
         """,
-        (date,),
-        as_dict=1,
-    )
-    return year[0].name if year else None
+		(date,),
+		as_dict=1,
+	)
+	return year[0].name if year else None
+
 
 @frappe.whitelist()
 def get_program_courses(program):
-    if not program:
-        return []
+	if not program:
+		return []
 
-    courses = frappe.get_all(
-        "Program Course",
-        filters={"parent": program},
-        fields=["course"]
-    )
+	courses = frappe.get_all("Program Course", filters={"parent": program}, fields=["course"])
 
-    return [c.course for c in courses]
+	return [c.course for c in courses]
@@ -12,6 +12,14 @@ frappe.listview_settings['Test Result'] = {
         'modified'
     ],
 
+    onload(listview) {
+        if (frappe.model.can_create("Test Result")) {
+            listview.page.add_inner_button(__('Import Marks'), () => {
+                show_mark_import_dialog(listview);
+            });
+        }
+    },
+
     // Define the columns shown in the list view
     get_fields: function () {
         return [
@@ -28,3 +36,60 @@ frappe.listview_settings['Test Result'] = {
         ];
     }
 };
+
+function show_mark_import_dialog(listview) {
+    const dialog = new frappe.ui.Dialog({
+        title: __('Import Marks'),
+        fields: [
+            {
+                fieldtype: "HTML",
+                options: `<p class="text-muted">${__("CSV or XLSX with the columns: program, course, term, test_type, test_date, teacher, possible_mark, student, mark_earned. Rows with the same test columns become one Test Result.")}</p>`
+            },
+            { fieldname: "file", fieldtype: "Attach", label: __("File"), reqd: 1 },
+            { fieldname: "submit", fieldtype: "Check", label: __("Submit Test Results"), default: 1 }
+        ],
+        primary_action_label: __('Import'),
+        primary_action(values) {
+            frappe.call({
+                method: "education_report_card.education_report.mark_import.enqueue_mark_import",
+                args: { file_url: values.file, submit: values.submit },
+                callback() {
+                    dialog.hide();
+                    frappe.show_alert({ message: __("Mark import queued"), indicator: "blue" });
+                }
+            });
+        }
+    });
+
+    frappe.realtime.off("mark_import_done");
+    frappe.realtime.on("mark_import_done", (data) => {
+        if (data.status === "Completed") {
+            frappe.show_alert({
+                message: __("{0} Test Results imported ({1} marks)", [data.test_results.length, data.rows]),
+                indicator: "green"
+            });
+            listview.refresh();
+            return;
+        }
+
+        if (data.error_log) {
+            frappe.msgprint({
+                title: __("Import failed, nothing was imported"),
+                indicator: "red",
+                message: __("The import stopped with an error: see {0}.", [
+                    `<a href="/app/error-log/${data.error_log}">${__("Error Log {0}", [data.error_log])}</a>`
+                ])
+            });
+            return;
+        }
+
+        const rows = data.errors.map(e => `<tr><td>${e.row || ""}</td><td>${frappe.utils.escape_html(e.message)}</td></tr>`).join("");
+        frappe.msgprint({
+            title: __("Import failed: {0} invalid rows, nothing was imported", [data.error_count]),
+            indicator: "red",
+            message: `<table class="table table-bordered"><tr><th>${__("Row")}</th><th>${__("Error")}</th></tr>${rows}</table>`
+        });
+    });
+
+    dialog.show();
+}
@@ -1,9 +1,142 @@
 # Copyright (c) 2025, Yeshiwas D. and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from education_report_card.benchmark.dataset import delete_school, make_school
+from education_report_card.education_report.grading import (
+	BUCKET_FIELDS,
+	compute_report_fields,
+	get_bucket_totals,
+)
+from education_report_card.education_report.mark_deltas import check_running_sums
+
+PREFIX = "TESTMARKS"
+
 
 class TestTestResult(FrappeTestCase):
-	pass
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.school = make_test_school(PREFIX)
+
+	@classmethod
+	def tearDownClass(cls):
+		frappe.db.rollback()
+		delete_school(PREFIX)
+		super().tearDownClass()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_reports(self):
+		"""{student: Student Report running sums and averages}"""
+		reports = frappe.get_all(
+			"Student Report",
+			filters={"academic_year": self.school.academic_year, "course": self.school.course},
+			fields=["*"],
+		)
+		return {report.student: report for report in reports}
+
+	def assertBuckets(self, expected, changes=None):
+		"""The running sums equal `expected` plus `changes` {(test_type, term): [mark per student]}."""
+		reports = self.get_reports()
+		for index, student in enumerate(self.school.students):
+			totals = get_bucket_totals(expected[student])
+			for bucket, marks in (changes or {}).items():
+				earned, possible = totals[bucket]
+				totals[bucket] = (earned + marks[index], possible + 50)
+
+			for bucket, (earned_field, possible_field) in BUCKET_FIELDS.items():
+				self.assertAlmostEqual(reports[student][earned_field], totals[bucket][0], places=4)
+				self.assertAlmostEqual(reports[student][possible_field], totals[bucket][1], places=4)
+
+	def test_submit_and_cancel_net_to_zero(self):
+		before = self.get_reports()
+		test_result = make_test_result(self.school, [10, 20, 30])
+		self.assertBuckets(before, {("Exam", "Term 1"): [10, 20, 30]})
+
+		test_result.cancel()
+		self.assertBuckets(before)
+
+	def test_edit_after_submit_moves_the_contribution(self):
+		before = self.get_reports()
+		test_result = make_test_result(self.school, [10, 20, 30])
+
+		test_result.term = "Term 2"
+		test_result.save()
+		self.assertBuckets(before, {("Exam", "Term 2"): [10, 20, 30]})
+
+		test_result.test_type = "Unit Test"
+		test_result.save()
+		self.assertBuckets(before, {("Unit Test", "Term 2"): [10, 20, 30]})
+
+		test_result.test_detail[1].mark_earned = 45
+		test_result.save()
+		self.assertBuckets(before, {("Unit Test", "Term 2"): [10, 45, 30]})
+
+	def test_running_sums_do_not_drift(self):
+		make_test_result(self.school, [10, 20, 30])
+		make_test_result(self.school, [5, 15, 25], term="Term 3", test_type="Coursework").cancel()
+		test_result = make_test_result(self.school, [40, 35, 50], term="Term 2", test_type="Unit Test")
+		test_result.term = "Term 1"
+		test_result.test_detail[2].mark_earned = 12
+		test_result.save()
+
+		self.assertEqual(check_running_sums(self.school.academic_year), 0)
+
+		for report in self.get_reports().values():
+			for field, value in compute_report_fields(get_bucket_totals(report)).items():
+				self.assertAlmostEqual(report[field], value, places=4, msg=field)
+
+
+def make_test_school(prefix):
+	"""
+	A small synthetic school: one program and course, three students and one submitted
+	Test Result per (test type, term), with its Student Reports. Remove it with `delete_school`.
+	"""
+	make_school(
+		prefix,
+		programs=1,
+		courses_per_program=1,
+		students_per_program=3,
+		tests_per_term=1,
+		topics_per_course=1,
+		competencies_per_topic=1,
+	)
+
+	return frappe._dict(
+		academic_year=f"{prefix} 2030-31",
+		program=f"{prefix}-PRG-1",
+		course=f"{prefix}-CRS-1-1",
+		teacher=f"{prefix}-INS-1",
+		students=[f"{prefix}-STU-1-{s:04d}" for s in range(1, 4)],
+	)
+
+
+def make_test_result(school, marks, term="Term 1", test_type="Exam", possible_mark=50, submit=True):
+	"""Test Result of `school` with one mark per student, in the order of `school.students`."""
+	doc = frappe.get_doc(
+		{
+			"doctype": "Test Result",
+			"naming_series": "TEST RESULT-.YYYY.-",
+			"test_date": "2030-09-20",
+			"test_type": test_type,
+			"term": term,
+			"program": school.program,
+			"course": school.course,
+			"teacher": school.teacher,
+			"academic_year": school.academic_year,
+			"possible_mark": possible_mark,
+			"test_detail": [
+				{"student": student, "mark_earned": mark}
+				for student, mark in zip(school.students, marks, strict=True)
+			],
+		}
+	).insert()
+
+	if submit:
+		doc.submit()
+
+	return doc
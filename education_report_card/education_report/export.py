@@ -0,0 +1,59 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Constant-memory file downloads.
+
+Rows are written one at a time to a temporary file on disk, which is then sent
+to the client in blocks, so neither the rows nor the file are held in memory.
+"""
+
+import csv
+import io
+import tempfile
+
+import frappe
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+
+def send_csv(filename, header, rows):
+	"""Write `header` and the `rows` iterable to a CSV download."""
+	file = tempfile.TemporaryFile()
+	text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+
+	writer = csv.writer(text)
+	writer.writerow(header)
+	for row in rows:
+		writer.writerow(row)
+
+	text.flush()
+	text.detach()
+	return send_file(file, filename, "text/csv; charset=utf-8")
+
+
+def send_xlsx(filename, sheet_name, header, rows):
+	"""Write `header` and the `rows` iterable to an XLSX download using openpyxl's write-only mode."""
+	from openpyxl import Workbook
+
+	workbook = Workbook(write_only=True)
+	sheet = workbook.create_sheet(sheet_name)
+	sheet.append(header)
+	for row in rows:
+		sheet.append(row)
+
+	file = tempfile.TemporaryFile()
+	workbook.save(file)
+	return send_file(file, filename, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+def send_file(file, filename, mimetype):
+	"""Return a streamed download response for an open binary file."""
+	file.seek(0)
+	response = Response(
+		wrap_file(frappe.local.request.environ, file),
+		mimetype=mimetype,
+		direct_passthrough=True,
+	)
+	response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+	return response
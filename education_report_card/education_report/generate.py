@@ -0,0 +1,209 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Bulk creation of Student Reports for a program / academic year.
+
+One draft report is created per enrolled student x program course that does
+not have one yet. Everything the form would load one document at a time is
+loaded once for the whole class: the competency template per course, the
+existing reports as one set and the averages with the grouped mark query.
+The rows are then written with bulk inserts under a reserved block of names.
+"""
+
+import frappe
+from frappe import _
+from frappe.model.naming import parse_naming_series
+from frappe.utils import cint, today
+
+from education_report_card.education_report.bulk import bulk_insert_rows
+from education_report_card.education_report.card_cache import clear_report_card_cache
+from education_report_card.education_report.doctype.competency.competency import get_competency_template
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	refresh_course_rollups,
+)
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import (
+	refresh_class_ranks,
+)
+from education_report_card.education_report.grading import get_report_fields
+from education_report_card.education_report.grading_scale import get_grade
+
+NAMING_SERIES = "STUDENT REPORT-.YYYY.-"
+SERIES_DIGITS = 5
+CHUNK_SIZE = 500
+
+
+@frappe.whitelist()
+def enqueue_student_report_generation(program, academic_year, teacher, grading_scale, report_date=None):
+	"""Create the missing Student Reports of a program / academic year in the background."""
+	frappe.has_permission("Student Report", "create", throw=True)
+
+	if not (program and academic_year and teacher and grading_scale):
+		frappe.throw(_("Please select Program, Academic Year, Teacher and Grading Scale."))
+
+	job_id = f"student_report_generation::{program}::{academic_year}"
+	frappe.enqueue(
+		"education_report_card.education_report.generate.generate_student_reports",
+		queue="long",
+		timeout=1500,
+		job_id=job_id,
+		deduplicate=True,
+		program=program,
+		academic_year=academic_year,
+		teacher=teacher,
+		grading_scale=grading_scale,
+		report_date=report_date,
+		user=frappe.session.user,
+	)
+
+	return job_id
+
+
+def generate_student_reports(program, academic_year, teacher, grading_scale, report_date=None, user=None):
+	"""Create a draft Student Report for every enrolled student x program course missing one."""
+	if not frappe.db.exists("Grading Scale", grading_scale):
+		frappe.throw(_("Grading Scale {0} not found.").format(grading_scale))
+
+	instructor_name = frappe.db.get_value("Instructor", teacher, "instructor_name")
+	if instructor_name is None:
+		frappe.throw(_("Instructor {0} not found.").format(teacher))
+
+	reports = get_missing_reports(program, academic_year)
+	result = {"program": program, "academic_year": academic_year, "created": len(reports)}
+
+	if reports:
+		templates = {
+			course: get_competency_template(program, course, academic_year)
+			for course in {r.course for r in reports}
+		}
+		report_fields = get_report_fields(reports)
+
+		names = reserve_names(NAMING_SERIES, len(reports))
+		# release the series row before the long insert
+		frappe.db.commit()
+
+		for start in range(0, len(reports), CHUNK_SIZE):
+			chunk = reports[start : start + CHUNK_SIZE]
+			insert_reports(
+				chunk,
+				names[start : start + CHUNK_SIZE],
+				templates,
+				report_fields,
+				{
+					"teacher": teacher,
+					"instructor_name": instructor_name,
+					"grading_scale": grading_scale,
+					"report_date": report_date or today(),
+				},
+			)
+			frappe.db.commit()
+
+		# bulk inserts skip the document hooks that keep the report card cache fresh
+		clear_report_card_cache(program, academic_year)
+
+		refresh_class_ranks(program, academic_year)
+		refresh_course_rollups(program, academic_year)
+		frappe.db.commit()
+
+	if user:
+		frappe.publish_realtime("student_report_generation_done", result, user=user)
+
+	return result
+
+
+def get_missing_reports(program, academic_year):
+	"""Enrolled student x program course pairs that have no Student Report yet."""
+	enrollments = frappe.get_all(
+		"Program Enrollment",
+		filters={"program": program, "academic_year": academic_year, "docstatus": 1},
+		fields=["student", "student_name"],
+		order_by="student asc",
+	)
+	courses = frappe.get_all(
+		"Program Course",
+		filters={"parent": program, "parenttype": "Program"},
+		pluck="course",
+		order_by="idx asc",
+	)
+	if not (enrollments and courses):
+		return []
+
+	# same rule as StudentReport.validate_duplicated_entry: one report per student, course and year
+	existing = {
+		(r.student, r.course)
+		for r in frappe.get_all(
+			"Student Report",
+			filters={"academic_year": academic_year, "course": ["in", courses]},
+			fields=["student", "course"],
+		)
+	}
+
+	reports = []
+	seen = set()
+	for enrollment in enrollments:
+		for course in courses:
+			key = (enrollment.student, course)
+			if key in existing or key in seen:
+				continue
+
+			seen.add(key)
+			reports.append(
+				frappe._dict(
+					student=enrollment.student,
+					student_name=enrollment.student_name,
+					course=course,
+					program=program,
+					academic_year=academic_year,
+				)
+			)
+
+	return reports
+
+
+def insert_reports(reports, names, templates, report_fields, defaults):
+	parents = []
+	children = []
+	for name, report in zip(names, reports, strict=True):
+		fields = report_fields[(report.student, report.course, report.program, report.academic_year)]
+		parents.append(
+			{
+				**defaults,
+				**report,
+				**fields,
+				"name": name,
+				"idx": 0,
+				"naming_series": NAMING_SERIES,
+				"yearly_total_grade": get_grade(fields["yearly_average_mark"], defaults["grading_scale"]),
+			}
+		)
+
+		for idx, row in enumerate(templates[report.course], start=1):
+			children.append(
+				{
+					"parent": name,
+					"parenttype": "Student Report",
+					"parentfield": "student_report_detail",
+					"idx": idx,
+					"topic_name": row.topic_name,
+					"competency": row.competency,
+					"grading_scale": row.grading_scale if row.competency else None,
+				}
+			)
+
+	bulk_insert_rows("Student Report", parents)
+	bulk_insert_rows("Student Report Detail", children)
+
+
+def reserve_names(naming_series, count):
+	"""Take `count` consecutive numbers of a naming series with one counter update."""
+	prefix = parse_naming_series(naming_series)
+
+	current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", (prefix,))
+	if current and current[0][0] is not None:
+		start = cint(current[0][0])
+		frappe.db.sql("UPDATE `tabSeries` SET `current` = `current` + %s WHERE `name` = %s", (count, prefix))
+	else:
+		start = 0
+		frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (prefix, count))
+
+	return [f"{prefix}{number:0{SERIES_DIGITS}d}" for number in range(start + 1, start + count + 1)]
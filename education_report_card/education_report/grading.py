@@ -0,0 +1,173 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Grade computation engine for Student Reports.
+
+All test-type x term weighted averages of a student are derived from a single
+grouped aggregate over `tabTest Result` / `tabTest Result Detail`, so the cost
+of a report calculation no longer depends on the number of derived fields.
+
+The bucket totals (earned and possible per test type x term) are also stored on
+the Student Report as running sums, so a Test Result event only has to adjust
+the buckets it touches (see `mark_deltas`).
+"""
+
+import frappe
+from frappe.utils import flt
+
+TERMS = ("Term 1", "Term 2", "Term 3")
+
+# test_type -> (contribution to the term total, average field prefix, percent field suffix)
+TEST_TYPES = {
+	"Coursework": (0.2, "coursework", "20_percent"),
+	"Unit Test": (0.3, "unit_test", "30_percent"),
+	"Exam": (0.5, "exam", "50_percent"),
+}
+
+
+def get_mark_totals(program, academic_year, courses=None, students=None):
+	"""
+	Return the submitted marks of a program / academic year, summed per bucket.
+
+	Result: {(student, course): {(test_type, term): (earned, possible)}}
+	"""
+	conditions = [
+		"tr.docstatus = 1",
+		"tr.program = %(program)s",
+		"tr.academic_year = %(academic_year)s",
+	]
+	values = {"program": program, "academic_year": academic_year}
+
+	if courses:
+		conditions.append("tr.course IN %(courses)s")
+		values["courses"] = tuple(set(courses))
+	if students:
+		conditions.append("td.student IN %(students)s")
+		values["students"] = tuple(set(students))
+
+	rows = frappe.db.sql(
+		f"""
+        SELECT
+            td.student,
+            tr.course,
+            tr.test_type,
+            tr.term,
+            SUM(td.mark_earned) AS earned,
+            SUM(tr.possible_mark) AS possible
+        FROM `tabTest Result` tr
+        INNER JOIN `tabTest Result Detail` td ON td.parent = tr.name
+        WHERE {" AND ".join(conditions)}
+        GROUP BY td.student, tr.course, tr.test_type, tr.term
+        """,
+		values,
+		as_dict=True,
+	)
+
+	totals = {}
+	for row in rows:
+		totals.setdefault((row.student, row.course), {})[(row.test_type, row.term)] = (
+			flt(row.earned),
+			flt(row.possible),
+		)
+
+	return totals
+
+
+# running sum fields of Student Report, per (test_type, term) bucket
+BUCKET_FIELDS = {
+	(test_type, term): (f"{prefix}_term{index}_earned", f"{prefix}_term{index}_possible")
+	for test_type, (_weight, prefix, _suffix) in TEST_TYPES.items()
+	for index, term in enumerate(TERMS, start=1)
+}
+
+
+def get_bucket_fields(totals):
+	"""Running sum fields of Student Report for the bucket totals of one student/course."""
+	fields = {}
+	for bucket, (earned_field, possible_field) in BUCKET_FIELDS.items():
+		earned, possible = totals.get(bucket, (0, 0))
+		fields[earned_field] = earned
+		fields[possible_field] = possible
+
+	return fields
+
+
+def get_bucket_totals(report):
+	"""Bucket totals read back from the running sum fields of a Student Report."""
+	return {
+		bucket: (flt(report.get(earned_field)), flt(report.get(possible_field)))
+		for bucket, (earned_field, possible_field) in BUCKET_FIELDS.items()
+	}
+
+
+def get_weighted_average(totals, test_type, term):
+	"""Average of a bucket as a fraction of 100, weighted by possible mark."""
+	earned, possible = totals.get((test_type, term), (0, 0))
+	if not possible:
+		return 0
+
+	return (earned / possible) * 100
+
+
+def compute_report_fields(totals):
+	"""
+	Derive every Student Report average field from the bucket totals of one
+	student/course as returned by `get_mark_totals`.
+	"""
+	fields = {}
+
+	for test_type, (weight, prefix, percent_suffix) in TEST_TYPES.items():
+		for index, term in enumerate(TERMS, start=1):
+			scaled = get_weighted_average(totals, test_type, term) * weight
+			fields[f"{prefix}_term{index}_average_mark"] = scaled
+			fields[f"{prefix}_term{index}_{percent_suffix}"] = scaled
+
+	for index in range(1, len(TERMS) + 1):
+		fields[f"term{index}_total"] = sum(
+			fields[f"{prefix}_term{index}_{percent_suffix}"]
+			for _weight, prefix, percent_suffix in TEST_TYPES.values()
+		)
+
+	positive_terms = [
+		t for t in (fields["term1_total"], fields["term2_total"], fields["term3_total"]) if flt(t) > 0
+	]
+	fields["yearly_average_mark"] = (
+		round(sum(positive_terms) / len(positive_terms), 1) if positive_terms else 0.0
+	)
+
+	return fields
+
+
+def get_report_fields(reports):
+	"""
+	Compute the average and running sum fields for many Student Reports at once.
+
+	`reports` is a list of dicts with student, course, program and academic_year.
+	One grouped query is issued per (program, academic_year) in the list.
+	Returns {(student, course, program, academic_year): fields}.
+	"""
+	groups = {}
+	for report in reports:
+		group = groups.setdefault(
+			(report["program"], report["academic_year"]), {"courses": set(), "students": set()}
+		)
+		group["courses"].add(report["course"])
+		group["students"].add(report["student"])
+
+	result = {}
+	for (program, academic_year), group in groups.items():
+		totals = get_mark_totals(program, academic_year, group["courses"], group["students"])
+		for report in reports:
+			if report["program"] != program or report["academic_year"] != academic_year:
+				continue
+
+			key = (report["student"], report["course"], program, academic_year)
+			report_totals = totals.get((report["student"], report["course"]), {})
+			result[key] = {
+				**compute_report_fields(report_totals),
+				**get_bucket_fields(report_totals),
+				"running_sums_initialized": 1,
+			}
+
+	return result
@@ -0,0 +1,81 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Cached Grading Scale lookups.
+
+Intervals are loaded once from the database, kept in Redis and in a
+process-level dict, and pre-sorted by threshold so a grade is found by binary
+search. Saving a Grading Scale bumps a version stamp in Redis which makes
+every process drop its local copy on its next request.
+"""
+
+from bisect import bisect_right
+from functools import partial
+
+import frappe
+from frappe.utils import flt
+
+CACHE_KEY = "education_report_card_grading_scales"
+VERSION_KEY = "education_report_card_grading_scales_version"
+
+# (site, grading scale) -> (version, scale)
+_process_cache = {}
+
+
+def get_grading_scale(grading_scale):
+	"""
+	Return the cached intervals of a Grading Scale as
+	{"grade_codes": [...in form order], "thresholds": [...ascending], "grades": [...matching thresholds]}.
+	"""
+	version = frappe.cache.get_value(VERSION_KEY)
+	key = (frappe.local.site, grading_scale)
+
+	cached = _process_cache.get(key)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	scale = frappe.cache.hget(CACHE_KEY, grading_scale, generator=partial(load_grading_scale, grading_scale))
+	_process_cache[key] = (version, scale)
+	return scale
+
+
+def load_grading_scale(grading_scale):
+	intervals = frappe.get_all(
+		"Grading Scale Interval",
+		filters={"parent": grading_scale, "parenttype": "Grading Scale"},
+		fields=["grade_code", "threshold", "idx"],
+		order_by="idx asc",
+	)
+
+	# ties keep the interval listed first on the form, as the sequential scan did
+	ordered = sorted(intervals, key=lambda d: (flt(d.threshold), -d.idx))
+
+	return {
+		"grade_codes": [d.grade_code for d in intervals],
+		"thresholds": [flt(d.threshold) for d in ordered],
+		"grades": [d.grade_code for d in ordered],
+	}
+
+
+def get_grade(mark, grading_scale):
+	"""Grade code of the highest threshold not above `mark`."""
+	if not grading_scale:
+		return ""
+
+	scale = get_grading_scale(grading_scale)
+	index = bisect_right(scale["thresholds"], flt(mark)) - 1
+
+	return scale["grades"][index] if index >= 0 else ""
+
+
+def get_grade_codes(grading_scale):
+	if not grading_scale:
+		return []
+
+	return get_grading_scale(grading_scale)["grade_codes"]
+
+
+def clear_grading_scale_cache(grading_scale):
+	frappe.cache.hdel(CACHE_KEY, grading_scale)
+	frappe.cache.set_value(VERSION_KEY, frappe.generate_hash(length=10))
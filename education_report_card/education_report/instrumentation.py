@@ -0,0 +1,129 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+SQL query counting for a block of code.
+
+`QueryCollector` wraps `frappe.db.sql` (which `get_value`, `get_all` and the
+query builder all end up calling) for the duration of a `with` block and
+records the number of queries, the rows they returned, the time spent in the
+database and the wall time of the block.
+
+`instrument` applies it to the hot paths of the app when the site config has
+`report_card_instrumentation` set. Measurements are buffered in Redis and
+written to Report Card Performance Log by the scheduler, so instrumented
+requests never write to the database themselves.
+"""
+
+import json
+import time
+from functools import wraps
+
+import frappe
+from frappe.utils import now
+
+from education_report_card.education_report.bulk import bulk_insert_rows
+
+CONFIG_KEY = "report_card_instrumentation"
+BUFFER_KEY = "report_card_performance_buffer"
+FLUSH_BATCH_SIZE = 1000
+LOG_FIELDS = ("method", "user", "queries", "rows", "db_time_ms", "wall_time_ms")
+
+
+class QueryCollector:
+	def __init__(self):
+		self.queries = 0
+		self.rows = 0
+		self.db_time = 0.0
+		self.wall_time = 0.0
+		self._sql = None
+		self._previous = None
+		self._started = None
+
+	def __enter__(self):
+		db = frappe.db
+		self._sql = db.sql
+		# collectors nest: restore the outer wrapper, not the bound method
+		self._previous = db.__dict__.get("sql")
+
+		def sql(*args, **kwargs):
+			start = time.perf_counter()
+			try:
+				result = self._sql(*args, **kwargs)
+			finally:
+				self.db_time += time.perf_counter() - start
+				self.queries += 1
+
+			if isinstance(result, list | tuple):
+				self.rows += len(result)
+			return result
+
+		# instance attribute shadows the bound method until __exit__
+		db.sql = sql
+		self._db = db
+		self._started = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc):
+		self.wall_time = time.perf_counter() - self._started
+		if self._previous is None:
+			del self._db.sql
+		else:
+			self._db.sql = self._previous
+		return False
+
+	def as_dict(self):
+		return {
+			"queries": self.queries,
+			"rows": self.rows,
+			"db_time_ms": round(self.db_time * 1000, 3),
+			"wall_time_ms": round(self.wall_time * 1000, 3),
+		}
+
+
+def instrument(method):
+	"""Record queries, rows, DB time and wall time of each call when instrumentation is enabled."""
+	label = f"{method.__module__.rsplit('.', 1)[-1]}.{method.__qualname__}"
+
+	@wraps(method)
+	def wrapper(*args, **kwargs):
+		if not frappe.conf.get(CONFIG_KEY) or not getattr(frappe.local, "db", None):
+			return method(*args, **kwargs)
+
+		with QueryCollector() as collector:
+			result = method(*args, **kwargs)
+
+		frappe.cache.rpush(
+			BUFFER_KEY,
+			json.dumps(
+				{"method": label, "user": frappe.session.user, "logged_on": now(), **collector.as_dict()}
+			),
+		)
+		return result
+
+	return wrapper
+
+
+def flush_performance_logs():
+	"""Move the buffered measurements into Report Card Performance Log. Run by the scheduler."""
+	while True:
+		entries = frappe.cache.lrange(BUFFER_KEY, 0, FLUSH_BATCH_SIZE - 1)
+		if not entries:
+			break
+
+		frappe.cache.ltrim(BUFFER_KEY, len(entries), -1)
+		rows = [json.loads(frappe.safe_decode(entry)) for entry in entries]
+		bulk_insert_rows(
+			"Report Card Performance Log",
+			[
+				{
+					"owner": "Administrator",
+					"modified_by": "Administrator",
+					"creation": r["logged_on"],
+					"modified": r["logged_on"],
+					**{field: r[field] for field in LOG_FIELDS},
+				}
+				for r in rows
+			],
+		)
+		frappe.db.commit()
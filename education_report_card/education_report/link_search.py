@@ -0,0 +1,54 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Shared backend for the Link field queries of the app.
+
+Matching and paging happen in the database (LIKE + LIMIT/OFFSET) and each
+page is cached for a short time per scope (e.g. program / academic year), so
+typing in a picker no longer pulls the whole child table on every keystroke.
+"""
+
+import json
+
+import frappe
+from frappe.utils import cint
+
+CACHE_TTL = 60
+
+
+def search_link_values(doctype, fieldname, filters, txt, start, page_len, description_field=None):
+	"""
+	Return `[(value, description?), ...]` for distinct `fieldname` values of `doctype`
+	rows matching `filters`, where the value (or description) contains `txt`.
+	"""
+	txt = (txt or "").strip()
+	start, page_len = cint(start), cint(page_len) or 20
+
+	cache_key = "link_search::" + json.dumps(
+		[doctype, fieldname, description_field, filters, txt, start, page_len], sort_keys=True, default=str
+	)
+	cached = frappe.cache.get_value(cache_key)
+	if cached is not None:
+		return cached
+
+	fields = [fieldname] + ([description_field] if description_field else [])
+
+	or_filters = None
+	if txt:
+		or_filters = {field: ["like", f"%{txt}%"] for field in fields}
+
+	result = frappe.get_all(
+		doctype,
+		filters=filters,
+		or_filters=or_filters,
+		fields=fields,
+		order_by=f"{fieldname} asc",
+		limit_start=start,
+		limit_page_length=page_len,
+		distinct=True,
+		as_list=True,
+	)
+
+	frappe.cache.set_value(cache_key, result, expires_in_sec=CACHE_TTL)
+	return result
@@ -0,0 +1,157 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Incremental Student Report updates from Test Result events.
+
+A submitted Test Result adds its marks to one (test_type, term) bucket of each
+student's report; cancelling subtracts them and an edit after submit applies the
+difference between the two versions. Only the running sums of the touched
+buckets change, the averages are re-derived from the stored sums, and no marks
+are read back from the database.
+
+Reports whose running sums were never initialized fall back to the queued full
+recalculation. A daily check compares the running sums with a full aggregate
+and queues a recalculation for any report that drifted.
+"""
+
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+
+from education_report_card.education_report.card_cache import clear_report_card_cache
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	queue_course_rollups,
+)
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import (
+	queue_class_ranks,
+)
+from education_report_card.education_report.grading import (
+	BUCKET_FIELDS,
+	compute_report_fields,
+	get_bucket_fields,
+	get_bucket_totals,
+	get_mark_totals,
+)
+from education_report_card.education_report.grading_scale import get_grade
+from education_report_card.education_report.recompute import queue_recompute
+
+RUNNING_SUM_FIELDS = [field for pair in BUCKET_FIELDS.values() for field in pair]
+TOLERANCE = 0.001
+
+
+def apply_test_result_change(before, after):
+	"""
+	Adjust the Student Reports for a Test Result going from `before` to `after`.
+	Only submitted versions count, so this covers submit, edit after submit and cancel.
+	"""
+	deltas = {}
+	for doc, sign in ((before, -1), (after, 1)):
+		if doc and doc.docstatus == 1:
+			add_contribution(deltas, doc, sign)
+
+	for (program, course, academic_year), students in deltas.items():
+		apply_deltas(program, course, academic_year, students)
+
+
+def add_contribution(deltas, test_result, sign):
+	"""{(program, course, academic_year): {student: {bucket: [earned, possible]}}}"""
+	bucket = (test_result.test_type, test_result.term)
+	if bucket not in BUCKET_FIELDS:
+		return
+
+	students = deltas.setdefault((test_result.program, test_result.course, test_result.academic_year), {})
+	for row in test_result.test_detail:
+		if not row.student:
+			continue
+
+		delta = students.setdefault(row.student, {}).setdefault(bucket, [0.0, 0.0])
+		delta[0] += sign * flt(row.mark_earned)
+		delta[1] += sign * flt(test_result.possible_mark)
+
+
+def apply_deltas(program, course, academic_year, students):
+	"""Add the bucket deltas of `students` to their reports in one class and re-derive the averages."""
+	# the lock serializes concurrent submits and full recalculations of the same reports
+	reports = frappe.get_all(
+		"Student Report",
+		filters={
+			"program": program,
+			"course": course,
+			"academic_year": academic_year,
+			"student": ["in", list(students)],
+		},
+		fields=["name", "student", "grading_scale", "running_sums_initialized", *RUNNING_SUM_FIELDS],
+		for_update=True,
+	)
+
+	updates = {}
+	uninitialized = []
+	for report in reports:
+		if not report.running_sums_initialized:
+			uninitialized.append(report.student)
+			continue
+
+		totals = get_bucket_totals(report)
+		for bucket, (earned, possible) in students[report.student].items():
+			current_earned, current_possible = totals[bucket]
+			totals[bucket] = (current_earned + earned, current_possible + possible)
+
+		fields = {**compute_report_fields(totals), **get_bucket_fields(totals)}
+		fields["yearly_total_grade"] = get_grade(fields["yearly_average_mark"], report.grading_scale)
+		updates[report.name] = fields
+
+	if updates:
+		frappe.db.bulk_update("Student Report", updates)
+
+		# bulk_update skips the document hooks that keep the report card cache fresh
+		changed = [r.student for r in reports if r.name in updates]
+		frappe.db.after_commit.add(partial(clear_report_card_cache, program, academic_year, changed))
+		queue_class_ranks(program, academic_year)
+		queue_course_rollups(program, academic_year, course)
+
+	if uninitialized:
+		queue_recompute(program, course, academic_year, uninitialized)
+
+
+def check_running_sums(academic_year=None):
+	"""
+	Compare the running sums of every Student Report with a full aggregate of the marks
+	and queue a recalculation of the reports that differ (or were never initialized).
+	Run daily by the scheduler; a report changed while the check runs may be recalculated needlessly.
+	"""
+	filters = {"academic_year": academic_year} if academic_year else {}
+	groups = frappe.get_all(
+		"Student Report", filters=filters, fields=["program", "academic_year"], distinct=True
+	)
+
+	mismatched = 0
+	for group in groups:
+		totals = get_mark_totals(group.program, group.academic_year)
+		reports = frappe.get_all(
+			"Student Report",
+			filters={"program": group.program, "academic_year": group.academic_year},
+			fields=["student", "course", "running_sums_initialized", *RUNNING_SUM_FIELDS],
+		)
+
+		stale = {}
+		for report in reports:
+			expected = get_bucket_fields(totals.get((report.student, report.course), {}))
+			if not report.running_sums_initialized or any(
+				abs(flt(report[field]) - value) > TOLERANCE for field, value in expected.items()
+			):
+				stale.setdefault(report.course, []).append(report.student)
+
+		for course, students in stale.items():
+			mismatched += len(students)
+			queue_recompute(group.program, course, group.academic_year, students)
+
+	if mismatched:
+		frappe.log_error(
+			title=_("Student Report running sums out of date"),
+			message=_("{0} Student Reports queued for recalculation.").format(mismatched),
+		)
+
+	return mismatched
@@ -0,0 +1,300 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Bulk import of Test Result marks from a CSV or XLSX sheet.
+
+Every row holds one student's mark for one test; rows sharing the test columns
+(program, course, term, test type, test date, teacher and possible mark) become
+one Test Result. The file is read row by row and the whole sheet is validated
+in one pass against sets loaded up front (enrollments, program courses, students,
+academic years), so nothing is created unless every row is valid. Test Results
+are then created and submitted and the affected Student Reports recalculated
+once per class, all in one transaction: an error at any point rolls the whole
+import back.
+"""
+
+import csv
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, getdate
+
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import (
+	refresh_class_ranks,
+)
+from education_report_card.education_report.recompute import recompute_student_reports
+
+TEST_FIELDS = ("program", "course", "term", "test_type", "test_date", "teacher", "possible_mark")
+REQUIRED_COLUMNS = (*TEST_FIELDS, "student", "mark_earned")
+TERMS = ("Term 1", "Term 2", "Term 3")
+TEST_TYPES = ("Coursework", "Unit Test", "Exam")
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+MAX_ERRORS = 500
+
+
+@frappe.whitelist()
+def enqueue_mark_import(file_url, submit=1):
+	"""Import the marks of an uploaded CSV / XLSX file in the background."""
+	frappe.has_permission("Test Result", "create", throw=True)
+	if cint(submit):
+		frappe.has_permission("Test Result", "submit", throw=True)
+
+	file_name = frappe.db.get_value("File", {"file_url": file_url}, "name")
+	if not file_name:
+		frappe.throw(_("File {0} not found.").format(file_url))
+
+	if os.path.splitext(file_url)[1].lower() not in SUPPORTED_EXTENSIONS:
+		frappe.throw(_("Only CSV and XLSX files can be imported."))
+
+	frappe.enqueue(
+		"education_report_card.education_report.mark_import.import_marks",
+		queue="long",
+		timeout=3000,
+		file_name=file_name,
+		submit=cint(submit),
+		user=frappe.session.user,
+	)
+
+
+def import_marks(file_name, submit=1, user=None):
+	"""Validate the whole file, then create the Test Results. Returns the outcome."""
+	try:
+		path = frappe.get_doc("File", file_name).get_full_path()
+		tests, errors = validate_rows(read_rows(path))
+
+		if errors:
+			result = {"status": "Failed", "errors": errors[:MAX_ERRORS], "error_count": len(errors)}
+		else:
+			names = create_test_results(tests, submit)
+			result = {
+				"status": "Completed",
+				"test_results": names,
+				"rows": sum(len(t.test_detail) for t in tests),
+			}
+	except Exception:
+		frappe.db.rollback()
+		error_log = frappe.log_error(title=_("Mark import failed"))
+		frappe.db.commit()
+		result = {"status": "Failed", "errors": [], "error_count": 0, "error_log": error_log.name}
+
+	if user:
+		frappe.publish_realtime("mark_import_done", result, user=user)
+
+	return result
+
+
+def read_rows(path):
+	"""Yield (row number, row dict) from a CSV or XLSX file without loading it whole."""
+	extension = os.path.splitext(path)[1].lower()
+
+	if extension == ".csv":
+		with open(path, encoding="utf-8-sig", newline="") as file:
+			for index, row in enumerate(csv.DictReader(file), start=2):
+				yield index, {normalize_column(k): v for k, v in row.items() if k}
+
+	elif extension == ".xlsx":
+		from openpyxl import load_workbook
+
+		workbook = load_workbook(path, read_only=True, data_only=True)
+		try:
+			rows = workbook.active.iter_rows(values_only=True)
+			header = [normalize_column(c) for c in next(rows, ())]
+			for index, values in enumerate(rows, start=2):
+				if any(v not in (None, "") for v in values):
+					yield index, dict(zip(header, values, strict=False))
+		finally:
+			workbook.close()
+
+	else:
+		frappe.throw(_("Only CSV and XLSX files can be imported."))
+
+
+def normalize_column(column):
+	return str(column or "").strip().lower().replace(" ", "_")
+
+
+def validate_rows(rows):
+	"""
+	Check every row and group the valid ones per test.
+	Returns (tests, errors); tests are Test Result dicts ready to insert.
+	"""
+	parsed = []
+	errors = []
+
+	for index, row in rows:
+		row = {k: v.strip() if isinstance(v, str) else v for k, v in row.items()}
+		missing = [c for c in REQUIRED_COLUMNS if row.get(c) in (None, "")]
+		if missing:
+			errors.append({"row": index, "message": _("Missing {0}").format(", ".join(missing))})
+			continue
+
+		try:
+			row["test_date"] = getdate(row["test_date"])
+			row["possible_mark"] = flt(float(row["possible_mark"]))
+			row["mark_earned"] = flt(float(row["mark_earned"]))
+		except (TypeError, ValueError):
+			errors.append({"row": index, "message": _("Invalid date or mark")})
+			continue
+
+		parsed.append((index, row))
+
+	if not parsed:
+		if not errors:
+			errors.append({"row": None, "message": _("The file has no rows to import.")})
+		return [], errors
+
+	lookups = load_lookups(parsed)
+	tests = {}
+
+	for index, row in parsed:
+		message = get_row_error(row, lookups)
+		if message:
+			errors.append({"row": index, "message": message})
+			continue
+
+		key = tuple(row[f] for f in TEST_FIELDS)
+		test = tests.setdefault(
+			key,
+			frappe._dict(
+				{f: row[f] for f in TEST_FIELDS},
+				academic_year=lookups.academic_years[row["test_date"]],
+				test_detail=[],
+				rows={},
+			),
+		)
+
+		if row["student"] in test.rows:
+			errors.append(
+				{
+					"row": index,
+					"message": _("Duplicate of row {0} for the same test").format(test.rows[row["student"]]),
+				}
+			)
+			continue
+
+		test.rows[row["student"]] = index
+		test.test_detail.append(
+			{
+				"student": row["student"],
+				"student_name": lookups.students[row["student"]],
+				"mark_earned": row["mark_earned"],
+			}
+		)
+
+	return list(tests.values()), errors
+
+
+def get_row_error(row, lookups):
+	if row["term"] not in TERMS:
+		return _("Term must be one of {0}").format(", ".join(TERMS))
+	if row["test_type"] not in TEST_TYPES:
+		return _("Test Type must be one of {0}").format(", ".join(TEST_TYPES))
+	if row["possible_mark"] <= 0:
+		return _("Possible mark must be greater than 0")
+	if not 0 <= row["mark_earned"] <= row["possible_mark"]:
+		return _("Mark earned must be between 0 and the possible mark")
+	if row["teacher"] not in lookups.teachers:
+		return _("Instructor {0} not found").format(row["teacher"])
+	if row["student"] not in lookups.students:
+		return _("Student {0} not found").format(row["student"])
+	if (row["program"], row["course"]) not in lookups.program_courses:
+		return _("Course {0} is not associated with Program {1}").format(row["course"], row["program"])
+
+	academic_year = lookups.academic_years.get(row["test_date"])
+	if not academic_year:
+		return _("No Academic Year covers {0}").format(row["test_date"])
+	if (row["student"], row["program"], academic_year) not in lookups.enrollments:
+		return _("Student {0} is not enrolled in Program {1} for {2}").format(
+			row["student"], row["program"], academic_year
+		)
+
+
+def load_lookups(parsed):
+	"""Load everything the rows are checked against, one query per doctype."""
+	rows = [row for _index, row in parsed]
+	programs = list({r["program"] for r in rows})
+	students = list({r["student"] for r in rows})
+
+	years = frappe.get_all("Academic Year", fields=["name", "year_start_date", "year_end_date"])
+	academic_years = {}
+	for test_date in {r["test_date"] for r in rows}:
+		academic_years[test_date] = next(
+			(
+				y.name
+				for y in years
+				if y.year_start_date and y.year_end_date and y.year_start_date <= test_date <= y.year_end_date
+			),
+			None,
+		)
+
+	return frappe._dict(
+		academic_years=academic_years,
+		students={
+			s.name: s.student_name
+			for s in frappe.get_all(
+				"Student", filters={"name": ["in", students]}, fields=["name", "student_name"]
+			)
+		},
+		teachers=set(
+			frappe.get_all(
+				"Instructor", filters={"name": ["in", list({r["teacher"] for r in rows})]}, pluck="name"
+			)
+		),
+		program_courses={
+			(c.parent, c.course)
+			for c in frappe.get_all(
+				"Program Course",
+				filters={"parent": ["in", programs], "parenttype": "Program"},
+				fields=["parent", "course"],
+			)
+		},
+		enrollments={
+			(e.student, e.program, e.academic_year)
+			for e in frappe.get_all(
+				"Program Enrollment",
+				filters={"program": ["in", programs], "student": ["in", students], "docstatus": 1},
+				fields=["student", "program", "academic_year"],
+			)
+		},
+	)
+
+
+def create_test_results(tests, submit=1):
+	"""
+	Insert (and submit) the validated tests, then recalculate each class once.
+	Committed once at the end, so a failure leaves nothing imported.
+	"""
+	names = []
+	classes = {}
+
+	for test in tests:
+		doc = frappe.get_doc(
+			{
+				"doctype": "Test Result",
+				**{f: test[f] for f in TEST_FIELDS},
+				"academic_year": test.academic_year,
+				"test_detail": test.test_detail,
+			}
+		)
+		# rows were validated in bulk; reports are recalculated below
+		doc.flags.rows_validated = True
+		doc.flags.skip_student_report_update = True
+		doc.insert()
+		if submit:
+			doc.submit()
+
+		names.append(doc.name)
+		classes.setdefault((test.program, test.course, test.academic_year), set()).update(test.rows)
+
+	if submit:
+		for (program, course, academic_year), students in classes.items():
+			recompute_student_reports(program, course, academic_year, list(students))
+		for program, academic_year in {
+			(program, academic_year) for program, _course, academic_year in classes
+		}:
+			refresh_class_ranks(program, academic_year)
+
+	frappe.db.commit()
+	return names
@@ -30,9 +30,88 @@ frappe.pages['student-report-card'].on_page_load = function (wrapper) {
 
 	// === Print Report Button ===
 	$('<div style="margin-left: 40px; margin-bottom: 12px;">' +
-		'<button class="btn btn-primary" id="print_report_btn">Print Report</button>' +
+		'<button class="btn btn-primary" id="print_report_btn">Print Report</button> ' +
+		'<button class="btn btn-default" id="bulk_print_btn">Print All Students (PDF)</button> ' +
+		'<button class="btn btn-default" id="export_data_btn">Export Data</button>' +
 		'</div>').appendTo('#print_button_container');
 
+	// === Export the report data of the academic year as a flat sheet ===
+	$('#export_data_btn').on('click', function () {
+		const academicYear = filter_controls.academic_year.get_value();
+
+		if (!academicYear) {
+			frappe.msgprint("Please select an Academic Year.");
+			return;
+		}
+
+		frappe.prompt(
+			[
+				{
+					fieldname: "sheet",
+					fieldtype: "Select",
+					label: "Sheet",
+					options: [
+						{ value: "marks", label: "Marks (one row per student and course)" },
+						{ value: "competencies", label: "Competencies (one row per competency)" }
+					],
+					default: "marks"
+				},
+				{ fieldname: "file_format", fieldtype: "Select", label: "Format", options: ["xlsx", "csv"], default: "xlsx" }
+			],
+			(values) => {
+				open_url_post(
+					"/api/method/education_report_card.education_report.page.student_report_card.student_report_card.export_report_card_data",
+					{
+						academic_year: academicYear,
+						program: filter_controls.program.get_value() || "",
+						course: filter_controls.course.get_value() || "",
+						sheet: values.sheet,
+						file_format: values.file_format
+					}
+				);
+			},
+			__("Export Data"),
+			__("Download")
+		);
+	});
+
+	// === Bulk PDF for the whole program, rendered on the server ===
+	$('#bulk_print_btn').on('click', function () {
+		const program = filter_controls.program.get_value();
+		const academicYear = filter_controls.academic_year.get_value();
+
+		if (!program || !academicYear) {
+			frappe.msgprint("Please select both Academic Year and Program.");
+			return;
+		}
+
+		frappe.prompt(
+			{
+				fieldname: "output",
+				fieldtype: "Select",
+				label: "Output",
+				options: [
+					{ value: "pdf", label: "One merged PDF" },
+					{ value: "zip", label: "Zip with one PDF per student" }
+				],
+				default: "pdf"
+			},
+			(values) => {
+				frappe.call({
+					method: "education_report_card.education_report.bulk_print.enqueue_report_card_pdfs",
+					args: { academic_year: academicYear, program: program, output: values.output },
+					callback: function (r) {
+						if (!r.message) return;
+						watch_bulk_print(r.message.batch_id);
+						frappe.show_progress(__("Report Cards"), 0, r.message.total_chunks, __("Rendering report cards..."));
+					}
+				});
+			},
+			__("Print All Students"),
+			__("Start")
+		);
+	});
+
 	// === Print Report Button Handler (Enhanced with Course Summary) ===
 	$('#print_report_btn').on('click', function () {
 		const reportOutput = $('#report_output');
@@ -55,330 +134,345 @@ frappe.pages['student-report-card'].on_page_load = function (wrapper) {
 			return;
 		}
 
-		// --- Fetch company name and logo first ---
-		frappe.call({
-			method: "education_report_card.education_report.page.student_report_card.student_report_card.get_company_info",
-			callback: function (res) {
-				const company = res.message || {};
-				const company_name = company.company_name || "Your Institution Name";
-				const company_logo = company.company_logo
-					? `<img src="${company.company_logo}" style="width:120px;height:auto;display:block;margin:0 auto 10px auto;">`
-					: "";
-
-				let w = window.open('', '', 'height=900,width=1100');
-				w.document.write('<html><head><title>Student Report</title><style>');
-				w.document.write(`
-				body { font-family: 'Times New Roman', serif; margin: 25px; font-size: 12pt; color: #000; }
-				table { border-collapse: collapse; width: 100%; margin-bottom: 15px; font-size: 12pt; }
-				table, th, td { border: 1px solid black; }
-				th, td { padding: 6px; text-align: center; }
-				th { background-color: #f5f5f5; font-weight: bold; }
-				h1, h2, h3, h4 { text-align: center; margin: 10px 0; }
-				.course-section, .overall-summary, .comments-section,
-				.director-intro-fr, .director-intro-en,
-				.director-conclusion-fr, .director-conclusion-en {
-					margin-top: 20px; page-break-inside: avoid; padding: 10px;
-					border: 1px solid #000; border-radius: 6px;
-				}
-				.student-header { margin: 15px 0; font-size: 13pt; }
-				.student-header div { margin-bottom: 5px; }
-				.id-tr td {
-					background-color: #d0ebd9ff !important;  /* light green */
-					color: black;
-				}
-				.program-tr td {
-					background-color: #c19dedff !important;  /* light green */
-					color: black;
-				}
-				.course-summary-table { margin-top: 10px; border: 1px solid #000; }
-				.course-summary-table th { background-color: #f0f0f0; }
-				.overall-row td { font-weight: bold; background-color: #fafafa; }
-				.header-section { text-align: center; margin-bottom: 20px; }
-				.company-name { font-size: 18pt; font-weight: bold; margin-bottom: 5px; }
-				@media print {
-					body { margin: 0; }
-					table { page-break-inside: auto; }
-					tr { page-break-inside: avoid; page-break-after: auto; }
-				}
-			`);
-				w.document.write('</style></head><body>');
-
-				// --- Add first page cover ---
-				w.document.write(`
-					<div style="page-break-after: always; height: 100vh; display: flex; flex-direction: column;">
-						<!-- Logo and Company Name at the top -->
-						<div style="text-align: center; margin-top: 20px;">
-							${company_logo}
-							<div class="company-name">${company_name}</div>
-						</div>
-
-						<!-- Centered Academic Year and Grade Name Report Card -->
-						<div style="flex-grow: 1; display: flex; flex-direction: column; justify-content: center; align-items: center; text-align: center;">
-							<h2>Academic Year: ${academicYear}</h2>
-							<h1>${program} Report Card</h1>
-						</div>
-					</div>
-					`);
-
-				// --- Director Intro ---
-				frappe.call({
-					method: "education_report_card.education_report.page.student_report_card.student_report_card.get_director_message",
-					args: { academic_year: academicYear, program: program },
-					callback: function (r) {
-						const directorMsg = r.message || {};
-
-						if (directorMsg.introduction_france) {
-							w.document.write(`
-						<div class="director-intro-fr">
-							<h2>Message de la Directrice de l’école</h2>
-							<p style="text-align: justify;">${directorMsg.introduction_france}</p>
-						</div>`);
-						}
-						if (directorMsg.introduction_english) {
-							w.document.write(`
-						<div class="director-intro-en">
-							<h2>Message from the School Director</h2>
-							<p style="text-align: justify;">${directorMsg.introduction_english}</p>
-							<div style="text-align:right; margin-top:20px;">
-								<span>__________________________</span><br>
-								<b>${directorMsg.director_name || ""}</b><br>
-								<span>Principal / Directeur</span>
-							</div>
-						</div>`);
-						}
-
-						// --- Student Info ---
-						w.document.write(`
-							<div class="student-header">
-								<table class="student-header-table" style="width: 550px; border-collapse: collapse; margin-bottom: 10px; font-size: 24px;">
-									<tr class="id-tr">
-										<td style="width: 150px; font-weight: bold; padding: 4px; text-align: left;">Student ID</td>
-										<td style="padding: 4px; width: 400px; text-align: left;">${student || '-'}</td>
-									</tr>
-									<tr class="name-tr">
-										<td style="font-weight: bold; padding: 4px;text-align: left;">Student Name</td>
-										<td style="padding: 4px;text-align: left;"> ${filter_controls.student.$input.val() || '-'}</td>
-									</tr>
-									<tr  class="program-tr">
-										<td style="font-weight: bold; padding: 4px;text-align: left;">Program/Grade</td>
-										<td style="padding: 4px;text-align: left;">${program || '-'}</td>
-									</tr>
-								</table>
-							</div>
-						`);
-
-						// --- Fetch Student Reports ---
-						frappe.call({
-							method: "education_report_card.education_report.page.student_report_card.student_report_card.get_student_reports",
-							args: { filters: { academic_year: academicYear, program: program, student: student } },
-							callback: function (r2) {
-								const data = r2.message || [];
-								const grouped = {};
-
-								data.forEach(row => {
-									const course = row.course || "Unknown Course";
-									if (!grouped[course]) grouped[course] = { topics: [] };
-									grouped[course].topics.push({
-										topic_name: row.topic_name,
-										competency: row.competency,
-										term1: row.term1,
-										term2: row.term2,
-										term3: row.term3
-									});
-								});
-
-								const courses = Object.entries(grouped);
-
-								(function renderCourse(i) {
-									if (i >= courses.length) return renderOverallGrades();
-
-									const [course, courseData] = courses[i];
-
-									let topicGroups = {};
-									courseData.topics.forEach(c => {
-										if (!topicGroups[c.topic_name]) topicGroups[c.topic_name] = [];
-										topicGroups[c.topic_name].push(c);
-									});
-
-									const hasCompetency = Object.values(topicGroups).some(comps =>
-										comps.some(c => c.competency && c.competency.trim() !== "")
-									);
-
-									frappe.call({
-										method: "education_report_card.education_report.page.student_report_card.student_report_card.get_course_summary",
-										args: { student, course, program, academic_year: academicYear },
-										async: false,
-										callback: function (summary) {
-											const sr = summary.message || {};
-											const allValues = [
-												...(sr.coursework || []),
-												...(sr.unit_test || []),
-												...(sr.exam || []),
-												...(sr.trimester_total || [])
-											].map(Number);
-											const hasNonZero = allValues.some(v => v !== 0 && !isNaN(v));
-
-											if (!hasCompetency && !hasNonZero) {
-												renderCourse(i + 1);
-												return;
-											}
-
-											w.document.write(`<div class="course-section"><h3>Course/Subject: ${course}</h3>`);
-
-											if (hasCompetency) {
-												w.document.write(`
-											<table>
-												<thead>
-													<tr><th>Topic Name</th><th>Competency</th><th>Term 1</th><th>Term 2</th><th>Term 3</th></tr>
-												</thead><tbody>`);
-
-												for (const [topicName, competencies] of Object.entries(topicGroups)) {
-													const valid = competencies.filter(c => c.competency && c.competency.trim() !== "");
-													if (valid.length === 0) continue;
-
-													valid.forEach((c, idx) => {
-														w.document.write('<tr>');
-														if (idx === 0) w.document.write(`<td rowspan="${valid.length}">${topicName}</td>`);
-														w.document.write(`<td>${c.competency}</td>`);
-														w.document.write(`<td>${c.term1 || ""}</td>`);
-														w.document.write(`<td>${c.term2 || ""}</td>`);
-														w.document.write(`<td>${c.term3 || ""}</td>`);
-														w.document.write('</tr>');
-													});
-												}
-												w.document.write(`</tbody></table>`);
-											}
-
-											if (hasNonZero) {
-												w.document.write(`
-											<table class="course-summary-table">
-												<thead><tr><th colspan="2">COURSE SUMMARY</th><th>Term 1</th><th>Term 2</th><th>Term 3</th></tr></thead>
-												<tbody>
-													<tr><td>COURSEWORK</td><td>20%</td><td>${sr.coursework?.[0] || "-"}</td><td>${sr.coursework?.[1] || "-"}</td><td>${sr.coursework?.[2] || "-"}</td></tr>
-													<tr><td>UNIT TEST</td><td>30%</td><td>${sr.unit_test?.[0] || "-"}</td><td>${sr.unit_test?.[1] || "-"}</td><td>${sr.unit_test?.[2] || "-"}</td></tr>
-													<tr><td>END OF TERM EXAM</td><td>50%</td><td>${sr.exam?.[0] || "-"}</td><td>${sr.exam?.[1] || "-"}</td><td>${sr.exam?.[2] || "-"}</td></tr>
-													<tr><td><b>TRIMESTER TOTAL</b></td><td><b>100%</b></td><td><b>${sr.trimester_total?.[0] || "-"}</b></td><td><b>${sr.trimester_total?.[1] || "-"}</b></td><td><b>${sr.trimester_total?.[2] || "-"}</b></td></tr>
-													<tr><td colspan="2"><b>YEARLY TOTAL GRADE</b></td><td colspan="3"><b>${sr.yearly_average_mark || "-"} ${sr.yearly_total_grade ? '(' + sr.yearly_total_grade + ')' : ''}</b></td></tr>
-												</tbody>
-											</table>`);
-											}
-
-											w.document.write(`</div>`);
-											renderCourse(i + 1);
-										}
-									});
-								})(0);
-
-								function renderOverallGrades() {
-									frappe.call({
-										method: "education_report_card.education_report.page.student_report_card.student_report_card.get_overall_term_averages",
-										args: { student, program, academic_year: academicYear },
-										callback: function (res3) {
-											const o = res3.message || {};
-
-											// Collect the term averages in an array
-											const terms = [o.term1_avg, o.term2_avg, o.term3_avg];
-
-											// Filter out null, undefined, or 0 values
-											const nonZeroTerms = terms.filter(t => t > 0);
-
-											// Calculate yearly average only if there are non-zero terms
-											const yearlyAvg = nonZeroTerms.length > 0
-												? nonZeroTerms.reduce((sum, t) => sum + t, 0) / nonZeroTerms.length
-												: 0;
-											const hasNonZero =
-												(o.term1_avg || 0) !== 0 ||
-												(o.term2_avg || 0) !== 0 ||
-												(o.term3_avg || 0) !== 0 ||
-												yearlyAvg !== 0;
-
-											if (hasNonZero) {
-												w.document.write(`
-											<div class="overall-summary">
-												<table>
-													<thead>
-														<tr><th>OVERALL GRADES</th><th>Term 1</th><th>Term 2</th><th>Term 3</th></tr>
-													</thead>
-													<tbody>
-														<tr>
-															<td>TRIMESTER AVERAGE / Moyenne trimestrielle</td>
-															<td>${o.term1_avg > 0 ? o.term1_avg.toFixed(1) + '%' : '-'}</td>
-															<td>${o.term2_avg > 0 ? o.term2_avg.toFixed(1) + '%' : '-'}</td>
-															<td>${o.term3_avg > 0 ? o.term3_avg.toFixed(1) + '%' : '-'}</td>
-														</tr>
-														<tr>
-															<td><b>Yearly Average / Moyenne de l’année</b></td>
-															<td colspan="3"><b>${yearlyAvg.toFixed(1)}%</b></td>
-														</tr>
-													</tbody>
-												</table>
-											</div>`);
-											}
-
-											// --- Comments ---
-											frappe.call({
-												method: "education_report_card.education_report.page.student_report_card.student_report_card.get_term_and_director_comments",
-												args: { student, program, academic_year: academicYear },
-												callback: function (r4) {
-													const t = r4.message?.teacher || {};
-													const d = r4.message?.director || {};
-
-													w.document.write(`
-												<div class="comments-section">
-													<h4><b>Homeroom Teacher’s Comment / Commentaires du Titulaire :</b></h4>
-													<p>
-														T1: ${t.term1 || "................................"}<br>
-														T2: ${t.term2 || "................................"}<br>
-														T3: ${t.term3 || "................................"}<br><br>
-														<b>Name:</b> ${t.teacher_name || ".........................."} &nbsp;&nbsp;
-														<b>(Sign)</b> ..........................
-													</p>
-													<hr>
-													<h4><b>Principal’s Note / Remarque du Directeur :</b></h4>
-													<p>
-														T1: ${d.term1 || "................................"}<br>
-														T2: ${d.term2 || "................................"}<br>
-														T3: ${d.term3 || "................................"}<br><br>
-														<b>Name:</b> ${d.director_name || ".........................."} &nbsp;&nbsp;
-														<b>(Sign)</b> ..........................
-													</p>
-												</div>`);
-
-													if (directorMsg.conclusion_fr) {
-														w.document.write(`<div class="director-conclusion-fr">
-														<h3>${directorMsg.conc_title_fr || 'Décision finale'}</h3>
-														<p style="text-align:justify;">${directorMsg.conclusion_fr}</p>
-													</div>`);
-													}
-													if (directorMsg.conclusion_en) {
-														w.document.write(`<div class="director-conclusion-en">
-														<h3>${directorMsg.conc_title_en || 'Final decision'}</h3>
-														<p style="text-align:justify;">${directorMsg.conclusion_en}</p>
-													</div>`);
-													}
-
-													w.document.write('</body></html>');
-													w.document.close();
-													setTimeout(() => {
-														w.print();
-														w.onafterprint = () => w.close();
-													}, 600);
-												}
-											});
-										}
-									});
-								}
-							}
-						});
+		// --- Company header (fetched once per page) and the whole card ---
+		get_company_info().then((company) => {
+			frappe.call({
+				method: "education_report_card.education_report.page.student_report_card.student_report_card.get_report_cards",
+				args: { academic_year: academicYear, program: program, student: student },
+				callback: function (r) {
+					const payload = r.message || {};
+					const card = (payload.students || [])[0];
+
+					if (!card) {
+						frappe.msgprint("No records available to print.");
+						return;
 					}
-				});
-			}
+
+					print_report_card(company, payload.director_message || {}, card);
+				}
+			});
 		});
 	});
 
 
 };
 
+// === Company name and logo of the card header, shared by every print of the page ===
+let company_info;
+
+function get_company_info() {
+	if (!company_info) {
+		company_info = frappe
+			.xcall("education_report_card.education_report.page.student_report_card.student_report_card.get_company_info")
+			.then((company) => company || {})
+			.catch((error) => {
+				company_info = null;
+				throw error;
+			});
+	}
+
+	return company_info;
+}
+
+// === Follow a server-side bulk print batch ===
+function watch_bulk_print(batch_id) {
+	frappe.realtime.off("report_card_pdf_progress");
+	frappe.realtime.off("report_card_pdf_ready");
+	frappe.realtime.off("report_card_pdf_failed");
+
+	frappe.realtime.on("report_card_pdf_progress", (data) => {
+		if (data.batch_id !== batch_id) return;
+		frappe.show_progress(__("Report Cards"), data.completed, data.total, __("Rendering report cards..."));
+	});
+
+	frappe.realtime.on("report_card_pdf_ready", (data) => {
+		if (data.batch_id !== batch_id) return;
+		frappe.hide_progress();
+		frappe.msgprint(__("Report cards are ready: {0}", [`<a href="${data.file_url}" target="_blank">${__("Download")}</a>`]));
+	});
+
+	frappe.realtime.on("report_card_pdf_failed", (data) => {
+		if (data.batch_id !== batch_id) return;
+		frappe.hide_progress();
+		frappe.msgprint({ title: __("Report cards could not be printed"), indicator: "red", message: data.error });
+	});
+}
+
+// === Class position rows of the overall grades table ===
+function ranking_rows(r) {
+	if (!r || !r.yearly || !r.yearly.rank) return "";
+
+	const terms = [r.term1, r.term2, r.term3];
+	return `
+		<tr>
+			<td>CLASS POSITION / Rang</td>
+			${terms.map(t => `<td>${t.rank ? t.rank + ' / ' + t.class_size : '-'}</td>`).join("")}
+		</tr>
+		<tr>
+			<td>CLASS AVERAGE / Moyenne de la classe</td>
+			${terms.map(t => `<td>${t.class_size ? t.class_mean.toFixed(1) + '%' : '-'}</td>`).join("")}
+		</tr>
+		<tr>
+			<td><b>Yearly Position / Rang annuel</b></td>
+			<td colspan="3"><b>${r.yearly.rank} / ${r.yearly.class_size}</b></td>
+		</tr>`;
+}
+
+// === Write a complete report card to a print window ===
+function print_report_card(company, directorMsg, card) {
+	const { program, student } = card;
+	const academicYear = card.academic_year;
+	const company_name = company.company_name || "Your Institution Name";
+	// inlined logo: the print window does not have to fetch the image before printing
+	const logo_src = company.company_logo_data || company.company_logo;
+	const company_logo = logo_src
+		? `<img src="${logo_src}" style="width:120px;height:auto;display:block;margin:0 auto 10px auto;">`
+		: "";
+
+	let w = window.open('', '', 'height=900,width=1100');
+	w.document.write('<html><head><title>Student Report</title><style>');
+	w.document.write(`
+	body { font-family: 'Times New Roman', serif; margin: 25px; font-size: 12pt; color: #000; }
+	table { border-collapse: collapse; width: 100%; margin-bottom: 15px; font-size: 12pt; }
+	table, th, td { border: 1px solid black; }
+	th, td { padding: 6px; text-align: center; }
+	th { background-color: #f5f5f5; font-weight: bold; }
+	h1, h2, h3, h4 { text-align: center; margin: 10px 0; }
+	.course-section, .overall-summary, .comments-section,
+	.director-intro-fr, .director-intro-en,
+	.director-conclusion-fr, .director-conclusion-en {
+		margin-top: 20px; page-break-inside: avoid; padding: 10px;
+		border: 1px solid #000; border-radius: 6px;
+	}
+	.student-header { margin: 15px 0; font-size: 13pt; }
+	.student-header div { margin-bottom: 5px; }
+	.id-tr td {
+		background-color: #d0ebd9ff !important;  /* light green */
+		color: black;
+	}
+	.program-tr td {
+		background-color: #c19dedff !important;  /* light green */
+		color: black;
+	}
+	.course-summary-table { margin-top: 10px; border: 1px solid #000; }
+	.course-summary-table th { background-color: #f0f0f0; }
+	.overall-row td { font-weight: bold; background-color: #fafafa; }
+	.header-section { text-align: center; margin-bottom: 20px; }
+	.company-name { font-size: 18pt; font-weight: bold; margin-bottom: 5px; }
+	@media print {
+		body { margin: 0; }
+		table { page-break-inside: auto; }
+		tr { page-break-inside: avoid; page-break-after: auto; }
+	}
+`);
+	w.document.write('</style></head><body>');
+
+	// --- Add first page cover ---
+	w.document.write(`
+		<div style="page-break-after: always; height: 100vh; display: flex; flex-direction: column;">
+			<!-- Logo and Company Name at the top -->
+			<div style="text-align: center; margin-top: 20px;">
+				${company_logo}
+				<div class="company-name">${company_name}</div>
+			</div>
+
+			<!-- Centered Academic Year and Grade Name Report Card -->
+			<div style="flex-grow: 1; display: flex; flex-direction: column; justify-content: center; align-items: center; text-align: center;">
+				<h2>Academic Year: ${academicYear}</h2>
+				<h1>${program} Report Card</h1>
+			</div>
+		</div>
+		`);
+
+	// --- Director Intro ---
+	if (directorMsg.introduction_france) {
+		w.document.write(`
+		<div class="director-intro-fr">
+			<h2>Message de la Directrice de l’école</h2>
+			<p style="text-align: justify;">${directorMsg.introduction_france}</p>
+		</div>`);
+	}
+	if (directorMsg.introduction_english) {
+		w.document.write(`
+		<div class="director-intro-en">
+			<h2>Message from the School Director</h2>
+			<p style="text-align: justify;">${directorMsg.introduction_english}</p>
+			<div style="text-align:right; margin-top:20px;">
+				<span>__________________________</span><br>
+				<b>${directorMsg.director_name || ""}</b><br>
+				<span>Principal / Directeur</span>
+			</div>
+		</div>`);
+	}
+
+	// --- Student Info ---
+	w.document.write(`
+		<div class="student-header">
+			<table class="student-header-table" style="width: 550px; border-collapse: collapse; margin-bottom: 10px; font-size: 24px;">
+				<tr class="id-tr">
+					<td style="width: 150px; font-weight: bold; padding: 4px; text-align: left;">Student ID</td>
+					<td style="padding: 4px; width: 400px; text-align: left;">${student || '-'}</td>
+				</tr>
+				<tr class="name-tr">
+					<td style="font-weight: bold; padding: 4px;text-align: left;">Student Name</td>
+					<td style="padding: 4px;text-align: left;"> ${card.student_name || student || '-'}</td>
+				</tr>
+				<tr  class="program-tr">
+					<td style="font-weight: bold; padding: 4px;text-align: left;">Program/Grade</td>
+					<td style="padding: 4px;text-align: left;">${program || '-'}</td>
+				</tr>
+			</table>
+		</div>
+	`);
+
+	// --- Courses ---
+	card.courses.forEach(courseData => {
+		const sr = courseData.summary || {};
+		const hasCompetency = courseData.topics.some(t =>
+			t.competencies.some(c => c.competency && c.competency.trim() !== "")
+		);
+		const allValues = [
+			...(sr.coursework || []),
+			...(sr.unit_test || []),
+			...(sr.exam || []),
+			...(sr.trimester_total || [])
+		].map(Number);
+		const hasNonZero = allValues.some(v => v !== 0 && !isNaN(v));
+
+		if (!hasCompetency && !hasNonZero) return;
+
+		w.document.write(`<div class="course-section"><h3>Course/Subject: ${courseData.course}</h3>`);
+
+		if (hasCompetency) {
+			w.document.write(`
+			<table>
+				<thead>
+					<tr><th>Topic Name</th><th>Competency</th><th>Term 1</th><th>Term 2</th><th>Term 3</th></tr>
+				</thead><tbody>`);
+
+			courseData.topics.forEach(t => {
+				const valid = t.competencies.filter(c => c.competency && c.competency.trim() !== "");
+				if (valid.length === 0) return;
+
+				valid.forEach((c, idx) => {
+					w.document.write('<tr>');
+					if (idx === 0) w.document.write(`<td rowspan="${valid.length}">${t.topic_name}</td>`);
+					w.document.write(`<td>${c.competency}</td>`);
+					w.document.write(`<td>${c.term1 || ""}</td>`);
+					w.document.write(`<td>${c.term2 || ""}</td>`);
+					w.document.write(`<td>${c.term3 || ""}</td>`);
+					w.document.write('</tr>');
+				});
+			});
+			w.document.write(`</tbody></table>`);
+		}
+
+		if (hasNonZero) {
+			w.document.write(`
+			<table class="course-summary-table">
+				<thead><tr><th colspan="2">COURSE SUMMARY</th><th>Term 1</th><th>Term 2</th><th>Term 3</th></tr></thead>
+				<tbody>
+					<tr><td>COURSEWORK</td><td>20%</td><td>${sr.coursework?.[0] || "-"}</td><td>${sr.coursework?.[1] || "-"}</td><td>${sr.coursework?.[2] || "-"}</td></tr>
+					<tr><td>UNIT TEST</td><td>30%</td><td>${sr.unit_test?.[0] || "-"}</td><td>${sr.unit_test?.[1] || "-"}</td><td>${sr.unit_test?.[2] || "-"}</td></tr>
+					<tr><td>END OF TERM EXAM</td><td>50%</td><td>${sr.exam?.[0] || "-"}</td><td>${sr.exam?.[1] || "-"}</td><td>${sr.exam?.[2] || "-"}</td></tr>
+					<tr><td><b>TRIMESTER TOTAL</b></td><td><b>100%</b></td><td><b>${sr.trimester_total?.[0] || "-"}</b></td><td><b>${sr.trimester_total?.[1] || "-"}</b></td><td><b>${sr.trimester_total?.[2] || "-"}</b></td></tr>
+					<tr><td colspan="2"><b>YEARLY TOTAL GRADE</b></td><td colspan="3"><b>${sr.yearly_average_mark || "-"} ${sr.yearly_total_grade ? '(' + sr.yearly_total_grade + ')' : ''}</b></td></tr>
+				</tbody>
+			</table>`);
+		}
+
+		w.document.write(`</div>`);
+	});
+
+	// --- Overall Grades ---
+	const o = card.term_averages || {};
+
+	// Collect the term averages in an array
+	const terms = [o.term1_avg, o.term2_avg, o.term3_avg];
+
+	// Filter out null, undefined, or 0 values
+	const nonZeroTerms = terms.filter(t => t > 0);
+
+	// Calculate yearly average only if there are non-zero terms
+	const yearlyAvg = nonZeroTerms.length > 0
+		? nonZeroTerms.reduce((sum, t) => sum + t, 0) / nonZeroTerms.length
+		: 0;
+	const hasNonZero =
+		(o.term1_avg || 0) !== 0 ||
+		(o.term2_avg || 0) !== 0 ||
+		(o.term3_avg || 0) !== 0 ||
+		yearlyAvg !== 0;
+
+	if (hasNonZero) {
+		w.document.write(`
+		<div class="overall-summary">
+			<table>
+				<thead>
+					<tr><th>OVERALL GRADES</th><th>Term 1</th><th>Term 2</th><th>Term 3</th></tr>
+				</thead>
+				<tbody>
+					<tr>
+						<td>TRIMESTER AVERAGE / Moyenne trimestrielle</td>
+						<td>${o.term1_avg > 0 ? o.term1_avg.toFixed(1) + '%' : '-'}</td>
+						<td>${o.term2_avg > 0 ? o.term2_avg.toFixed(1) + '%' : '-'}</td>
+						<td>${o.term3_avg > 0 ? o.term3_avg.toFixed(1) + '%' : '-'}</td>
+					</tr>
+					<tr>
+						<td><b>Yearly Average / Moyenne de l’année</b></td>
+						<td colspan="3"><b>${yearlyAvg.toFixed(1)}%</b></td>
+					</tr>
+					${ranking_rows(card.ranking)}
+				</tbody>
+			</table>
+		</div>`);
+	}
+
+	// --- Comments ---
+	const t = card.comments?.teacher || {};
+	const d = card.comments?.director || {};
+
+	w.document.write(`
+	<div class="comments-section">
+		<h4><b>Homeroom Teacher’s Comment / Commentaires du Titulaire :</b></h4>
+		<p>
+			T1: ${t.term1 || "................................"}<br>
+			T2: ${t.term2 || "................................"}<br>
+			T3: ${t.term3 || "................................"}<br><br>
+			<b>Name:</b> ${t.teacher_name || ".........................."} &nbsp;&nbsp;
+			<b>(Sign)</b> ..........................
+		</p>
+		<hr>
+		<h4><b>Principal’s Note / Remarque du Directeur :</b></h4>
+		<p>
+			T1: ${d.term1 || "................................"}<br>
+			T2: ${d.term2 || "................................"}<br>
+			T3: ${d.term3 || "................................"}<br><br>
+			<b>Name:</b> ${d.director_name || ".........................."} &nbsp;&nbsp;
+			<b>(Sign)</b> ..........................
+		</p>
+	</div>`);
+
+	if (directorMsg.conclusion_fr) {
+		w.document.write(`<div class="director-conclusion-fr">
+		<h3>${directorMsg.conc_title_fr || 'Décision finale'}</h3>
+		<p style="text-align:justify;">${directorMsg.conclusion_fr}</p>
+	</div>`);
+	}
+	if (directorMsg.conclusion_en) {
+		w.document.write(`<div class="director-conclusion-en">
+		<h3>${directorMsg.conc_title_en || 'Final decision'}</h3>
+		<p style="text-align:justify;">${directorMsg.conclusion_en}</p>
+	</div>`);
+	}
+
+	w.document.write('</body></html>');
+	w.document.close();
+	setTimeout(() => {
+		w.print();
+		w.onafterprint = () => w.close();
+	}, 600);
+}
+
 // === Initialize Filters ===
 function load_filters() {
 	$('#program_filter, #academic_year_filter, #course_filter, #student_filter').empty();
@@ -580,143 +674,42 @@ function load_reports(filters) {
 	$('#report_output').empty().html("<p class='text-muted'>Loading...</p>");
 
 	frappe.call({
-		method: "education_report_card.education_report.page.student_report_card.student_report_card.get_student_reports",
-		args: { filters },
+		method: "education_report_card.education_report.page.student_report_card.student_report_card.get_report_cards",
+		args: filters,
 		callback: function (r) {
 			$('#report_output').empty();
 
-			if (!r.message || r.message.length === 0) {
+			const students = r.message?.students || [];
+			if (students.length === 0) {
 				$('#report_output').html("<p class='text-muted'>No records found.</p>");
 				return;
 			}
 
-			render_reports(r.message);
+			render_reports(students);
 		}
 	});
 }
 
 
 // === Render Reports ===
-function render_reports(data) {
+function render_reports(students) {
 	$('#report_output').empty();
-	const grouped = {};
-	const processed_students = new Set();
-
-	data.forEach(row => {
-		const key = `${row.academic_year}_${row.program}_${row.student}_${row.course}`;
-		if (!grouped[key]) {
-			grouped[key] = {
-				program: row.program,
-				academic_year: row.academic_year,
-				student: row.student,
-				student_name: row.student_name,
-				courses: {}
-			};
-		}
-
-		if (!grouped[key].courses[row.course]) {
-			grouped[key].courses[row.course] = { topics: {} };
-		}
-
-		if (!grouped[key].courses[row.course].topics[row.topic_name]) {
-			grouped[key].courses[row.course].topics[row.topic_name] = [];
-		}
 
-		grouped[key].courses[row.course].topics[row.topic_name].push({
-			competency: row.competency,
-			term1: row.term1,
-			term2: row.term2,
-			term3: row.term3
+	const html = [];
+	students.forEach(card => {
+		card.courses.forEach(courseData => {
+			html.push(render_student_course(card, courseData));
 		});
 	});
 
-	// Fetch director message for the first academic year + program
-	const program = $('[data-fieldname="program"] input').val();
-	const firstAcademicYear = data[0]?.academic_year;
-	if (firstAcademicYear && program) {
-		frappe.call({
-			method: "education_report_card.education_report.page.student_report_card.student_report_card.get_director_message",
-			args: { academic_year: firstAcademicYear, program: program },
-			callback: function (r) {
-				if (r.message) {
-					const director = r.message.director_name || "";
-					const intro_fr = r.message.introduction_france?.trim();
-					const intro_en = r.message.introduction_english?.trim();
-					let intro_html = "";
-
-					if (intro_fr) {
-						intro_html += `<div class="director-intro-fr bg-white border-2 border-gray-800 rounded-lg p-6 mb-6">
-                            <h2 style="text-align: center; font-weight: bold; font-size: 20pt; margin-bottom: 20px;">Message de la Directrice de l’école.</h2>
-                            <p style="text-align: justify; font-size: 12pt; margin-bottom: 20px;">${intro_fr}</p></div>`;
-					}
-
-					if (intro_en) {
-						intro_html += `<div class="director-intro-en bg-white border-2 border-gray-800 rounded-lg p-6 mb-6">
-                            <h2 style="text-align: center; font-weight: bold; font-size: 20pt; margin-bottom: 20px;">Message from the School Director.</h2>
-                            <p style="text-align: justify; font-size: 12pt; margin-bottom: 40px;">${intro_en}</p>
-                            <div style="text-align: right; font-size: 12pt;">
-                                <span>__________________________</span><br>
-                                <span><b>${director}</b></span><br>
-                                <span>Principal / Directeur</span>
-                            </div>
-                        </div>`;
-					}
-
-					if (intro_html) {
-						// $('#report_output').prepend(intro_html);
-					}
-				}
-
-				// After intro, render all student cards
-				render_student_cards(grouped, processed_students);
-			}
-		});
-	} else {
-		render_student_cards(grouped, processed_students);
-	}
-}
-
-// === Render Student Cards, Summaries, Comments ===
-function render_student_cards(grouped, processed_students) {
-	Object.values(grouped).forEach(g => {
-		const student = g.student;
-		if (!processed_students.has(student)) {
-			processed_students.add(student);
-
-			// Overall Term Averages
-			frappe.call({
-				method: "education_report_card.education_report.page.student_report_card.student_report_card.get_overall_term_averages",
-				args: { student: student, program: g.program, academic_year: g.academic_year },
-				callback: function (res) {
-					const term_averages = res.message || { term1_avg: 0, term2_avg: 0, term3_avg: 0 };
-					g.term_averages = term_averages;
-
-					// Teacher & Director Comments
-					frappe.call({
-						method: "education_report_card.education_report.page.student_report_card.student_report_card.get_term_and_director_comments",
-						args: { student: student, program: g.program, academic_year: g.academic_year },
-						callback: function (r2) {
-							g.comments = r2.message || null;
-
-							// Once both fetched, render student courses
-							render_student_courses(g);
-						}
-					});
-				}
-			});
-		} else {
-			// Already processed student courses
-			render_student_courses(g);
-		}
-	});
+	$('#report_output').html(html.join(""));
 }
 
-// === Render individual student courses ===
-function render_student_courses(g) {
-	Object.entries(g.courses).forEach(([course, courseData]) => {
-		const summaryId = `summary_${g.student}_${course}`.replace(/[^\w]/g, '_');
+// === Render individual student course ===
+function render_student_course(g, courseData) {
+	const sr = courseData.summary || {};
 
-		let html = `
+	return `
             <div class="student-report-card" 
                  style="
                     background-color: #ffffff;
@@ -735,7 +728,7 @@ function render_student_courses(g) {
                     <div style="font-size: 16pt; font-weight: bold; margin-bottom: 6px;">Academic Year: ${g.academic_year}</div>
                     <div style="font-size: 16pt; font-weight: bold; margin-bottom: 6px;">Program/Grade: ${g.program}</div>
                     <div style="font-size: 16pt; font-weight: bold; margin-bottom: 6px;">Student: ${g.student}${g.student_name ? ' (' + g.student_name + ')' : ''}</div>
-                    <div style="font-size: 16pt; font-weight: bold; margin-bottom: 12px;">Course/Subject: ${course}</div>
+                    <div style="font-size: 16pt; font-weight: bold; margin-bottom: 12px;">Course/Subject: ${courseData.course}</div>
                 </div>
 
                 <!-- Table -->
@@ -755,29 +748,7 @@ function render_student_courses(g) {
                             <th style="border: 2px solid #000; padding: 8px; text-align: center;">Term 3</th>
                         </tr>
                     </thead>
-                    <tbody id="${summaryId}">
-                        <tr>
-                            <td colspan="4" style="text-align:center; color:#555; padding: 12px; border: 2px solid #000;">Loading course summary...</td>
-                        </tr>
-                    </tbody>
-                </table>
-            </div>
-        `;
-
-		$('#report_output').append(html);
-
-		// Load course summary
-		frappe.call({
-			method: "education_report_card.education_report.page.student_report_card.student_report_card.get_course_summary",
-			args: {
-				student: g.student,
-				course: course,
-				program: g.program,
-				academic_year: g.academic_year
-			},
-			callback: function (res) {
-				const sr = res.message || {};
-				const summaryHtml = `
+                    <tbody>
                     <tr>
                         <td style="border: 2px solid #000; padding: 8px; font-weight:bold;">TRIMESTER TOTAL</td>
                         <td style="border: 2px solid #000; padding: 8px; text-align:center;">${sr.trimester_total?.[0] || 0}</td>
@@ -788,9 +759,8 @@ function render_student_courses(g) {
                         <td style="border: 2px solid #000; padding: 8px; font-weight:bold;">YEARLY TOTAL GRADE</td>
                         <td style="border: 2px solid #000; padding: 8px; text-align:center;" colspan="3">${sr.yearly_average_mark || 0} ${sr.yearly_total_grade ? '(' + sr.yearly_total_grade + ')' : ''}</td>
                     </tr>
-                `;
-				$(`#${summaryId}`).html(summaryHtml);
-			}
-		});
-	});
+                    </tbody>
+                </table>
+            </div>
+        `;
 }
@@ -1,27 +1,37 @@
 import frappe
+from frappe import _
+from frappe.utils import flt
+
+from education_report_card.education_report.card_cache import get_cached_report_cards
+from education_report_card.education_report.company_header import get_company_header
+from education_report_card.education_report.export import send_csv, send_xlsx
+from education_report_card.education_report.instrumentation import instrument
+
 
 @frappe.whitelist()
+@instrument
 def get_student_reports(filters):
-    filters = frappe.parse_json(filters or {})
-    conditions = []
-    values = {}
-
-    if filters.get("program"):
-        conditions.append("sr.program = %(program)s")
-        values["program"] = filters["program"]
-    if filters.get("academic_year"):
-        conditions.append("sr.academic_year = %(academic_year)s")
-        values["academic_year"] = filters["academic_year"]
-    if filters.get("course"):
-        conditions.append("sr.course = %(course)s")
-        values["course"] = filters["course"]
-    if filters.get("student"):
-        conditions.append("sr.student = %(student)s")
-        values["student"] = filters["student"]
-
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-    data = frappe.db.sql(f"""
+	filters = frappe.parse_json(filters or {})
+	conditions = []
+	values = {}
+
+	if filters.get("program"):
+		conditions.append("sr.program = %(program)s")
+		values["program"] = filters["program"]
+	if filters.get("academic_year"):
+		conditions.append("sr.academic_year = %(academic_year)s")
+		values["academic_year"] = filters["academic_year"]
+	if filters.get("course"):
+		conditions.append("sr.course = %(course)s")
+		values["course"] = filters["course"]
+	if filters.get("student"):
+		conditions.append("sr.student = %(student)s")
+		values["student"] = filters["student"]
+
+	where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+	data = frappe.db.sql(
+		f"""
         SELECT
             sr.student,
             sr.student_name,
@@ -37,89 +47,414 @@ def get_student_reports(filters):
         LEFT JOIN `tabStudent Report Detail` srd ON srd.parent = sr.name
         WHERE {where_clause}
         ORDER BY sr.student, sr.course, srd.topic_name, srd.idx
-    """, values, as_dict=True)
+    """,
+		values,
+		as_dict=True,
+	)
+
+	return data
+
+
+SUMMARY_FIELDS = [
+	"coursework_term1_20_percent",
+	"coursework_term2_20_percent",
+	"coursework_term3_20_percent",
+	"unit_test_term1_30_percent",
+	"unit_test_term2_30_percent",
+	"unit_test_term3_30_percent",
+	"exam_term1_50_percent",
+	"exam_term2_50_percent",
+	"exam_term3_50_percent",
+	"term1_total",
+	"term2_total",
+	"term3_total",
+	"yearly_average_mark",
+	"yearly_total_grade",
+]
+
+TERM_COMMENT_FIELDS = ["term1_comment", "term2_comment", "term3_comment", "teacher_name"]
+
+CLASS_RANK_PERIODS = ["term1", "term2", "term3", "yearly"]
+
+CLASS_RANK_STATS = ["rank", "percentile", "class_size", "class_mean", "class_std"]
+
+CLASS_RANK_FIELDS = [f"{period}_{stat}" for period in CLASS_RANK_PERIODS for stat in CLASS_RANK_STATS]
+
+DIRECTOR_MESSAGE_FIELDS = [
+	"director_name",
+	"introduction_france",
+	"introduction_english",
+	"conclusion_fr",
+	"conc_title_fr",
+	"conc_title_en",
+	"conclusion_en",
+	"company",
+	"term1_comment",
+	"term2_comment",
+	"term3_comment",
+]
+
+
+@frappe.whitelist()
+@instrument
+def get_report_cards(academic_year, program, student=None, course=None):
+	"""
+	Complete report card payload for every student of a program and academic year
+	(optionally a single student and/or course). Served from the report card cache.
+	"""
+	if not academic_year or not program:
+		frappe.throw(_("Please select both Academic Year and Program."))
+
+	return get_cached_report_cards(academic_year, program, [student] if student else None, course)
+
+
+def build_report_cards(academic_year, program, students=None, course=None):
+	"""
+	Report card payloads of `students` (default: all) of a program and academic year.
+	Built with a fixed number of queries, whatever the number of students and courses.
+	"""
+	filters = {"academic_year": academic_year, "program": program}
+	if students:
+		filters["student"] = ["in", list(students)]
+
+	# 1. every report of the selection; term averages span all courses of a student
+	reports = frappe.get_all(
+		"Student Report",
+		filters=filters,
+		fields=["name", "student", "student_name", "course", "docstatus", *SUMMARY_FIELDS],
+		order_by="student asc, course asc, docstatus asc",
+	)
+	if not reports:
+		return {"director_message": {}, "students": []}
+
+	reports_by_student = {}
+	for report in reports:
+		reports_by_student.setdefault(report.student, []).append(report)
+
+	# a draft report wins over a submitted one for the same course
+	shown_reports = {}
+	for report in reports:
+		if report.docstatus == 2 or (course and report.course != course):
+			continue
+		shown_reports.setdefault(report.student, {}).setdefault(report.course, report)
+
+	# 2. competencies of the shown reports
+	details_by_report = {}
+	if shown_reports:
+		details = frappe.get_all(
+			"Student Report Detail",
+			filters={
+				"parent": ["in", [r.name for courses in shown_reports.values() for r in courses.values()]],
+				"parenttype": "Student Report",
+			},
+			fields=["parent", "topic_name", "competency", "term1", "term2", "term3"],
+			order_by="parent asc, topic_name asc, idx asc",
+		)
+		for detail in details:
+			details_by_report.setdefault(detail.parent, []).append(detail)
+
+	# 3. teacher comments of every student and the director message shared by the program
+	comment_context = load_comment_context(academic_year, program, students or None)
+
+	# 4. class positions, computed in bulk by refresh_class_ranks
+	class_ranks = {
+		r.student: r
+		for r in frappe.get_all(
+			"Student Class Rank",
+			filters=filters,
+			fields=["student", *CLASS_RANK_FIELDS],
+		)
+	}
+
+	students = []
+	for student_id, student_reports in reports_by_student.items():
+		courses = [
+			{
+				"course": report.course,
+				"topics": build_topics(details_by_report.get(report.name, [])),
+				"summary": build_course_summary(report),
+			}
+			for report in shown_reports.get(student_id, {}).values()
+		]
+		if not courses:
+			continue
+
+		students.append(
+			{
+				"student": student_id,
+				"student_name": student_reports[0].student_name,
+				"program": program,
+				"academic_year": academic_year,
+				"courses": courses,
+				"term_averages": build_term_averages(student_reports),
+				"comments": build_comments(
+					comment_context.term_comments.get(student_id), comment_context.director_message
+				),
+				"ranking": build_ranking(class_ranks.get(student_id)),
+			}
+		)
+
+	return {"director_message": comment_context.director_message, "students": students}
+
+
+def build_topics(details):
+	"""Group competency rows by topic, keeping their order."""
+	topics = {}
+	for d in details:
+		topics.setdefault(d.topic_name, []).append(
+			{
+				"competency": d.competency,
+				"term1": d.term1,
+				"term2": d.term2,
+				"term3": d.term3,
+			}
+		)
+
+	return [{"topic_name": topic_name, "competencies": rows} for topic_name, rows in topics.items()]
+
+
+def build_course_summary(report):
+	if not report:
+		return {
+			"coursework": [0, 0, 0],
+			"unit_test": [0, 0, 0],
+			"exam": [0, 0, 0],
+			"trimester_total": [0, 0, 0],
+			"yearly_average_mark": 0,
+			"yearly_total_grade": "",
+		}
+
+	return {
+		"coursework": [
+			report.get("coursework_term1_20_percent") or 0,
+			report.get("coursework_term2_20_percent") or 0,
+			report.get("coursework_term3_20_percent") or 0,
+		],
+		"unit_test": [
+			report.get("unit_test_term1_30_percent") or 0,
+			report.get("unit_test_term2_30_percent") or 0,
+			report.get("unit_test_term3_30_percent") or 0,
+		],
+		"exam": [
+			report.get("exam_term1_50_percent") or 0,
+			report.get("exam_term2_50_percent") or 0,
+			report.get("exam_term3_50_percent") or 0,
+		],
+		"trimester_total": [
+			report.get("term1_total") or 0,
+			report.get("term2_total") or 0,
+			report.get("term3_total") or 0,
+		],
+		"yearly_average_mark": report.get("yearly_average_mark") or 0,
+		"yearly_total_grade": report.get("yearly_total_grade") or "",
+	}
+
+
+def build_term_averages(reports):
+	"""Average of each term total over all the course reports of a student."""
+	averages = {}
+	for term in ("term1", "term2", "term3"):
+		totals = [flt(r.get(f"{term}_total")) for r in reports]
+		averages[f"{term}_avg"] = round(sum(totals) / len(totals), 2) if totals else 0
+
+	return averages
+
+
+def build_ranking(class_rank):
+	"""Position of the student per term and for the year: {"term1": {"rank", "class_size", ...}, ...}."""
+	return {
+		period: {stat: (class_rank or {}).get(f"{period}_{stat}") for stat in CLASS_RANK_STATS}
+		for period in CLASS_RANK_PERIODS
+	}
+
+
+def load_comment_context(academic_year, program, students=None):
+	"""
+	Comments of a batch of cards of one program / academic year: the Term Comments of
+	`students` (default: all, an empty list skips them) keyed by student, read with one
+	query, and the Director Message they all share, read once.
+	"""
+	term_comments = {}
+	if students is None or students:
+		filters = {"academic_year": academic_year, "program": program}
+		if students:
+			filters["student"] = ["in", list(students)]
+
+		term_comments = {
+			tc.student: tc
+			for tc in frappe.get_all(
+				"Term Comment", filters=filters, fields=["student", *TERM_COMMENT_FIELDS]
+			)
+		}
+
+	return frappe._dict(
+		term_comments=term_comments,
+		director_message=load_director_message(academic_year, program),
+	)
+
+
+def load_director_message(academic_year, program):
+	return (
+		frappe.db.get_value(
+			"Director Message",
+			{"academic_year": academic_year, "program": program},
+			DIRECTOR_MESSAGE_FIELDS,
+			as_dict=True,
+		)
+		or {}
+	)
+
+
+def build_comments(term_comment, director_message):
+	comments = {
+		"teacher": {"term1": "", "term2": "", "term3": "", "teacher_name": ""},
+		"director": {"term1": "", "term2": "", "term3": "", "director_name": ""},
+	}
+
+	if term_comment:
+		comments["teacher"].update(
+			{
+				"term1": term_comment.term1_comment or "",
+				"term2": term_comment.term2_comment or "",
+				"term3": term_comment.term3_comment or "",
+				"teacher_name": term_comment.teacher_name or "",
+			}
+		)
+
+	if director_message:
+		comments["director"].update(
+			{
+				"term1": director_message.get("term1_comment") or "",
+				"term2": director_message.get("term2_comment") or "",
+				"term3": director_message.get("term3_comment") or "",
+				"director_name": director_message.get("director_name") or "",
+			}
+		)
+
+	return comments
+
+
+EXPORT_CHUNK_SIZE = 1000
+
+MARK_EXPORT_COLUMNS = ["student", "student_name", "program", "course", "academic_year", *SUMMARY_FIELDS]
+
+COMPETENCY_EXPORT_COLUMNS = [
+	"student",
+	"student_name",
+	"program",
+	"course",
+	"academic_year",
+	"topic_name",
+	"competency",
+	"term1",
+	"term2",
+	"term3",
+]
+
+
+@frappe.whitelist()
+@instrument
+def export_report_card_data(academic_year, program=None, course=None, sheet="marks", file_format="xlsx"):
+	"""
+	Download the Student Report data of an academic year (optionally one program / course)
+	as a flat sheet: one row per report ("marks") or per competency row ("competencies").
+	Reports are read in chunks and written row by row, so memory stays flat for the whole school.
+	"""
+	frappe.has_permission("Student Report", "export", throw=True)
+
+	if not academic_year:
+		frappe.throw(_("Please select an Academic Year."))
+	if sheet not in ("marks", "competencies"):
+		frappe.throw(_("Sheet must be either marks or competencies."))
+	if file_format not in ("csv", "xlsx"):
+		frappe.throw(_("Format must be either csv or xlsx."))
+
+	filters = {"academic_year": academic_year, "program": program, "course": course}
+	if sheet == "marks":
+		header = MARK_EXPORT_COLUMNS
+		rows = ([report[c] for c in header] for chunk in iter_report_chunks(filters) for report in chunk)
+	else:
+		header = COMPETENCY_EXPORT_COLUMNS
+		rows = (
+			[row[c] for c in header]
+			for chunk in iter_report_chunks(filters)
+			for row in get_competency_rows(chunk)
+		)
+
+	filename = f"Report Card {sheet.title()} {' '.join(filter(None, (program, course, academic_year)))}.{file_format}"
+	if file_format == "csv":
+		return send_csv(filename, header, rows)
+
+	return send_xlsx(filename, sheet.title(), header, rows)
+
+
+def iter_report_chunks(filters, chunk_size=EXPORT_CHUNK_SIZE):
+	"""Yield the non-cancelled Student Reports matching `filters`, keyset-paginated on name."""
+	conditions = ["sr.docstatus < 2", "sr.academic_year = %(academic_year)s"]
+	for field in ("program", "course"):
+		if filters.get(field):
+			conditions.append(f"sr.{field} = %({field})s")
+
+	values = {**filters, "limit": chunk_size, "after": ""}
+	while True:
+		reports = frappe.db.sql(
+			f"""
+            SELECT sr.name, {", ".join(f"sr.{c}" for c in MARK_EXPORT_COLUMNS)}
+            FROM `tabStudent Report` sr
+            WHERE {" AND ".join(conditions)} AND sr.name > %(after)s
+            ORDER BY sr.name
+            LIMIT %(limit)s
+            """,
+			values,
+			as_dict=True,
+		)
+		if not reports:
+			return
+
+		yield reports
+		values["after"] = reports[-1].name
+
+
+def get_competency_rows(reports):
+	"""Competency rows of a chunk of reports, merged with the report columns."""
+	by_name = {r.name: r for r in reports}
+	details = frappe.get_all(
+		"Student Report Detail",
+		filters={"parent": ["in", list(by_name)], "parenttype": "Student Report"},
+		fields=["parent", "topic_name", "competency", "term1", "term2", "term3"],
+		order_by="parent asc, idx asc",
+	)
+
+	return [{**by_name[d.parent], **d} for d in details]
 
-    return data
 
 @frappe.whitelist()
+@instrument
 def get_course_summary(student, course, program, academic_year):
-    conditions = {
-        "student": student,
-        "course": course,
-        "program": program,
-        "academic_year": academic_year
-    }
-
-    # Prefer draft first
-    report = frappe.db.get_value(
-        "Student Report",
-        {**conditions, "docstatus": 0},
-        [
-            "coursework_term1_20_percent", "coursework_term2_20_percent", "coursework_term3_20_percent",
-            "unit_test_term1_30_percent", "unit_test_term2_30_percent", "unit_test_term3_30_percent",
-            "exam_term1_50_percent", "exam_term2_50_percent", "exam_term3_50_percent",
-            "term1_total", "term2_total", "term3_total",
-            "yearly_average_mark", "yearly_total_grade"
-        ],
-        as_dict=True
-    )
-
-    # Fallback to submitted
-    if not report:
-        report = frappe.db.get_value(
-            "Student Report",
-            {**conditions, "docstatus": 1},
-            [
-                "coursework_term1_20_percent", "coursework_term2_20_percent", "coursework_term3_20_percent",
-                "unit_test_term1_30_percent", "unit_test_term2_30_percent", "unit_test_term3_30_percent",
-                "exam_term1_50_percent", "exam_term2_50_percent", "exam_term3_50_percent",
-                "term1_total", "term2_total", "term3_total",
-                "yearly_average_mark", "yearly_total_grade"
-            ],
-            as_dict=True
-        )
-
-    if not report:
-        return {
-            "coursework": [0, 0, 0],
-            "unit_test": [0, 0, 0],
-            "exam": [0, 0, 0],
-            "trimester_total": [0, 0, 0],
-            "yearly_average_mark": 0,
-            "yearly_total_grade": ""
-        }
-
-    return {
-        "coursework": [
-            report.get("coursework_term1_20_percent") or 0,
-            report.get("coursework_term2_20_percent") or 0,
-            report.get("coursework_term3_20_percent") or 0
-        ],
-        "unit_test": [
-            report.get("unit_test_term1_30_percent") or 0,
-            report.get("unit_test_term2_30_percent") or 0,
-            report.get("unit_test_term3_30_percent") or 0
-        ],
-        "exam": [
-            report.get("exam_term1_50_percent") or 0,
-            report.get("exam_term2_50_percent") or 0,
-            report.get("exam_term3_50_percent") or 0
-        ],
-        "trimester_total": [
-            report.get("term1_total") or 0,
-            report.get("term2_total") or 0,
-            report.get("term3_total") or 0
-        ],
-        "yearly_average_mark": report.get("yearly_average_mark") or 0,
-        "yearly_total_grade": report.get("yearly_total_grade") or ""
-    }
+	conditions = {"student": student, "course": course, "program": program, "academic_year": academic_year}
+
+	# Prefer draft first
+	report = frappe.db.get_value(
+		"Student Report", {**conditions, "docstatus": 0}, SUMMARY_FIELDS, as_dict=True
+	)
+
+	# Fallback to submitted
+	if not report:
+		report = frappe.db.get_value(
+			"Student Report", {**conditions, "docstatus": 1}, SUMMARY_FIELDS, as_dict=True
+		)
+
+	return build_course_summary(report)
+
 
 @frappe.whitelist()
+@instrument
 def get_overall_term_averages(student, academic_year, program):
-    if not student or not academic_year or not program:
-        return {"term1_avg": 0, "term2_avg": 0, "term3_avg": 0}
+	if not student or not academic_year or not program:
+		return {"term1_avg": 0, "term2_avg": 0, "term3_avg": 0}
 
-    res = frappe.db.sql("""
+	res = frappe.db.sql(
+		"""
         SELECT
             AVG(COALESCE(term1_total, 0)) AS term1_avg,
             AVG(COALESCE(term2_total, 0)) AS term2_avg,
@@ -128,179 +463,139 @@ def get_overall_term_averages(student, academic_year, program):
         WHERE student = %s
           AND academic_year = %s
           AND program = %s
-    """, (student, academic_year, program), as_dict=True)
+    """,
+		(student, academic_year, program),
+		as_dict=True,
+	)
+
+	row = res[0] if res else {}
+	return {
+		"term1_avg": round(row.get("term1_avg") or 0, 2),
+		"term2_avg": round(row.get("term2_avg") or 0, 2),
+		"term3_avg": round(row.get("term3_avg") or 0, 2),
+	}
 
-    row = res[0] if res else {}
-    return {
-        "term1_avg": round(row.get("term1_avg") or 0, 2),
-        "term2_avg": round(row.get("term2_avg") or 0, 2),
-        "term3_avg": round(row.get("term3_avg") or 0, 2),
-    }
 
 @frappe.whitelist()
+@instrument
 def get_term_and_director_comments(student, program, academic_year):
-    comments = {
-        "teacher": {"term1": "", "term2": "", "term3": "", "teacher_name": ""},
-        "director": {"term1": "", "term2": "", "term3": "", "director_name": ""}
-    }
-
-    term_comment = frappe.db.get_value(
-        "Term Comment",
-        {"student": student, "program": program, "academic_year": academic_year},
-        ["term1_comment", "term2_comment", "term3_comment", "teacher_name"],
-        as_dict=True
-    )
-    if term_comment:
-        comments["teacher"].update({
-            "term1": term_comment.term1_comment or "",
-            "term2": term_comment.term2_comment or "",
-            "term3": term_comment.term3_comment or "",
-            "teacher_name": term_comment.teacher_name or ""
-        })
-
-    director_msg = frappe.db.get_value(
-        "Director Message",
-        {"academic_year": academic_year, "program": program},
-        ["term1_comment", "term2_comment", "term3_comment", "director_name"],
-        as_dict=True
-    )
-    if director_msg:
-        comments["director"].update({
-            "term1": director_msg.term1_comment or "",
-            "term2": director_msg.term2_comment or "",
-            "term3": director_msg.term3_comment or "",
-            "director_name": director_msg.director_name or ""
-        })
-
-    return comments
+	context = load_comment_context(academic_year, program, [student])
+	return build_comments(context.term_comments.get(student), context.director_message)
+
 
 @frappe.whitelist()
+@instrument
 def get_director_message(academic_year, program):
-    director_message = frappe.db.get_value(
-        "Director Message",
-        {"academic_year": academic_year, "program": program},
-        ["director_name", "introduction_france", "introduction_english", "conclusion_fr", "conc_title_fr", "conc_title_en", "conclusion_en", "company"],
-        as_dict=True
-    )
-    return director_message or {}
-
+	return load_director_message(academic_year, program)
 
 
 @frappe.whitelist()
+@instrument
 def get_student_report_summary(academic_year, program, student=None, full=False):
-    """
-    Fetch student report summary.
-    If `full=True`, returns detailed course, competency, and comments data.
-    Otherwise returns compact summary view.
-    """
-    conditions = ""
-    if student:
-        conditions += f" AND sr.student = '{student}'"
-    if program:
-        conditions += f" AND sr.program = '{program}'"
-    if academic_year:
-        conditions += f" AND sr.academic_year = '{academic_year}'"
-
-    # === Compact data for summary view ===
-    summary_query = f"""
+	"""
+	Fetch student report summary.
+	If `full=True`, returns detailed course, competency, and comments data.
+	Otherwise returns compact summary view.
+	Uses the same four parameterised queries whatever the number of courses.
+	"""
+	conditions = ["sr.docstatus < 2"]
+	values = {}
+	for field, value in (("student", student), ("program", program), ("academic_year", academic_year)):
+		if value:
+			conditions.append(f"sr.{field} = %({field})s")
+			values[field] = value
+
+	# 1. every report of the selection, a draft winning over a submitted one for the same course
+	rows = frappe.db.sql(
+		f"""
         SELECT
-            sr.course AS course_name,
-            sr.trimester_total,
-            sr.yearly_total_grade
-        FROM
-            `tabStudent Report` sr
-        WHERE
-            1=1 {conditions}
-        ORDER BY sr.course
-    """
-    summary_data = frappe.db.sql(summary_query, as_dict=True)
-
-    # === If not full, return summary ===
-    if not full:
-        return summary_data
-
-    # === Full detailed report ===
-    detailed_data = []
-    courses = frappe.db.sql(f"""
-        SELECT DISTINCT sr.course, sr.course_name
+            sr.name, sr.student, sr.course,
+            COALESCE(c.course_name, sr.course) AS course_name,
+            {", ".join(f"sr.{field}" for field in SUMMARY_FIELDS)}
         FROM `tabStudent Report` sr
-        WHERE 1=1 {conditions}
-        ORDER BY sr.course_name
-    """, as_dict=True)
-
-    for course in courses:
-        course_name = course.course_name or course.course
-
-        competencies = frappe.db.sql(f"""
-            SELECT
-                c.competency AS name,
-                c.term1, c.term2, c.term3, c.total
-            FROM `tabStudent Competency` c
-            INNER JOIN `tabStudent Report` sr ON sr.name = c.parent
-            WHERE sr.course = %s {conditions}
-        """, (course_name,), as_dict=True)
-
-        course_summary = frappe.db.get_value(
-            "Student Report",
-            {"course": course_name, "program": program, "academic_year": academic_year, "student": student},
-            "course_summary"
-        )
-
-        detailed_data.append({
-            "course_name": course_name,
-            "competencies": competencies,
-            "course_summary": course_summary,
-            "trimester_total": frappe.db.get_value(
-                "Student Report",
-                {"course": course_name, "program": program, "academic_year": academic_year, "student": student},
-                "trimester_total"
-            ),
-            "yearly_total_grade": frappe.db.get_value(
-                "Student Report",
-                {"course": course_name, "program": program, "academic_year": academic_year, "student": student},
-                "yearly_total_grade"
-            ),
-        })
-
-    # === Add comments and overall averages ===
-    teacher_comment = frappe.db.get_value("Teacher Comment", {"student": student, "academic_year": academic_year}, "comment")
-    director_comment = frappe.db.get_value("Director Comment", {"student": student, "academic_year": academic_year}, "comment")
-    director_conclusion_fr = frappe.db.get_value("Director Comment", {"student": student, "academic_year": academic_year}, "conclusion_fr")
-    director_conclusion_en = frappe.db.get_value("Director Comment", {"student": student, "academic_year": academic_year}, "conclusion_en")
-
-    overall_averages = frappe.db.sql(f"""
-        SELECT
-            AVG(term1_avg) AS term1_avg,
-            AVG(term2_avg) AS term2_avg,
-            AVG(term3_avg) AS term3_avg,
-            AVG(yearly_avg) AS yearly_avg
-        FROM `tabStudent Report`
-        WHERE 1=1 {conditions}
-    """, as_dict=True)
-
-    # Merge metadata to the first entry
-    if detailed_data:
-        detailed_data[0].update({
-            "teacher_comment": teacher_comment,
-            "director_comment": director_comment,
-            "director_conclusion_fr": director_conclusion_fr,
-            "director_conclusion_en": director_conclusion_en,
-            "term1_avg": overall_averages[0].term1_avg if overall_averages else None,
-            "term2_avg": overall_averages[0].term2_avg if overall_averages else None,
-            "term3_avg": overall_averages[0].term3_avg if overall_averages else None,
-            "yearly_avg": overall_averages[0].yearly_avg if overall_averages else None,
-        })
-
-    return detailed_data
+        LEFT JOIN `tabCourse` c ON c.name = sr.course
+        WHERE {" AND ".join(conditions)}
+        ORDER BY course_name, sr.student, sr.docstatus
+        """,
+		values,
+		as_dict=True,
+	)
+
+	reports = {}
+	for row in rows:
+		reports.setdefault((row.student, row.course), row)
+	reports = list(reports.values())
+
+	# === Compact data for summary view ===
+	if not frappe.parse_json(full):
+		return [
+			{
+				"course_name": r.course_name,
+				"trimester_total": [r.term1_total or 0, r.term2_total or 0, r.term3_total or 0],
+				"yearly_total_grade": r.yearly_total_grade or "",
+			}
+			for r in reports
+		]
+
+	if not reports:
+		return []
+
+	# 2. competencies of every report, grouped by parent
+	competencies = {}
+	for d in frappe.get_all(
+		"Student Report Detail",
+		filters={"parent": ["in", [r.name for r in reports]], "parenttype": "Student Report"},
+		fields=["parent", "topic_name", "competency", "term1", "term2", "term3"],
+		order_by="parent asc, idx asc",
+	):
+		competencies.setdefault(d.parent, []).append(
+			{
+				"name": d.competency,
+				"topic_name": d.topic_name,
+				"term1": d.term1,
+				"term2": d.term2,
+				"term3": d.term3,
+			}
+		)
+
+	detailed_data = []
+	for report in reports:
+		course_summary = build_course_summary(report)
+		detailed_data.append(
+			{
+				"course_name": report.course_name,
+				"competencies": competencies.get(report.name, []),
+				"course_summary": course_summary,
+				"trimester_total": course_summary["trimester_total"],
+				"yearly_total_grade": course_summary["yearly_total_grade"],
+			}
+		)
+
+	# 3. / 4. comments, each doctype read once with all its columns
+	context = load_comment_context(academic_year, program, [student] if student else [])
+	director_message = context.director_message
+
+	comments = build_comments(context.term_comments.get(student), director_message)
+	averages = build_term_averages(reports)
+	positive = [averages[f"term{i}_avg"] for i in (1, 2, 3) if averages[f"term{i}_avg"] > 0]
+
+	# Merge metadata to the first entry
+	detailed_data[0].update(
+		{
+			"teacher_comment": comments["teacher"],
+			"director_comment": comments["director"],
+			"director_conclusion_fr": director_message.get("conclusion_fr"),
+			"director_conclusion_en": director_message.get("conclusion_en"),
+			**averages,
+			"yearly_avg": round(sum(positive) / len(positive), 2) if positive else 0,
+		}
+	)
+
+	return detailed_data
+
 
 @frappe.whitelist()
+@instrument
 def get_company_info():
-	company = frappe.db.get_single_value("Global Defaults", "default_company")
-	if not company:
-		return {"company_name": "Unknown Company", "company_logo": ""}
-
-	company_doc = frappe.get_doc("Company", company)
-	return {
-		"company_name": company_doc.company_name,
-		"company_logo": company_doc.company_logo
-	}
\ No newline at end of file
+	"""Company name and logo of the report card header, served from the cache."""
+	return get_company_header()
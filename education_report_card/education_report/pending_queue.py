@@ -0,0 +1,72 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Background work queued as pending keys in Redis.
+
+Keys are added to a Redis set once the current transaction commits and drained
+by a single background job per queue. The job re-reads the set until it is
+empty, so a key pushed while a pass is running is handled by the next pass
+rather than dropped by the job deduplication. The scheduler calls `enqueue`
+as a sweep, restarting the drain for keys left behind by a lost job.
+"""
+
+from functools import partial
+
+import frappe
+from frappe import _
+
+
+class PendingQueue:
+	def __init__(self, key, job_id, processor):
+		"""
+		`key` is the Redis set of pending keys, `job_id` the id of the drain job and
+		`processor` the dotted path of the function handling the decoded keys of one pass.
+		The processor commits its own work and logs its own failures.
+		"""
+		self.key = key
+		self.job_id = job_id
+		self.processor = processor
+
+	def push_after_commit(self, keys):
+		"""Push `keys` once the current transaction commits, so the job sees the changes behind them."""
+		if keys:
+			frappe.db.after_commit.add(partial(self.push, list(keys)))
+
+	def push(self, keys):
+		frappe.cache.sadd(self.key, *keys)
+		self.enqueue()
+
+	def enqueue(self):
+		"""Start the drain job unless one is already queued or running."""
+		if not frappe.cache.scard(self.key):
+			return
+
+		frappe.enqueue(
+			"education_report_card.education_report.pending_queue.drain",
+			queue="short",
+			job_id=self.job_id,
+			deduplicate=True,
+			key=self.key,
+			processor=self.processor,
+		)
+
+	def get_pending(self):
+		return [frappe.safe_decode(member) for member in frappe.cache.smembers(self.key)]
+
+
+def drain(key, processor):
+	"""Background job: hand the pending keys to `processor` until the set stays empty."""
+	process = frappe.get_attr(processor)
+
+	while True:
+		members = frappe.cache.smembers(key)
+		if not members:
+			break
+
+		frappe.cache.srem(key, *members)
+		try:
+			process([frappe.safe_decode(member) for member in members])
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(title=_("Pending queue {0} failed").format(key))
@@ -0,0 +1,180 @@
+# Copyright (c) 2025, Yeshiwas D. and contributors
+# For license information, please see license.txt
+
+"""
+Set-based recalculation of Student Reports.
+
+Used whenever Test Results change: the affected reports are found with one
+query, their marks aggregated with one grouped query and the derived fields
+written back in bulk, so the cost is flat in the number of students.
+
+Recalculations requested from document events are queued per
+(student, course, program, academic_year) key in a `PendingQueue` drained by a
+single background job, so a burst of submissions for the same class recomputes each
+report once.
+"""
+
+import json
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import now
+from frappe.utils.background_jobs import is_job_enqueued
+
+from education_report_card.education_report.card_cache import clear_report_card_cache
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	queue_course_rollups,
+)
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import (
+	refresh_class_ranks,
+)
+from education_report_card.education_report.grading import get_report_fields
+from education_report_card.education_report.grading_scale import get_grade
+from education_report_card.education_report.pending_queue import PendingQueue
+
+PENDING_KEY = "student_report_recompute_pending"
+FAILED_KEY = "student_report_recompute_failed"
+JOB_ID = "student_report_recompute"
+
+PENDING_RECOMPUTES = PendingQueue(
+	PENDING_KEY, JOB_ID, "education_report_card.education_report.recompute.recompute_pending_keys"
+)
+
+
+def recompute_student_reports(program, course, academic_year, students=None):
+	"""Recalculate the averages of every Student Report of a class (optionally only `students`)."""
+	if not (program and course and academic_year):
+		return []
+
+	filters = {"program": program, "course": course, "academic_year": academic_year}
+	if students:
+		filters["student"] = ["in", list(set(students))]
+
+	# locked before the marks are read, so a concurrent delta update waits and applies on top
+	reports = frappe.get_all(
+		"Student Report",
+		filters=filters,
+		fields=["name", "student", "course", "program", "academic_year", "grading_scale"],
+		for_update=True,
+	)
+	if not reports:
+		return []
+
+	report_fields = get_report_fields(reports)
+	updates = {}
+
+	for report in reports:
+		fields = report_fields[(report.student, report.course, report.program, report.academic_year)]
+		fields["yearly_total_grade"] = get_grade(fields["yearly_average_mark"], report.grading_scale)
+		updates[report.name] = fields
+
+	frappe.db.bulk_update("Student Report", updates)
+
+	# bulk_update skips the document hooks that keep the report card cache fresh
+	students = list({r.student for r in reports})
+	frappe.db.after_commit.add(partial(clear_report_card_cache, program, academic_year, students))
+	queue_course_rollups(program, academic_year, course)
+
+	return list(updates)
+
+
+def queue_recompute(program, course, academic_year, students):
+	"""
+	Schedule the Student Reports of `students` for recalculation in the background.
+
+	Keys are only pushed once the current transaction commits, so the worker
+	always sees the marks that triggered the recalculation.
+	"""
+	keys = [make_key(student, course, program, academic_year) for student in set(students) if student]
+	if not keys:
+		return
+
+	if frappe.flags.in_test:
+		recompute_student_reports(program, course, academic_year, students)
+		return
+
+	frappe.db.after_commit.add(partial(push_pending_keys, keys))
+
+
+def push_pending_keys(keys):
+	failed = {frappe.safe_decode(key) for key in frappe.cache.hkeys(FAILED_KEY)}
+	for key in failed.intersection(keys):
+		frappe.cache.hdel(FAILED_KEY, key)
+
+	PENDING_RECOMPUTES.push(keys)
+
+
+def enqueue_pending_recomputes():
+	"""Scheduler sweep: restart the drain job for keys left pending."""
+	PENDING_RECOMPUTES.enqueue()
+
+
+def recompute_pending_keys(keys):
+	"""One pass of the drain job: recalculate each affected class once, then rank its program."""
+	classes = {}
+	for key in keys:
+		student, course, program, academic_year = json.loads(key)
+		classes.setdefault((program, course, academic_year), {})[student] = key
+
+	programs = set()
+	for (program, course, academic_year), students in classes.items():
+		try:
+			recompute_student_reports(program, course, academic_year, list(students))
+			frappe.db.commit()
+			programs.add((program, academic_year))
+		except Exception:
+			frappe.db.rollback()
+			error_log = frappe.log_error(title=_("Student Report recalculation failed"))
+			for key in students.values():
+				frappe.cache.hset(FAILED_KEY, key, {"error_log": error_log.name, "failed_on": now()})
+
+	# one ranking pass per program once its classes are recalculated
+	for program, academic_year in programs:
+		try:
+			refresh_class_ranks(program, academic_year)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(title=_("Class ranking failed"))
+
+
+@frappe.whitelist()
+def get_recompute_status():
+	"""Pending and failed Student Report recalculations."""
+	frappe.only_for(["System Manager", "Education Manager"])
+
+	pending = [parse_key(key) for key in PENDING_RECOMPUTES.get_pending()]
+	failed = [
+		{**parse_key(frappe.safe_decode(key)), **details}
+		for key, details in frappe.cache.hgetall(FAILED_KEY).items()
+	]
+
+	return {
+		"job_enqueued": is_job_enqueued(JOB_ID),
+		"pending_count": len(pending),
+		"pending": pending,
+		"failed_count": len(failed),
+		"failed": failed,
+	}
+
+
+@frappe.whitelist()
+def retry_failed_recomputes():
+	"""Move every failed recalculation back to the pending queue."""
+	frappe.only_for(["System Manager", "Education Manager"])
+
+	keys = [frappe.safe_decode(key) for key in frappe.cache.hgetall(FAILED_KEY)]
+	if keys:
+		push_pending_keys(keys)
+
+	return len(keys)
+
+
+def make_key(student, course, program, academic_year):
+	return json.dumps([student, course, program, academic_year])
+
+
+def parse_key(key):
+	student, course, program, academic_year = json.loads(key)
+	return {"student": student, "course": course, "program": program, "academic_year": academic_year}
@@ -42,6 +42,46 @@ frappe.query_reports["Class Test Overview"] = {
 			label: "Instructor",
 			fieldtype: "Link",
 			options: "Instructor",
+		},
+		{
+			fieldname: "page_size",
+			label: "Rows per Page",
+			fieldtype: "Int",
+			default: 500,
+		},
+		{
+			// keyset cursor of the last row of the previous page
+			fieldname: "after",
+			label: "After",
+			fieldtype: "Data",
+			hidden: 1,
 		}
-	]
+	],
+
+	onload: function (report) {
+		report.page.add_inner_button(__("First Page"), () => {
+			report.set_filter_value("after", "");
+		});
+
+		report.page.add_inner_button(__("Next Page"), () => {
+			const rows = (report.data || []).filter(row => row.row_id);
+			const last = rows[rows.length - 1];
+			if (!last) return;
+
+			report.set_filter_value(
+				"after",
+				JSON.stringify([last.course, last.test_date, last.row_id])
+			);
+		});
+
+		report.page.add_inner_button(__("Export All (CSV)"), () => {
+			const filters = report.get_filter_values();
+			delete filters.after;
+
+			open_url_post(
+				"/api/method/education_report_card.education_report.report.class_test_overview.class_test_overview.export_detail_rows",
+				{ filters: JSON.stringify(filters) }
+			);
+		});
+	}
 };
@@ -1,33 +1,233 @@
 import frappe
+from frappe.utils import cint
+
+from education_report_card.education_report.export import send_csv
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+EXPORT_CHUNK_SIZE = 2000
+
+DETAIL_COLUMNS = [
+	"test_result_id",
+	"program",
+	"course",
+	"term",
+	"test_type",
+	"possible_mark",
+	"student",
+	"student_name",
+	"mark_earned",
+	"test_date",
+]
+
+# keyset: the detail rows are ordered on raw columns, the course and test date of the
+# year_course_date_index of Test Result and the row name as tie-breaker (NULL dates sort first)
+ORDER_BY = "tr.course, tr.test_date, trd.name"
+
 
 def execute(filters=None):
-    filters = filters or {}
-
-    # ✅ Mandatory filter check
-    if not filters.get("academic_year"):
-        frappe.throw("Please select an Academic Year")
-
-    # ---------------------------
-    # 🔍 Build SQL Conditions
-    # ---------------------------
-    conditions = ["tr.academic_year = %(academic_year)s"]
-    params = {"academic_year": filters["academic_year"]}
-
-    # Optional filters
-    for key in ["program", "course", "term", "test_type", "student", "teacher"]:
-        if filters.get(key):
-            if key == "student":
-                conditions.append("trd.student = %({})s".format(key))
-            else:
-                conditions.append("tr.{} = %({})s".format(key, key))
-            params[key] = filters[key]
-
-    condition_str = " AND ".join(conditions)
-
-    # ---------------------------
-    # 1️⃣ Detailed Data
-    # ---------------------------
-    detailed_data = frappe.db.sql(f"""
+	filters = filters or {}
+
+	# ✅ Mandatory filter check
+	if not filters.get("academic_year"):
+		frappe.throw("Please select an Academic Year")
+
+	# ---------------------------
+	# 🔍 Build SQL Conditions
+	# ---------------------------
+	condition_str, params = get_conditions(filters)
+
+	# ---------------------------
+	# 1️⃣ Detailed Data (one page, keyset paginated)
+	# ---------------------------
+	after = frappe.parse_json(filters.get("after")) if filters.get("after") else None
+	page_size = min(max(cint(filters.get("page_size")) or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+
+	detailed_data = get_detail_rows(condition_str, params, after, page_size + 1)
+	has_more = len(detailed_data) > page_size
+	detailed_data = detailed_data[:page_size]
+
+	message = None
+	if has_more:
+		message = f"Showing {page_size} rows. More rows are available: use <b>Next Page</b> or <b>Export All (CSV)</b>."
+
+	# ---------------------------
+	# 2️⃣ Summary (Averages per grouping)
+	# ---------------------------
+	# only shown on the first page
+	summary_data = [] if after else get_summary(filters, condition_str, params)
+
+	# ---------------------------
+	# 3️⃣ Define Columns
+	# ---------------------------
+	columns = [
+		{
+			"label": "Test Result ID",
+			"fieldname": "test_result_id",
+			"fieldtype": "Link",
+			"options": "Test Result",
+			"width": 160,
+		},
+		{
+			"label": "Program/Grade",
+			"fieldname": "program",
+			"fieldtype": "Link",
+			"options": "Program",
+			"width": 140,
+		},
+		{
+			"label": "Course/Subject",
+			"fieldname": "course",
+			"fieldtype": "Link",
+			"options": "Course",
+			"width": 160,
+		},
+		{"label": "Term", "fieldname": "term", "fieldtype": "Data", "width": 90},
+		{"label": "Test Type", "fieldname": "test_type", "fieldtype": "Data", "width": 110},
+		{"label": "Student", "fieldname": "student", "fieldtype": "Link", "options": "Student", "width": 150},
+		{"label": "Student Name", "fieldname": "student_name", "fieldtype": "Data", "width": 180},
+		{"label": "Mark Earned", "fieldname": "mark_earned", "fieldtype": "Float", "width": 110},
+		{"label": "Possible Mark", "fieldname": "possible_mark", "fieldtype": "Float", "width": 120},
+		{"label": "Test Date", "fieldname": "test_date", "fieldtype": "Date", "width": 120},
+		{"label": "Row ID", "fieldname": "row_id", "fieldtype": "Data", "hidden": 1},
+	]
+
+	# ---------------------------
+	# 4️⃣ Append Summary Section
+	# ---------------------------
+	if summary_data:
+		detailed_data.append({})
+		# Visual "colspan" effect
+		detailed_data.append(
+			{
+				"student_name": "<b>📊 Averages (Grouped Summary)</b>",
+				"test_result_id": "",
+				"program": "",
+				"course": "",
+				"term": "",
+				"test_type": "",
+				"student": "",
+				"mark_earned": "",
+				"possible_mark": "",
+				"test_date": "",
+			}
+		)
+
+		for row in summary_data:
+			detailed_data.append(
+				{
+					"program": row.program,
+					"course": row.course,
+					"term": row.term,
+					"test_type": row.test_type,
+					"student_name": f"Average of {row.total_results} Results",
+					"mark_earned": row.average_mark,
+					"possible_mark": row.possible_mark,
+					"test_date": "",
+				}
+			)
+
+	# ---------------------------
+	# 5️⃣ Return
+	# ---------------------------
+	return columns, detailed_data, message
+
+
+def get_summary(filters, condition_str, params):
+	"""
+	Averages per (program, course, term, test_type).
+	Read from the maintained Class Test Statistic table; per-student or per-teacher
+	filters are not part of its key, so those fall back to aggregating the results.
+	"""
+	if filters.get("student") or filters.get("teacher"):
+		return frappe.db.sql(
+			f"""
+            SELECT
+                tr.program,
+                tr.course,
+                tr.term,
+                tr.test_type,
+                ROUND(AVG(tr.possible_mark), 2) AS possible_mark,
+                ROUND(AVG(trd.mark_earned), 2) AS average_mark,
+                ROUND(AVG((trd.mark_earned / tr.possible_mark) * 100), 2) AS avg_percentage,
+                COUNT(*) AS total_results
+            FROM `tabTest Result` tr
+            JOIN `tabTest Result Detail` trd ON trd.parent = tr.name
+            WHERE {condition_str}
+            GROUP BY tr.program, tr.course, tr.term, tr.test_type
+            ORDER BY tr.program, tr.course
+        """,
+			params,
+			as_dict=True,
+		)
+
+	statistic_filters = {
+		key: filters[key]
+		for key in ("academic_year", "program", "course", "term", "test_type")
+		if filters.get(key)
+	}
+	statistics = frappe.get_all(
+		"Class Test Statistic",
+		filters=statistic_filters,
+		fields=[
+			"program",
+			"course",
+			"term",
+			"test_type",
+			"entry_count",
+			"sum_marks",
+			"sum_possible",
+			"sum_percentage",
+		],
+		order_by="program asc, course asc",
+	)
+
+	return [
+		frappe._dict(
+			program=row.program,
+			course=row.course,
+			term=row.term,
+			test_type=row.test_type,
+			possible_mark=round(row.sum_possible / row.entry_count, 2),
+			average_mark=round(row.sum_marks / row.entry_count, 2),
+			avg_percentage=round(row.sum_percentage / row.entry_count, 2),
+			total_results=row.entry_count,
+		)
+		for row in statistics
+		if row.entry_count
+	]
+
+
+def get_conditions(filters):
+	# submitted results only, like the Class Test Statistic summary
+	conditions = ["tr.docstatus = 1", "tr.academic_year = %(academic_year)s"]
+	params = {"academic_year": filters["academic_year"]}
+
+	# Optional filters
+	for key in ["program", "course", "term", "test_type", "student", "teacher"]:
+		if filters.get(key):
+			if key == "student":
+				conditions.append(f"trd.student = %({key})s")
+			else:
+				conditions.append(f"tr.{key} = %({key})s")
+			params[key] = filters[key]
+
+	return " AND ".join(conditions), params
+
+
+def get_detail_rows(condition_str, params, after=None, limit=DEFAULT_PAGE_SIZE):
+	"""
+	One page of detail rows, starting strictly after the `after` cursor
+	[course, test_date, row_id] taken from the last row of the previous page.
+	"""
+	params = dict(params)
+	if after:
+		condition_str += get_cursor_condition(after[1])
+		params.update({"after_course": after[0], "after_date": after[1] or None, "after_row_id": after[-1]})
+	params["limit"] = limit
+
+	return frappe.db.sql(
+		f"""
         SELECT
             tr.name AS test_result_id,
             tr.program,
@@ -38,81 +238,61 @@ def execute(filters=None):
             trd.student,
             trd.student_name,
             trd.mark_earned,
-            tr.test_date
+            tr.test_date,
+            trd.name AS row_id
         FROM `tabTest Result` tr
         JOIN `tabTest Result Detail` trd ON trd.parent = tr.name
         WHERE {condition_str}
-        ORDER BY tr.course, tr.test_date, trd.student_name
-    """, params, as_dict=True)
+        ORDER BY {ORDER_BY}
+        LIMIT %(limit)s
+    """,
+		params,
+		as_dict=True,
+	)
 
-    # ---------------------------
-    # 2️⃣ Summary (Averages per grouping)
-    # ---------------------------
-    summary_data = frappe.db.sql(f"""
-        SELECT
-            tr.program,
-            tr.course,
-            tr.term,
-            tr.test_type,
-            ROUND(AVG(tr.possible_mark), 2) AS possible_mark,
-            ROUND(AVG(trd.mark_earned), 2) AS average_mark,
-            ROUND(AVG((trd.mark_earned / tr.possible_mark) * 100), 2) AS avg_percentage,
-            COUNT(DISTINCT trd.student) AS total_students
-        FROM `tabTest Result` tr
-        JOIN `tabTest Result Detail` trd ON trd.parent = tr.name
-        WHERE {condition_str}
-        GROUP BY tr.program, tr.course, tr.term, tr.test_type
-        ORDER BY tr.program, tr.course
-    """, params, as_dict=True)
-
-    # ---------------------------
-    # 3️⃣ Define Columns
-    # ---------------------------
-    columns = [
-        {"label": "Test Result ID", "fieldname": "test_result_id", "fieldtype": "Link", "options": "Test Result", "width": 160},
-        {"label": "Program/Grade", "fieldname": "program", "fieldtype": "Link", "options": "Program", "width": 140},
-        {"label": "Course/Subject", "fieldname": "course", "fieldtype": "Link", "options": "Course", "width": 160},
-        {"label": "Term", "fieldname": "term", "fieldtype": "Data", "width": 90},
-        {"label": "Test Type", "fieldname": "test_type", "fieldtype": "Data", "width": 110},
-        {"label": "Student", "fieldname": "student", "fieldtype": "Link", "options": "Student", "width": 150},
-        {"label": "Student Name", "fieldname": "student_name", "fieldtype": "Data", "width": 180},
-        {"label": "Mark Earned", "fieldname": "mark_earned", "fieldtype": "Float", "width": 110},
-        {"label": "Possible Mark", "fieldname": "possible_mark", "fieldtype": "Float", "width": 120},
-        {"label": "Test Date", "fieldname": "test_date", "fieldtype": "Date", "width": 120},
-    ]
-
-    # ---------------------------
-    # 4️⃣ Append Summary Section
-    # ---------------------------
-    if summary_data:
-        detailed_data.append({})
-        # Visual "colspan" effect
-        detailed_data.append({
-            "student_name": "<b>📊 Averages (Grouped Summary)</b>",
-            "test_result_id": "",
-            "program": "",
-            "course": "",
-            "term": "",
-            "test_type": "",
-            "student": "",
-            "mark_earned": "",
-            "possible_mark": "",
-            "test_date": ""
-        })
-
-        for row in summary_data:
-            detailed_data.append({
-                "program": row.program,
-                "course": row.course,
-                "term": row.term,
-                "test_type": row.test_type,
-                "student_name": f"Average of {row.total_students} Students",
-                "mark_earned": row.average_mark,
-                "possible_mark": row.possible_mark,
-                "test_date": "",
-            })
-
-    # ---------------------------
-    # 5️⃣ Return
-    # ---------------------------
-    return columns, detailed_data
+
+def get_cursor_condition(after_date):
+	"""
+	Rows after the cursor in ORDER_BY order, spelled out column by column: the leading
+	course range can use the index, where a row comparison over expressions cannot.
+	"""
+	if after_date:
+		later = (
+			"tr.test_date > %(after_date)s OR (tr.test_date = %(after_date)s AND trd.name > %(after_row_id)s)"
+		)
+	else:
+		# the cursor row has no test date: the dated rows of the course and the undated rows after it
+		later = "tr.test_date IS NOT NULL OR trd.name > %(after_row_id)s"
+
+	return f" AND tr.course >= %(after_course)s AND (tr.course > %(after_course)s OR {later})"
+
+
+def iter_detail_rows(filters, chunk_size=EXPORT_CHUNK_SIZE):
+	"""Yield every detail row matching `filters` in chunks, holding one chunk in memory at a time."""
+	condition_str, params = get_conditions(filters)
+	after = None
+
+	while True:
+		rows = get_detail_rows(condition_str, params, after, chunk_size)
+		if not rows:
+			return
+
+		yield rows
+
+		last = rows[-1]
+		after = [last.course, last.test_date and str(last.test_date), last.row_id]
+
+
+@frappe.whitelist()
+def export_detail_rows(filters):
+	"""Download every detail row as CSV, streamed chunk by chunk."""
+	frappe.has_permission("Test Result", "export", throw=True)
+
+	filters = frappe._dict(frappe.parse_json(filters))
+	if not filters.get("academic_year"):
+		frappe.throw("Please select an Academic Year")
+
+	rows = (
+		[row[column] for column in DETAIL_COLUMNS] for chunk in iter_detail_rows(filters) for row in chunk
+	)
+	return send_csv(f"Class Test Overview {filters.academic_year}.csv", DETAIL_COLUMNS, rows)
@@ -0,0 +1,10 @@
+frappe.query_reports["Report Card Performance"] = {
+	filters: [
+		{
+			fieldname: "days",
+			label: __("Last N Days"),
+			fieldtype: "Int",
+			default: 7,
+		},
+	],
+};
@@ -0,0 +1,83 @@
+import frappe
+from frappe.utils import add_days, cint, now_datetime
+
+
+def execute(filters=None):
+	"""Instrumented methods, slowest first, over the last `days` days of Report Card Performance Log."""
+	filters = frappe._dict(filters or {})
+	since = add_days(now_datetime(), -(cint(filters.days) or 7))
+
+	data = frappe.db.sql(
+		"""
+        SELECT
+            method,
+            COUNT(*) AS calls,
+            AVG(wall_time_ms) AS avg_wall_time_ms,
+            MAX(wall_time_ms) AS max_wall_time_ms,
+            AVG(db_time_ms) AS avg_db_time_ms,
+            AVG(queries) AS avg_queries,
+            MAX(queries) AS max_queries,
+            AVG(`rows`) AS avg_rows,
+            SUM(wall_time_ms) AS total_wall_time_ms
+        FROM `tabReport Card Performance Log`
+        WHERE creation >= %(since)s
+        GROUP BY method
+        ORDER BY avg_wall_time_ms DESC
+        """,
+		{"since": since},
+		as_dict=True,
+	)
+
+	columns = [
+		{"label": "Method", "fieldname": "method", "fieldtype": "Data", "width": 320},
+		{"label": "Calls", "fieldname": "calls", "fieldtype": "Int", "width": 80},
+		{
+			"label": "Avg Wall (ms)",
+			"fieldname": "avg_wall_time_ms",
+			"fieldtype": "Float",
+			"precision": 1,
+			"width": 120,
+		},
+		{
+			"label": "Max Wall (ms)",
+			"fieldname": "max_wall_time_ms",
+			"fieldtype": "Float",
+			"precision": 1,
+			"width": 120,
+		},
+		{
+			"label": "Avg DB (ms)",
+			"fieldname": "avg_db_time_ms",
+			"fieldtype": "Float",
+			"precision": 1,
+			"width": 110,
+		},
+		{
+			"label": "Avg Queries",
+			"fieldname": "avg_queries",
+			"fieldtype": "Float",
+			"precision": 1,
+			"width": 110,
+		},
+		{"label": "Max Queries", "fieldname": "max_queries", "fieldtype": "Int", "width": 110},
+		{"label": "Avg Rows", "fieldname": "avg_rows", "fieldtype": "Float", "precision": 0, "width": 100},
+		{
+			"label": "Total Wall (ms)",
+			"fieldname": "total_wall_time_ms",
+			"fieldtype": "Float",
+			"precision": 0,
+			"width": 130,
+		},
+	]
+
+	chart = {
+		"data": {
+			"labels": [d.method for d in data[:10]],
+			"datasets": [
+				{"name": "Avg Wall (ms)", "values": [round(d.avg_wall_time_ms, 1) for d in data[:10]]}
+			],
+		},
+		"type": "bar",
+	}
+
+	return columns, data, None, chart
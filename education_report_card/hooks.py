@@ -6,26 +6,27 @@ app_email = "yeshiwas@developer.com"
 app_license = "mit"
 
 
-fixtures =[
-    {
-        "dt": "Custom Field",
-        "filters":[
-            ["dt", "in", ["Program", "Course"]]
-            ]
-    },
-    {
-        "dt": "Workspace",
-        "filters":[
-            ["name", "in", ["Education", ]]
-            ]
-    },
-
+fixtures = [
+	{"dt": "Custom Field", "filters": [["dt", "in", ["Program", "Course"]]]},
+	{
+		"dt": "Workspace",
+		"filters": [
+			[
+				"name",
+				"in",
+				[
+					"Education",
+				],
+			]
+		],
+	},
 ]
 
 
-# after_migrate = [
-#     "education_report_card.after_migrate.workspace_sync.execute"
-# ]
+after_migrate = [
+	"education_report_card.after_migrate.indexes.execute",
+	"education_report_card.after_migrate.workspace_sync.execute",
+]
 
 
 # Apps
@@ -160,34 +161,64 @@ fixtures =[
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"Grading Scale": {
+		"on_update": "education_report_card.doc_events.grading_scale.clear_cache",
+		"on_update_after_submit": "education_report_card.doc_events.grading_scale.clear_cache",
+		"on_cancel": "education_report_card.doc_events.grading_scale.clear_cache",
+		"on_trash": "education_report_card.doc_events.grading_scale.clear_cache",
+	},
+	"Student Report": {
+		"on_update": [
+			"education_report_card.doc_events.report_card.clear_student_card",
+			"education_report_card.doc_events.course_rollup.queue_student_report_rollups",
+			"education_report_card.doc_events.class_rank.queue_student_report_ranks",
+		],
+		"on_cancel": [
+			"education_report_card.doc_events.report_card.clear_student_card",
+			"education_report_card.doc_events.course_rollup.queue_student_report_rollups",
+			"education_report_card.doc_events.class_rank.queue_student_report_ranks",
+		],
+		"on_trash": [
+			"education_report_card.doc_events.report_card.clear_student_card",
+			"education_report_card.doc_events.course_rollup.queue_student_report_rollups",
+			"education_report_card.doc_events.class_rank.queue_student_report_ranks",
+		],
+	},
+	"Term Comment": {
+		"on_update": "education_report_card.doc_events.report_card.clear_student_card",
+		"on_cancel": "education_report_card.doc_events.report_card.clear_student_card",
+		"on_trash": "education_report_card.doc_events.report_card.clear_student_card",
+	},
+	"Company": {
+		"on_update": "education_report_card.doc_events.company_header.clear_cache",
+		"on_trash": "education_report_card.doc_events.company_header.clear_cache",
+	},
+	"Global Defaults": {
+		"on_update": "education_report_card.doc_events.company_header.clear_cache",
+	},
+	"Director Message": {
+		"on_update": "education_report_card.doc_events.report_card.clear_program_cards",
+		"on_cancel": "education_report_card.doc_events.report_card.clear_program_cards",
+		"on_trash": "education_report_card.doc_events.report_card.clear_program_cards",
+	},
+}
 
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"education_report_card.tasks.all"
-# 	],
-# 	"daily": [
-# 		"education_report_card.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"education_report_card.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"education_report_card.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"education_report_card.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+	"all": [
+		"education_report_card.education_report.recompute.enqueue_pending_recomputes",
+		"education_report_card.education_report.doctype.student_class_rank.student_class_rank.enqueue_pending_ranks",
+		"education_report_card.education_report.doctype.course_term_rollup.course_term_rollup.enqueue_pending_rollups",
+		"education_report_card.education_report.instrumentation.flush_performance_logs",
+	],
+	"hourly": [
+		"education_report_card.education_report.doctype.report_card_publication.report_card_publication.resume_stalled_publications"
+	],
+	"daily": ["education_report_card.education_report.mark_deltas.check_running_sums"],
+}
 
 # Testing
 # -------
@@ -261,7 +292,7 @@ fixtures =[
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
-
+# instrumentation is opt-in: bench --site <site> set-config report_card_instrumentation 1
+default_log_clearing_doctypes = {
+	"Report Card Performance Log": 7  # days to retain logs
+}
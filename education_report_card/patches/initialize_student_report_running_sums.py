@@ -0,0 +1,11 @@
+import frappe
+
+from education_report_card.education_report.recompute import recompute_student_reports
+
+
+def execute():
+	"""Fill the running sums of every Student Report with a full recalculation per class."""
+	classes = frappe.get_all("Student Report", fields=["program", "course", "academic_year"], distinct=True)
+	for group in classes:
+		recompute_student_reports(group.program, group.course, group.academic_year)
+		frappe.db.commit()
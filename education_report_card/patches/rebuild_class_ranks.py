@@ -0,0 +1,8 @@
+from education_report_card.education_report.doctype.student_class_rank.student_class_rank import (
+	rebuild_class_ranks,
+)
+
+
+def execute():
+	"""Backfill Student Class Rank for every program / academic year with Student Reports."""
+	rebuild_class_ranks()
@@ -0,0 +1,8 @@
+from education_report_card.education_report.doctype.class_test_statistic.class_test_statistic import (
+	rebuild_class_test_statistics,
+)
+
+
+def execute():
+	"""Backfill Class Test Statistic from the Test Results submitted so far."""
+	rebuild_class_test_statistics()
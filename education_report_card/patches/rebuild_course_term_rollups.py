@@ -0,0 +1,8 @@
+from education_report_card.education_report.doctype.course_term_rollup.course_term_rollup import (
+	rebuild_course_rollups,
+)
+
+
+def execute():
+	"""Backfill Course Term Rollup for every program / academic year with Student Reports."""
+	rebuild_course_rollups()